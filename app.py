@@ -1,5 +1,6 @@
 # Import required libraries
 import os
+import threading
 import datetime as dt
 
 import numpy as np
@@ -12,7 +13,13 @@ import dash_core_components as dcc
 import dash_html_components as html
 
 from tickers import tickers
-from data_fetcher import get_time_delta, get_raw_data, get_filtered_data
+from data_fetcher import (get_time_delta, get_raw_data, get_filtered_data,
+                          get_chain_ivs)
+from iv_solver import IncrementalIVSolver
+from iv_cache import IVCache
+from iv_pool import ShardedIVEngine
+from data_sources import get_source, RecordingSource
+from snapshot_store import CHAIN_NAMES, to_snapshot, write_partition
 
 
 # Setup app
@@ -36,6 +43,39 @@ if 'DYNO' in os.environ:
 tickers = [dict(label=str(ticker), value=str(ticker))
            for ticker in tickers]
 
+# Optional process pool for very large chains, IV_PROCESSES=<n> to enable
+iv_engine = None
+if 'IV_PROCESSES' in os.environ:
+    iv_engine = ShardedIVEngine(processes=int(os.environ['IV_PROCESSES']))
+
+# Live chains from Yahoo, or recorded snapshots replayed from
+# OPTION_REPLAY_DIR=<dir> at OPTION_REPLAY_SPEED=<x> times the recorded pace.
+# OPTION_RECORD_DIR=<dir> records every chain served for later replay
+if 'OPTION_REPLAY_DIR' in os.environ:
+    data_source = get_source(
+        'replay', directory=os.environ['OPTION_REPLAY_DIR'],
+        speed=float(os.environ.get('OPTION_REPLAY_SPEED', 1)))
+elif os.environ.get('OPTION_SOURCE') == 'snapshots':
+    data_source = get_source('snapshots', root=os.environ['SNAPSHOT_DIR'])
+else:
+    data_source = get_source('yahoo')
+if 'OPTION_RECORD_DIR' in os.environ:
+    data_source = RecordingSource(data_source, os.environ['OPTION_RECORD_DIR'])
+
+# Fetched chains are kept in the snapshot store at SNAPSHOT_DIR=<dir>, one
+# partition per ticker and day, with their IVs solved in full precision at
+# the rates first used. OPTION_SOURCE=snapshots serves them back
+snapshot_dir = os.environ.get('SNAPSHOT_DIR')
+if os.environ.get('OPTION_SOURCE') == 'snapshots':
+    snapshot_dir = None  # Already stored
+pending_snapshot = None
+
+# One incremental IV solver per ticker, so refreshes only re-solve what moved
+iv_solvers = {}
+
+# Shared memo of solved IVs, so flipping selectors back and forth is instant
+iv_cache = IVCache()
+
 
 # Make app layout
 app.layout = html.Div(
@@ -267,13 +307,31 @@ app.layout = html.Div(
               [Input('ticker_dropdown', 'value')])
 def cache_raw_data(ticker):
 
-    global raw_data
-    raw_data = get_raw_data(ticker)
+    global raw_data, iv_solver, pending_snapshot
+    raw_data = get_raw_data(ticker, data_source)
+    if snapshot_dir is not None:
+        pending_snapshot = (ticker, raw_data)  # Stored once the IVs are asked for
+    if ticker not in iv_solvers:
+        iv_solvers[ticker] = IncrementalIVSolver(engine=iv_engine)
+    iv_solver = iv_solvers[ticker]
     print('Loaded raw data')
 
     return 'loaded'
 
 
+# Write a chain to the snapshot store with its IVs
+def store_snapshot(ticker, data, rf_interest_rate, dividend_rate,
+                   trading_calendar, market):
+
+    snapshot = to_snapshot(data, CHAIN_NAMES)
+    snapshot['IV'] = get_chain_ivs(data, rf_interest_rate=rf_interest_rate,
+                                   dividend_rate=dividend_rate,
+                                   trading_calendar=trading_calendar,
+                                   market=market, engine=iv_engine)
+    write_partition(snapshot_dir, ticker, dt.date.today(), snapshot)
+    print('Stored snapshot')
+
+
 # Cache filtered data
 @app.callback(Output('filtered_container', 'hidden'),
               [Input('raw_container', 'hidden'),
@@ -300,7 +358,9 @@ def cache_filtered_data(hidden, call_or_put, market,
                                         rf_interest_rate=float(rf_interest_rate),
                                         dividend_rate=float(dividend_rate),
                                         trading_calendar=trading_calendar,
-                                        market=market)
+                                        market=market, solver=iv_solver,
+                                        cache=iv_cache, precision='display',
+                                        intraday=True)
         else:
             s, p, i = get_filtered_data(raw_data, calculate_iv=calculate_iv,
                                         call=False, put=True,
@@ -309,14 +369,23 @@ def cache_filtered_data(hidden, call_or_put, market,
                                         rf_interest_rate=float(rf_interest_rate),
                                         dividend_rate=float(dividend_rate),
                                         trading_calendar=trading_calendar,
-                                        market=market)
+                                        market=market, solver=iv_solver,
+                                        cache=iv_cache, precision='display',
+                                        intraday=True)
 
         df = pd.DataFrame([s, p, i]).T
 
-        global filtered_data
+        global filtered_data, pending_snapshot
         filtered_data = df[df[2] > 0.0001]  # Filter invalid calculations with abnormally low IV
         print('Loaded filtered data')
 
+        # Solve and store the whole chain behind the response
+        if pending_snapshot is not None:
+            threading.Thread(target=store_snapshot, args=pending_snapshot + (
+                float(rf_interest_rate), float(dividend_rate),
+                trading_calendar, market)).start()
+            pending_snapshot = None
+
         return 'loaded'
 
 
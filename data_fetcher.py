@@ -3,42 +3,42 @@ import datetime as dt
 
 import numpy as np
 import pandas as pd
-from pandas_datareader.data import Options
 from py_vollib.black_scholes_merton.implied_volatility import *
 
-from trading_calendar import USTradingCalendar
+from data_sources import get_source
+from trading_calendar import get_busdaycalendar
+from iv_solver import implied_volatility_batch, quote_status, QUOTE_VALID
+from iv_solver import PRECISION_BUDGETS
+from time_to_expiry import get_fractional_time_delta
 
 
 # Get time delta
 def get_time_delta(today, date_list, trading_calendar=True):
 
-    delta_list = []
+    # Whole days, one lookup per distinct expiry broadcast back to the rows
+    today = np.datetime64(today).astype('datetime64[D]')
+    dates = np.asarray(date_list, dtype='datetime64[us]').astype('datetime64[D]')
+    expiries, rows = np.unique(dates, return_inverse=True)
 
     if trading_calendar:
         year = 252
-        calendar = USTradingCalendar()
-
-        for date in date_list:
-            trading_holidays = calendar.holidays(today, date).tolist()
-            delta = np.busday_count(today, date, holidays=trading_holidays) + 1
-            delta_list.append(delta)
+        delta_list = np.busday_count(today, expiries,
+                                     busdaycal=get_busdaycalendar()) + 1
     else:
         year = 365
+        delta_list = np.abs((expiries - today).astype(int)) + 1
 
-        for date in date_list:
-            delta = abs((today - date).days) + 1
-            delta_list.append(delta)
-
-    delta_list = np.array(delta_list)
+    delta_list = delta_list[rows]
     normalized = delta_list / float(year)
 
     return delta_list, normalized
 
 
-# Get tape
-def get_raw_data(ticker):
-    tape = Options(ticker, 'yahoo')
-    data = tape.get_all_data()
+# Get tape, live from Yahoo unless another data source is given
+def get_raw_data(ticker, source=None):
+    if source is None:
+        source = get_source('yahoo')
+    data = source.get_chain(ticker)
     return data
 
 
@@ -46,7 +46,10 @@ def get_raw_data(ticker):
 def get_filtered_data(data, calculate_iv=True, call=True, put=False,
                       volume_threshold=1, above_below=False,
                       rf_interest_rate=0.0, dividend_rate=0.0,
-                      trading_calendar=True, market=True):
+                      trading_calendar=True, market=True,
+                      batch=True, tolerance=1E-8, return_status=False,
+                      solver=None, cache=None, max_iterations=100,
+                      precision=None, engine=None, intraday=False):
 
     if call and put:
         raise Exception('Must specify either call or put.')
@@ -59,10 +62,14 @@ def get_filtered_data(data, calculate_iv=True, call=True, put=False,
         flag = 'p'
         typ = 'put'
 
+    # Named budgets ('display', 'full') override tolerance and max_iterations
+    if precision is not None:
+        tolerance, max_iterations = PRECISION_BUDGETS[precision]
+
     if not above_below:
         above_below = 1E9  # Very large number, good enough for our purposes
 
-    underlying = data['Underlying_Price'][0]
+    underlying = data['Underlying_Price'].iloc[0]
 
     # Filter dataframe
     df = data[(data.index.get_level_values('Type') == typ)
@@ -81,18 +88,87 @@ def get_filtered_data(data, calculate_iv=True, call=True, put=False,
 
     strikes = df.index.get_level_values('Strike').values
     expiries = df.index.get_level_values('Expiry').to_pydatetime()
-    plotting, time_to_expirations = get_time_delta(dt.datetime.today(
-    ), expiries, trading_calendar)  # Can get slow if too many expiries
+    # Whole days, or trading time to each expiry's close to the minute,
+    # counted from the exchange's clock rather than the server's
+    if intraday:
+        plotting, time_to_expirations = get_fractional_time_delta(
+            pd.Timestamp.now(tz='UTC'), expiries, trading_calendar)
+    else:
+        plotting, time_to_expirations = get_time_delta(dt.datetime.today(
+        ), expiries, trading_calendar)
     ivs = df['IV'].values
 
     # Make sure nothing thows up
     assert len(premiums) == len(strikes)
     assert len(strikes) == len(time_to_expirations)
 
-    if calculate_iv:
+    # The vectorized solvers run the no-arbitrage prefilter themselves, so
+    # their statuses come from the solve of each row or from the cache
+    vectorized = (batch or solver is not None or cache is not None
+                  or engine is not None)
+    if not (calculate_iv and vectorized):
+        # Flag quotes outside no-arbitrage bounds so they never reach the solver
+        status = quote_status(premiums.values, underlying, strikes,
+                              time_to_expirations, rf_interest_rate / 100,
+                              dividend_rate / 100, flag)
+
+    if calculate_iv and vectorized:
+
+        # Vectorized solve of the whole chain. Rows already in the cache are
+        # reused, the rest go to the incremental solver if there is one
+        inputs = np.broadcast_arrays(premiums.values.astype(float),
+                                     float(underlying), strikes.astype(float),
+                                     time_to_expirations,
+                                     rf_interest_rate / 100,
+                                     dividend_rate / 100)
+        sigmas = np.full(len(strikes), np.nan)
+        status = np.zeros(len(strikes), dtype=np.int8)
+        missing = np.arange(len(strikes))
+
+        if cache is not None:
+            sigmas, status, missing = cache.lookup(
+                *inputs, flag, tolerance=tolerance,
+                max_iterations=max_iterations)
+
+        if missing.size:
+            rows = [column[missing] for column in inputs]
+            if solver is not None:
+                # Contracts keyed on (type, strike, expiry) between snapshots
+                keys = pd.MultiIndex.from_arrays([
+                    df.index.get_level_values('Type'),
+                    df.index.get_level_values('Strike'),
+                    df.index.get_level_values('Expiry')])
+                solved, solved_status = solver.solve(
+                    keys[missing], *rows, flag, return_status=True,
+                    tolerance=tolerance, max_iterations=max_iterations)
+            else:
+                # Process pool for very large chains, if one is given
+                batch_solve = (implied_volatility_batch if engine is None
+                               else engine.implied_volatility)
+                solved, solved_status = batch_solve(
+                    *rows, flag, tolerance=tolerance,
+                    max_iterations=max_iterations, return_status=True)
+            sigmas[missing] = solved
+            status[missing] = solved_status
+
+            if cache is not None:
+                cache.store(*rows, flag, solved, solved_status,
+                            tolerance=tolerance, max_iterations=max_iterations)
+
+        sigmas[~np.isfinite(sigmas)] = 0.0  # Same as a failed scalar solve
+
+        ivs = sigmas
+
+    elif calculate_iv:
 
         sigmas = []
-        for premium, strike, time_to_expiration in zip(premiums, strikes, time_to_expirations):
+        for premium, strike, time_to_expiration, valid in zip(
+                premiums, strikes, time_to_expirations, status == QUOTE_VALID):
+
+            # Skip quotes the prefilter already rejected
+            if not valid:
+                sigmas.append(0.0)
+                continue
 
             # Constants
             P = premium
@@ -110,4 +186,34 @@ def get_filtered_data(data, calculate_iv=True, call=True, put=False,
 
         ivs = np.array(sigmas)
 
+    if return_status:
+        return strikes, plotting, ivs, status
+
     return strikes, plotting, ivs
+
+
+# Implied volatility of every contract of a chain in row order, from the
+# premiums get_filtered_data would use, NaN where a quote does not solve
+def get_chain_ivs(data, rf_interest_rate=0.0, dividend_rate=0.0,
+                  trading_calendar=True, market=True, precision='full',
+                  engine=None):
+
+    call = data.index.get_level_values('Type') == 'call'
+    if market:
+        premiums = np.where(call, data['Ask'].values, data['Bid'].values)
+    else:
+        premiums = data['Last'].values
+
+    _, time_to_expirations = get_fractional_time_delta(
+        pd.Timestamp.now(tz='UTC'),
+        data.index.get_level_values('Expiry').to_pydatetime(), trading_calendar)
+    tolerance, max_iterations = PRECISION_BUDGETS[precision]
+
+    batch_solve = (implied_volatility_batch if engine is None
+                   else engine.implied_volatility)
+    return batch_solve(premiums.astype(float),
+                       data['Underlying_Price'].values.astype(float),
+                       data.index.get_level_values('Strike').values.astype(float),
+                       time_to_expirations, rf_interest_rate / 100,
+                       dividend_rate / 100, np.where(call, 'c', 'p'),
+                       tolerance=tolerance, max_iterations=max_iterations)
@@ -0,0 +1,211 @@
+# Import required libraries
+import os
+import abc
+import time
+import datetime as dt
+import threading
+
+import numpy as np
+import pandas as pd
+
+from snapshot_store import CHAIN_NAMES, list_partitions, read_partition
+
+
+# Every source returns chains shaped like pandas_datareader's Options data:
+# one row per contract indexed on these levels, with at least these columns
+CHAIN_INDEX = ['Strike', 'Expiry', 'Type', 'Symbol']
+CHAIN_COLUMNS = ['Last', 'Bid', 'Ask', 'Vol', 'Open_Int', 'IV',
+                 'Underlying_Price', 'Quote_Time']
+REQUIRED_COLUMNS = ['Last', 'Bid', 'Ask', 'Vol', 'IV', 'Underlying_Price']
+
+# Recorded snapshots are <directory>/<TICKER>/<timestamp>.pkl
+SNAPSHOT_FORMAT = '%Y%m%dT%H%M%S'
+SNAPSHOT_EXTENSION = '.pkl'
+
+
+# Check a chain has what the pipeline needs and bring it to the one layout:
+# index levels in CHAIN_INDEX order, float strikes, datetime expiries,
+# lower case types, optional columns filled with NaN, sorted index
+def normalize_chain(data):
+
+    missing = [level for level in ['Strike', 'Expiry', 'Type']
+               if level not in data.index.names]
+    missing += [column for column in REQUIRED_COLUMNS
+                if column not in data.columns]
+    if missing:
+        raise Exception('Option chain is missing %s.' % ', '.join(missing))
+
+    data = data.reset_index()
+    if 'Symbol' not in data.columns:
+        data['Symbol'] = ''
+    for column in CHAIN_COLUMNS:
+        if column not in data.columns:
+            data[column] = np.nan
+
+    data['Strike'] = data['Strike'].astype(float)
+    data['Expiry'] = pd.to_datetime(data['Expiry'])
+    data['Type'] = data['Type'].astype(str).str.lower()
+
+    data = data.set_index(CHAIN_INDEX).sort_index()
+    return data
+
+
+# Interface of all data sources, get_chain(ticker) returns a normalized chain
+class DataSource(abc.ABC):
+
+    @abc.abstractmethod
+    def get_chain(self, ticker):
+        pass
+
+    def close(self):
+        pass
+
+
+# Live chains from Yahoo through pandas_datareader, the original source
+class YahooSource(DataSource):
+
+    def get_chain(self, ticker):
+        from pandas_datareader.data import Options  # Only needed when live
+        tape = Options(ticker, 'yahoo')
+        return normalize_chain(tape.get_all_data())
+
+
+# Save one snapshot for later replay, returns its path
+def record_chain(data, directory, ticker, timestamp=None):
+
+    if timestamp is None:
+        timestamp = dt.datetime.now()
+
+    folder = os.path.join(directory, ticker.upper())
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    path = os.path.join(folder, timestamp.strftime(SNAPSHOT_FORMAT)
+                        + SNAPSHOT_EXTENSION)
+    data.to_pickle(path)
+    return path
+
+
+# Wraps another source and records every chain it serves
+class RecordingSource(DataSource):
+
+    def __init__(self, source, directory):
+        self.source = source
+        self.directory = directory
+
+    def get_chain(self, ticker):
+        data = self.source.get_chain(ticker)
+        record_chain(data, self.directory, ticker)
+        return data
+
+    def close(self):
+        self.source.close()
+
+
+# Serves recorded snapshots of each ticker in time order, paced so that
+# speed=1 replays at the recorded rate, speed=10 ten times faster and
+# speed=None as fast as they can be read. After the last snapshot it
+# starts over if loop, else keeps serving the last one.
+class ReplaySource(DataSource):
+
+    def __init__(self, directory, speed=1.0, loop=True):
+        if speed is not None and not speed > 0:
+            raise Exception('Replay speed must be positive or None.')
+
+        self.directory = directory
+        self.speed = speed
+        self.loop = loop
+        self._cursors = {}  # ticker -> (next position, wall clock start)
+        self._lock = threading.Lock()
+
+    # Recorded (timestamp, path) pairs of a ticker, oldest first
+    def snapshots(self, ticker):
+        folder = os.path.join(self.directory, ticker.upper())
+        if not os.path.isdir(folder):
+            raise Exception('No recorded snapshots for %s in %s.'
+                            % (ticker, self.directory))
+
+        snapshots = []
+        for name in os.listdir(folder):
+            stem, extension = os.path.splitext(name)
+            if extension != SNAPSHOT_EXTENSION:
+                continue
+            try:
+                timestamp = dt.datetime.strptime(stem, SNAPSHOT_FORMAT)
+            except ValueError:
+                continue
+            snapshots.append((timestamp, os.path.join(folder, name)))
+
+        if not snapshots:
+            raise Exception('No recorded snapshots for %s in %s.'
+                            % (ticker, self.directory))
+        return sorted(snapshots)
+
+    def rewind(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._cursors.clear()
+            else:
+                self._cursors.pop(ticker.upper(), None)
+
+    def get_chain(self, ticker):
+        snapshots = self.snapshots(ticker)
+
+        with self._lock:
+            position, start = self._cursors.get(ticker.upper(), (0, None))
+            if position >= len(snapshots):
+                position, start = (0, None) if self.loop else (len(snapshots) - 1, start)
+            if start is None:
+                start = time.time()
+            self._cursors[ticker.upper()] = (position + 1, start)
+
+        # Wait until the snapshot is due at the replay speed
+        if self.speed is not None:
+            elapsed = (snapshots[position][0] - snapshots[0][0]).total_seconds()
+            delay = start + elapsed / self.speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        return normalize_chain(pd.read_pickle(snapshots[position][1]))
+
+
+# Chains from snapshot_store: the latest stored date of each ticker, or
+# the given date, optionally only expiries and strikes within (low, high)
+# bounds, which the store reads without decoding the rest of the chain
+class SnapshotSource(DataSource):
+
+    def __init__(self, root, date=None, expiry=None, strike=None):
+        self.root = root
+        self.date = date
+        self.expiry = expiry
+        self.strike = strike
+
+    def get_chain(self, ticker):
+        partitions = list_partitions(self.root, ticker, self.date, self.date)
+        if not partitions:
+            raise Exception('No snapshots of %s in %s.' % (ticker, self.root))
+
+        data = read_partition(self.root, ticker, partitions[-1][1],
+                              expiry=self.expiry, strike=self.strike)
+        # Stored IVs where solved, else the vendor's
+        data['IV'] = data['IV'].fillna(data.pop('Vendor_IV'))
+        data = data.rename(columns=dict((v, k) for k, v in CHAIN_NAMES.items()
+                                        if k != 'IV'))
+        data['Type'] = data['Type'].map({'c': 'call', 'p': 'put'})
+        return normalize_chain(data.set_index(['Strike', 'Expiry', 'Type']))
+
+
+# Data sources by name, each a factory taking keyword arguments
+SOURCES = {'yahoo': YahooSource, 'replay': ReplaySource,
+           'snapshots': SnapshotSource}
+
+
+def register_source(name, factory):
+    SOURCES[name] = factory
+
+
+def get_source(name='yahoo', **kwargs):
+    if name not in SOURCES:
+        raise Exception('Unknown data source %r, expected one of %s.'
+                        % (name, ', '.join(sorted(SOURCES))))
+    return SOURCES[name](**kwargs)
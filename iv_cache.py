@@ -0,0 +1,184 @@
+# Import required libraries
+import threading
+
+import numpy as np
+
+from iv_solver import binary_flag
+
+
+# Fields of one cache entry: hash of the quantized key, the key itself (flag
+# and the six rounded inputs as integers), the result, the budget it was
+# solved with and when it was last used
+ENTRY_DTYPE = np.dtype([('hash', 'u8'), ('key', 'i8', (7,)),
+                        ('sigma', 'f8'), ('status', 'i1'),
+                        ('tolerance', 'f8'), ('max_iterations', 'i8'),
+                        ('used', 'i8')])
+ENTRY_BYTES = ENTRY_DTYPE.itemsize
+
+# Inputs this large no longer fit in an int64 once scaled, they are not cached
+LARGEST_SCALED = 2.0 ** 62
+
+# Constants of the splitmix64 finalizer used to hash keys
+MIX_MULTIPLIERS = (np.uint64(0xbf58476d1ce4e5b9), np.uint64(0x94d049bb133111eb))
+MIX_INCREMENT = np.uint64(0x9e3779b97f4a7c15)
+
+
+# Memo of implied volatilities keyed on quantized (flag, premium, S, K, t, r, q)
+# with least recently used eviction once max_bytes is reached, recency
+# counted in lookup and store calls rather than single rows. Each entry
+# remembers the precision budget it was solved with, and only counts as a hit
+# for requests with the same or a looser budget.
+# Entries are kept as one numpy array per ENTRY_DTYPE field, sorted on the
+# hash of their key, so whole chains are looked up with a searchsorted
+# instead of a loop over rows.
+class IVCache(object):
+
+    # decimals is either one rounding for all inputs or one per
+    # (premium, S, K, t, r, q)
+    def __init__(self, max_bytes=64 * 2 ** 20, decimals=8):
+        if np.ndim(decimals) == 0:
+            decimals = (decimals,) * 6
+        if len(decimals) != 6:
+            raise Exception('Need one rounding per premium, S, K, t, r, q.')
+
+        self.decimals = tuple(int(d) for d in decimals)
+        self.max_entries = max(int(max_bytes // ENTRY_BYTES), 1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = 0  # Bumped on every lookup and store, for eviction
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __len__(self):
+        return len(self._entries['hash'])
+
+    # Quantized keys as an (n, 7) integer array, their hashes, and which
+    # rows can be cached at all (finite inputs of a sensible size)
+    def _keys(self, prices, S, K, t, r, q, flag):
+        columns = np.broadcast_arrays(
+            binary_flag(flag), np.asarray(prices, dtype=float),
+            np.asarray(S, dtype=float), np.asarray(K, dtype=float),
+            np.asarray(t, dtype=float), np.asarray(r, dtype=float),
+            np.asarray(q, dtype=float))
+        scaled = np.empty((columns[0].size, 7))
+        scaled[:, 0] = columns[0].ravel()
+        for i, (column, d) in enumerate(zip(columns[1:], self.decimals)):
+            scaled[:, i + 1] = np.rint(column.ravel() * 10.0 ** d)
+
+        valid = (np.abs(scaled) < LARGEST_SCALED).all(axis=1)  # False for NaN
+        scaled[~valid] = 0.0
+        keys = scaled.astype(np.int64)
+
+        hashes = np.zeros(len(keys), dtype=np.uint64)
+        for column in keys.T:
+            hashes = self._mix(hashes ^ column.view(np.uint64))
+        return keys, hashes, valid
+
+    @staticmethod
+    def _mix(x):
+        x = x + MIX_INCREMENT
+        x = (x ^ (x >> np.uint64(30))) * MIX_MULTIPLIERS[0]
+        x = (x ^ (x >> np.uint64(27))) * MIX_MULTIPLIERS[1]
+        return x ^ (x >> np.uint64(31))
+
+    # Position of the entry with each hash, -1 if there is none. The
+    # hashes are searched in order, which is much faster on large caches
+    def _find(self, hashes):
+        entries = self._entries['hash']
+        order = np.argsort(hashes)
+        positions = np.empty(len(hashes), dtype=np.intp)
+        positions[order] = np.searchsorted(entries, hashes[order])
+        found = positions < len(entries)
+        found[found] = entries[positions[found]] == hashes[found]
+        positions[~found] = -1
+        return positions
+
+    # Cached sigmas and status codes, plus the positions of rows not in the cache
+    def lookup(self, prices, S, K, t, r, q, flag, tolerance=1E-8,
+               max_iterations=100):
+        keys, hashes, valid = self._keys(prices, S, K, t, r, q, flag)
+        sigmas = np.full(len(keys), np.nan)
+        status = np.zeros(len(keys), dtype=np.int8)
+
+        with self._lock:
+            self._clock += 1
+            entries = self._entries
+            positions = self._find(hashes)
+            hit = valid & (positions >= 0)
+            used = positions[hit]
+            hit[hit] = ((entries['tolerance'][used] <= tolerance)
+                        & (entries['max_iterations'][used] >= max_iterations)
+                        & (entries['key'][used] == keys[hit]).all(axis=1))
+
+            used = positions[hit]
+            sigmas[hit] = entries['sigma'][used]
+            status[hit] = entries['status'][used]
+            entries['used'][used] = self._clock
+
+            missing = np.flatnonzero(~hit)
+            self.misses += missing.size
+            self.hits += len(keys) - missing.size
+
+        return sigmas, status, missing
+
+    # Add solved rows, evicting the least recently used ones beyond the budget
+    def store(self, prices, S, K, t, r, q, flag, sigmas, status,
+              tolerance=1E-8, max_iterations=100):
+        keys, hashes, valid = self._keys(prices, S, K, t, r, q, flag)
+        rows = np.flatnonzero(valid)
+
+        # Last row of each key, ordered by hash
+        _, last = np.unique(hashes[rows[::-1]], return_index=True)
+        rows = rows[::-1][last]
+        latest = dict(hash=hashes[rows], key=keys[rows],
+                      sigma=np.ravel(sigmas)[rows].astype(float),
+                      status=np.ravel(status)[rows].astype(np.int8),
+                      tolerance=np.full(rows.size, float(tolerance)),
+                      max_iterations=np.full(rows.size, int(max_iterations)))
+
+        with self._lock:
+            self._clock += 1
+            latest['used'] = np.full(rows.size, self._clock)
+            entries = self._entries
+            positions = self._find(latest['hash'])
+            known = positions >= 0
+
+            # Never replace a sigma with a less precise one. Same hash with
+            # another key is a collision, the newer key takes the slot
+            current = positions[known]
+            replace = ((entries['tolerance'][current] > tolerance)
+                       | (entries['max_iterations'][current] < max_iterations)
+                       | (entries['key'][current] != latest['key'][known]).any(axis=1))
+            for name in ENTRY_DTYPE.names:
+                entries[name][current[replace]] = latest[name][known][replace]
+            entries['used'][current] = self._clock
+
+            # New keys go in at their place in the hash order
+            new = ~known
+            if new.any():
+                at = np.searchsorted(entries['hash'], latest['hash'][new])
+                for name in ENTRY_DTYPE.names:
+                    entries[name] = np.insert(entries[name], at,
+                                              latest[name][new], axis=0)
+
+            excess = len(entries['hash']) - self.max_entries
+            if excess > 0:
+                oldest = np.argpartition(entries['used'], excess - 1)[:excess]
+                for name in ENTRY_DTYPE.names:
+                    entries[name] = np.delete(entries[name], oldest, axis=0)
+                self.evictions += excess
+
+    def clear(self):
+        with self._lock:
+            self._entries = dict(
+                (name, np.empty((0,) + ENTRY_DTYPE[name].shape,
+                                dtype=ENTRY_DTYPE[name].base))
+                for name in ENTRY_DTYPE.names)
+
+    # Counters for monitoring
+    def stats(self):
+        lookups = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses,
+                    evictions=self.evictions, size=len(self),
+                    hit_rate=float(self.hits) / lookups if lookups else 0.0)
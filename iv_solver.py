@@ -0,0 +1,284 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+
+# The vendored vollib under old/ has to be importable: the Procfile runs
+# gunicorn with --pythonpath old, anything else needs PYTHONPATH=old
+from vollib.helper import expiry_columns, expiry_table
+from vollib.helper import vectorized_binary_flag as binary_flag
+from vollib.helper.vectorized_lets_be_rational import (
+    implied_volatility_from_a_transformed_rational_guess_with_limited_iterations,
+    VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM,
+    VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC)
+
+
+# Quote status codes from the no-arbitrage prefilter
+QUOTE_VALID = 0
+QUOTE_NO_PREMIUM = 1  # Zero, negative or missing premium
+QUOTE_BAD_INPUTS = 2  # Non-positive spot, strike or time to expiry
+QUOTE_BELOW_INTRINSIC = 3
+QUOTE_ABOVE_MAXIMUM = 4
+
+# Precision budgets, (absolute vol tolerance, iteration cap) per element
+# 'display' is plenty for redrawing plots, 'full' is meant for exports.
+# Let's Be Rational is within about 1E-6 after one step and at machine
+# precision after two, so the tolerance is what a budget promises and what
+# caches compare, while the iteration cap sets the cost
+PRECISION_BUDGETS = {'display': (1E-4, 1), 'full': (1E-12, 2)}
+
+
+# Vectorized no-arbitrage check, one QUOTE_* status code per quote
+# Discounted intrinsic <= price < discounted spot (calls) or strike (puts)
+# The discount and dividend factors come from a vollib expiry table of the
+# quotes, built here unless one is given
+def quote_status(prices, S, K, t, r, q, flag, expiries=None):
+
+    theta = binary_flag(flag)
+    prices, S, K, t, r, q, theta = np.broadcast_arrays(
+        np.asarray(prices, dtype=float), np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float), np.asarray(t, dtype=float),
+        np.asarray(r, dtype=float), np.asarray(q, dtype=float), theta)
+
+    if expiries is None:
+        expiries = expiry_table(S, t, r, q)
+    dividend, discount = expiry_columns(
+        expiries, ['dividend_factor', 'discount_factor'], S=S, t=t, r=r, q=q)
+    status = np.full(prices.shape, QUOTE_VALID, dtype=np.int8)
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        spot = S * dividend
+        strike = K * discount
+        intrinsic = np.maximum(theta * (spot - strike), 0.0)
+        maximum = np.where(theta < 0, strike, spot)
+
+        status[prices >= maximum] = QUOTE_ABOVE_MAXIMUM
+        status[prices < intrinsic] = QUOTE_BELOW_INTRINSIC
+        status[~((S > 0.0) & (K > 0.0) & (t > 0.0))
+               | ~np.isfinite(spot) | ~np.isfinite(strike)] = QUOTE_BAD_INPUTS
+        status[~(prices > 0.0)] = QUOTE_NO_PREMIUM
+
+    return status
+
+
+# Batch Black-Scholes-Merton implied volatility
+# Same argument order as py_vollib's implied_volatility(price, S, K, t, r, q, flag),
+# but every argument may be an array. Quotes failing quote_status come back
+# as NaN without reaching the solver; pass return_status=True to get the codes.
+# The solve is the vendored vollib's vectorized Let's Be Rational, run for at
+# most max_iterations Householder steps from its rational initial guess.
+# Discount factors and forwards are worked out once per expiry in a vollib
+# expiry table shared by the prefilter and the solve
+def implied_volatility_batch(prices, S, K, t, r, q, flag,
+                             tolerance=1E-8, max_iterations=100,
+                             return_status=False):
+
+    theta = binary_flag(flag)
+    prices, S, K, t, r, q, theta = np.broadcast_arrays(
+        np.asarray(prices, dtype=float), np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float), np.asarray(t, dtype=float),
+        np.asarray(r, dtype=float), np.asarray(q, dtype=float), theta)
+    shape = prices.shape
+
+    # Built before flattening, so scalars stay out of the run comparisons
+    expiries = expiry_table(S, t, r, q)
+    status = quote_status(prices, S, K, t, r, q, theta, expiries).ravel()
+    sigmas = np.full(status.size, np.nan)
+
+    valid = np.flatnonzero(status == QUOTE_VALID)
+    if valid.size:
+        # Undiscount and move to forward terms, as py_vollib does
+        table, rows = expiries[0], expiries[1].ravel()[valid]
+        discount = table['discount_factor'][rows]
+        F = table['forward'][rows]
+        P, K, t, theta = [a.ravel()[valid] for a in (prices, K, t, theta)]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            solved = implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(
+                P / discount, F, K, t, theta, max_iterations)
+
+        # Rounding can still put a quote the prefilter let through out of range
+        above = solved == VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+        below = solved == VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC
+        status[valid[above]] = QUOTE_ABOVE_MAXIMUM
+        status[valid[below]] = QUOTE_BELOW_INTRINSIC
+        sigmas[valid] = np.where(above | below, np.nan, solved)
+
+    sigmas = sigmas.reshape(shape)
+    if return_status:
+        return sigmas, status.reshape(shape)
+    return sigmas
+
+
+# Incremental implied volatility between snapshots of the same chain
+# Contracts are identified by keys such as (type, strike, expiry); rows whose
+# inputs did not change reuse the previous sigma, the others are re-solved.
+# Sigmas solved with a looser budget than requested count
+# as changed. An engine such as iv_pool.ShardedIVEngine can take over the
+# re-solves.
+# The snapshot is kept as numpy arrays sorted on an int64 code per contract,
+# so matching a new snapshot is one searchsorted, skipped when the contracts
+# come in the same order as last time, and updates happen in place.
+# MultiIndex keys are encoded from their levels, much faster than tuples.
+class IncrementalIVSolver(object):
+
+    INPUTS = ['price', 'S', 'K', 't', 'r', 'q', 'theta']
+    COLUMNS = INPUTS + ['tolerance', 'max_iterations', 'sigma', 'status']
+
+    def __init__(self, tolerance=1E-8, max_iterations=100, engine=None):
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.engine = engine
+        self.reused = 0
+        self.solved = 0
+        self.reset()
+
+    # Forget the previous snapshot
+    def reset(self):
+        self._codes = np.empty(0, dtype=np.int64)  # Sorted contract codes
+        self._columns = np.empty((len(self.COLUMNS), 0))  # COLUMNS of each code
+        self._fields = None  # Per key field, sorted values seen and labels
+        self._last = None  # Codes, positions and COLUMNS of the last solve
+
+    # Previous snapshot as a frame of COLUMNS indexed on contract codes
+    @property
+    def snapshot(self):
+        if not self._codes.size:
+            return None
+        return pd.DataFrame(self._columns.T, index=self._codes,
+                            columns=self.COLUMNS)
+
+    # Unique values and their positions of every key field
+    @staticmethod
+    def _factorize(keys):
+        if isinstance(keys, pd.MultiIndex):
+            codes = keys.codes if hasattr(keys, 'codes') else keys.labels
+            return [(level.values, np.asarray(level_codes))
+                    for level, level_codes in zip(keys.levels, codes)]
+        if isinstance(keys, pd.Index):
+            fields = [keys.factorize()]
+        else:
+            # Tuples, typed one column at a time
+            frame = pd.DataFrame.from_records(list(keys))
+            fields = [pd.factorize(frame[column]) for column in frame.columns]
+        return [(np.asarray(uniques), codes) for codes, uniques in fields]
+
+    # One int64 code per contract, its fields' labels packed side by side.
+    # Labels are handed out on first sight and kept until reset, so a
+    # contract gets the same code in every snapshot. Label 0 is for missing
+    # values, which have position -1
+    def _encode(self, keys):
+        fields = self._factorize(keys)
+        bits = 63 // max(len(fields), 1)
+        if self._fields is None or len(self._fields) != len(fields):
+            self.reset()
+            self._fields = [(np.empty(0, dtype=uniques.dtype),
+                             np.empty(0, dtype=np.int64))
+                            for uniques, _ in fields]
+
+        codes = np.zeros(len(keys), dtype=np.int64)
+        for i, (uniques, positions) in enumerate(fields):
+            seen, labels = self._fields[i]
+            found = np.searchsorted(seen, uniques)
+            new = found >= seen.size
+            new[~new] = seen[found[~new]] != uniques[~new]
+            if new.any():
+                if seen.size + new.sum() >= (1 << bits) - 1:
+                    self.reset()  # Too many contracts seen, start over
+                    return self._encode(keys)
+                seen = np.concatenate([seen, uniques[new]])
+                labels = np.concatenate([labels, labels.size + 1
+                                         + np.arange(new.sum())])
+                order = np.argsort(seen, kind='mergesort')
+                seen, labels = seen[order], labels[order]
+                self._fields[i] = seen, labels
+                found = np.searchsorted(seen, uniques)
+            table = np.append(labels[found], 0)
+            codes = (codes << bits) | table[positions]
+        return codes
+
+    # Snapshot position of each code, -1 for contracts not in it
+    def _find(self, codes):
+        positions = np.searchsorted(self._codes, codes)
+        known = positions < self._codes.size
+        known[known] = self._codes[positions[known]] == codes[known]
+        positions[~known] = -1
+        return positions
+
+    def solve(self, keys, prices, S, K, t, r, q, flag, return_status=False,
+              tolerance=None, max_iterations=None):
+
+        if tolerance is None:
+            tolerance = self.tolerance
+        if max_iterations is None:
+            max_iterations = self.max_iterations
+
+        inputs = np.broadcast_arrays(
+            np.asarray(prices, dtype=float), np.asarray(S, dtype=float),
+            np.asarray(K, dtype=float), np.asarray(t, dtype=float),
+            np.asarray(r, dtype=float), np.asarray(q, dtype=float),
+            binary_flag(flag))
+        inputs = [a.reshape(-1) for a in inputs]  # Scalars stay unexpanded
+        codes = self._encode(keys)
+        n = codes.size
+        m = len(self.INPUTS)
+
+        # Previous COLUMNS of every row, NaN for new contracts. The rows of
+        # the last solve are kept in its order, so the same contracts in the
+        # same order need no lookup at all
+        if self._last is not None and np.array_equal(codes, self._last[0]):
+            positions, rows = self._last[1], self._last[2]
+        else:
+            positions = self._find(codes)
+            if self._codes.size:
+                rows = self._columns[:, positions]
+                rows[:, positions < 0] = np.nan
+            else:
+                rows = np.full((len(self.COLUMNS), n), np.nan)
+
+        # Unchanged if known with the same inputs, solved to the same budget
+        unchanged = (rows[m] <= tolerance) & (rows[m + 1] >= max_iterations)
+        for i, values in enumerate(inputs):
+            unchanged &= rows[i] == values
+
+        changed = np.flatnonzero(~unchanged)
+        if changed.size:
+            batch = (implied_volatility_batch if self.engine is None
+                     else self.engine.implied_volatility)
+            sigmas, status = batch(
+                *[values[changed] for values in inputs], tolerance=tolerance,
+                max_iterations=max_iterations, return_status=True)
+
+            for i, values in enumerate(inputs):
+                rows[i, changed] = values[changed]
+            rows[m, changed] = tolerance
+            rows[m + 1, changed] = max_iterations
+            rows[m + 2, changed] = sigmas
+            rows[m + 3, changed] = status
+            if self._store(codes[changed], positions[changed], rows[:, changed]):
+                positions = self._find(codes)
+
+        self._last = codes, positions, rows
+        self.reused += n - changed.size
+        self.solved += changed.size
+
+        if return_status:
+            return rows[m + 2].copy(), rows[m + 3].astype(np.int8)
+        return rows[m + 2].copy()
+
+    # Merge the latest rows into the snapshot, newest wins. Known contracts
+    # are overwritten in place, new ones are merged in keeping the order,
+    # which moves the others and is reported by returning True
+    def _store(self, codes, positions, columns):
+        known = positions >= 0
+        self._columns[:, positions[known]] = columns[:, known]
+
+        new = np.flatnonzero(~known)
+        if new.size:
+            # Last row of each new contract
+            _, last = np.unique(codes[new[::-1]], return_index=True)
+            new = new[::-1][last]
+            self._codes = np.concatenate([self._codes, codes[new]])
+            self._columns = np.hstack([self._columns, columns[:, new]])
+            order = np.argsort(self._codes, kind='mergesort')
+            self._codes = self._codes[order]
+            self._columns = self._columns[:, order]
+        return bool(new.size)
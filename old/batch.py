@@ -0,0 +1,161 @@
+# Run from the repository root, where snapshot_store lives, with the
+# scripts of old/ and their vollib on the path:
+#
+#     PYTHONPATH=old python -m batch <directory> --store <store>
+import os
+import sys
+import fnmatch
+import argparse
+import multiprocessing
+
+from quote_data import (CHUNK_SIZE, iter_quote_data, implied_volatilities,
+                        read_header)
+from snapshot_store import (DEFAULT_FORMAT, FORMATS, QUOTE_DATA_NAMES,
+                            PartitionWriter, partition_path, to_snapshot)
+
+
+# Processed files are appended to this file in the store, one
+# "path<TAB>size<TAB>mtime" line each, so reruns skip them
+CHECKPOINT = "_checkpoint"
+
+
+# Every QuoteData file under directory, sorted so runs are reproducible
+def find_quote_data(directory, pattern):
+
+    paths = []
+    for folder, _, filenames in os.walk(directory):
+        for filename in fnmatch.filter(filenames, pattern):
+            paths.append(os.path.abspath(os.path.join(folder, filename)))
+    return sorted(paths)
+
+
+# A file counts as done only while its size and modification time match
+def file_key(path):
+    info = os.stat(path)
+    return "%s\t%d\t%d" % (path, info.st_size, int(info.st_mtime))
+
+
+def read_checkpoint(store):
+    path = os.path.join(store, CHECKPOINT)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(line.rstrip("\n") for line in f if line.strip())
+
+
+# Files of the same ticker and quote date, say of two roots or downloaded
+# twice, would write the same partition and the last one would replace the
+# others. Maps each such path to the others, unreadable headers are left
+# for process_file to report
+def partition_collisions(store, paths):
+
+    partitions = {}
+    for path in paths:
+        try:
+            ticker, _, quote_date = read_header(path)
+        except Exception:
+            continue
+        partitions.setdefault(partition_path(store, ticker, quote_date), []).append(path)
+
+    collisions = {}
+    for same in partitions.values():
+        for path in same:
+            if len(same) > 1:
+                collisions[path] = [other for other in same if other != path]
+    return collisions
+
+
+# Parse, filter and solve one file chunk by chunk, each chunk written as a
+# part of its partition. Runs in the workers, errors are returned instead
+# of raised so one bad file does not stop the batch
+def process_file(task):
+
+    (path, store, rf_interest_rate, dividend_rate, direction, chunk_size,
+     store_format) = task
+    try:
+        ticker, underlying, quote_date, chunks = iter_quote_data(path, chunk_size)
+        with PartitionWriter(store, ticker, quote_date, store_format) as writer:
+            for df in chunks:
+
+                # Only options with a two sided market
+                df = df.fillna({"Bid": 0.0, "Ask": 0.0, "Vol": 0.0})
+                df = df[(df["Bid"] != 0.0) & (df["Ask"] != 0.0)].reset_index(drop=True)
+
+                # Files with an IV column keep it as the vendor's
+                df = df.rename(columns={"IV": "Vendor_IV"})
+                df["Underlying_Price"] = underlying
+                df["IV"] = implied_volatilities(df, underlying, quote_date,
+                                                rf_interest_rate, dividend_rate,
+                                                direction)
+                writer.write(to_snapshot(df, QUOTE_DATA_NAMES))
+
+        return path, "%s %s: %d options" % (ticker, quote_date, writer.rows), None
+    except Exception as error:
+        return path, None, "%s: %s" % (type(error).__name__, error)
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Implied volatilities of every CBOE QuoteData file under "
+                    "a directory, written to a snapshot store partitioned by "
+                    "ticker and date.")
+    parser.add_argument("directory")
+    parser.add_argument("--store", default="volatilities")
+    parser.add_argument("--pattern", default="QuoteData*.dat")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--rf-interest-rate", type=float, default=0.01)
+    parser.add_argument("--dividend-rate", type=float, default=0.03)
+    parser.add_argument("--direction", default="average",
+                        choices=["long", "short", "average"])
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="QuoteData rows held in memory per worker")
+    parser.add_argument("--format", default=DEFAULT_FORMAT, choices=sorted(FORMATS),
+                        help="snapshot part format, parquet needs pyarrow")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the checkpoint and process every file")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.store):
+        os.makedirs(args.store)
+
+    done = set() if args.restart else read_checkpoint(args.store)
+    paths = find_quote_data(args.directory, args.pattern)
+    todo = [path for path in paths if file_key(path) not in done]
+    print("%d QuoteData files, %d already processed"
+          % (len(paths), len(paths) - len(todo)))
+
+    # Colliding files are never processed, nor marked done
+    collisions = partition_collisions(args.store, paths)
+    failed = 0
+    for path in todo:
+        if path in collisions:
+            failed += 1
+            print("Failed %s (same ticker and quote date as %s)"
+                  % (path, ", ".join(collisions[path])))
+
+    tasks = [(path, args.store, args.rf_interest_rate, args.dividend_rate,
+              args.direction, args.chunk_size, args.format)
+             for path in todo if path not in collisions]
+    pool = multiprocessing.Pool(args.processes)
+    try:
+        with open(os.path.join(args.store, CHECKPOINT), "a") as checkpoint:
+            for path, summary, error in pool.imap_unordered(process_file, tasks):
+                if error is not None:
+                    failed += 1
+                    print("Failed %s (%s)" % (path, error))
+                    continue
+                checkpoint.write(file_key(path) + "\n")
+                checkpoint.flush()
+                print(summary)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+    print("Done! %d processed, %d failed" % (len(todo) - failed, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
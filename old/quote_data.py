@@ -0,0 +1,157 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from vollib.black_scholes_merton.implied_volatility import vectorized_implied_volatility
+from vollib.helper.vectorized_lets_be_rational import VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+
+
+# Contract descriptors look like "16 Nov 213.00 (SPY1625K213)": two digit
+# year, month, optional day, strike, then the symbol made of the root, year,
+# day, a month letter (A-L calls, M-X puts), the strike and an optional
+# exchange suffix such as "-B"
+DESCRIPTOR = (r'^\s*(?P<year>\d{2}) (?P<month>[A-Z][a-z]{2})(?: (?P<day>\d{1,2}))?'
+              r' (?P<strike>\d+(?:\.\d*)?)'
+              r'(?: \((?P<root>[A-Z]+)\d{2}(?P<symbol_day>\d{2})[A-X])?')
+
+MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+          'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+# Premium used for each side of the trade
+DIRECTIONS = ('long', 'short', 'average')
+
+
+# Ticker, underlying price and quote date from the two header lines
+def read_header(path):
+
+    with open(path) as data:
+        header1 = data.readline().split(",")
+        header2 = data.readline().split(",")
+
+    try:
+        ticker = header1[0].split()[0]
+        underlying = float(header1[1])
+        quote_date = dt.datetime.strptime(
+            " ".join(header2[0].split()[:3]), "%b %d %Y").date()
+    except (IndexError, ValueError):
+        raise Exception("Couldn't read QuoteData header. Maybe the format changed?")
+
+    return ticker, underlying, quote_date
+
+
+# Strike, expiry and root of every descriptor in one regex pass. The expiry
+# day comes from the descriptor or its symbol, else the third Friday
+def parse_descriptors(descriptors):
+
+    parts = pd.Series(descriptors).astype(str).str.extract(DESCRIPTOR, expand=True)
+    months = parts['month'].map(MONTHS)
+    bad = parts['strike'].isnull() | months.isnull()
+    if bad.any():
+        raise Exception('Unrecognized contract descriptor %r.'
+                        % pd.Series(descriptors)[bad.values].iloc[0])
+
+    year = 2000 + parts['year'].astype(int).values
+    month = (year - 1970) * 12 + months.values.astype(int) - 1
+    first = month.astype('M8[M]').astype('M8[D]')
+    day = parts['day'].fillna(parts['symbol_day'])
+    known = day.notnull().values
+    day = day.fillna(1).astype(int).values
+
+    expiry = np.where(known, first + (day - 1),
+                      np.busday_offset(first, 2, roll='forward', weekmask='Fri'))
+
+    return pd.DataFrame({'Strike': parts['strike'].astype(float).values,
+                         'Expiry': expiry,
+                         'Root': parts['root'].values},
+                        columns=['Strike', 'Expiry', 'Root'])
+
+
+# Rows per chunk of iter_quote_data, each holding a call and a put
+CHUNK_SIZE = 50000
+
+
+# Calls and puts of a block of QuoteData rows in one frame
+def _contracts(raw):
+
+    columns = list(raw.columns)
+    if 'Calls' not in columns or 'Puts' not in columns:
+        raise Exception("Couldn't find Calls and Puts in QuoteData.")
+
+    # Both halves have the same layout, pandas suffixes the put side with .1
+    split = columns.index('Puts')
+    names = ['Contract'] + columns[1:split]
+    calls = raw.iloc[:, :split]
+    puts = raw.iloc[:, split:split + len(names)]
+    calls.columns = puts.columns = names
+
+    # Rows keep their line number in the file, calls first then puts
+    frame = pd.concat([calls, puts])
+    frame.insert(0, 'Type', np.repeat(['c', 'p'], len(raw)))
+    frame = frame[frame['Contract'].notnull()].copy()
+
+    contracts = parse_descriptors(frame['Contract'].values)
+    for column in contracts.columns:
+        frame[column] = contracts[column].values
+
+    return frame
+
+
+def _read_csv(path, chunk_size=None):
+    return pd.read_csv(path, sep=",", header=2, skipinitialspace=True,
+                       encoding="utf-8", engine="c", chunksize=chunk_size)
+
+
+# Calls and puts of a QuoteData file in one frame, one row per contract with
+# Type ('c' or 'p'), Contract, Strike, Expiry, Root and the quote columns
+def read_quote_data(path):
+
+    ticker, underlying, quote_date = read_header(path)
+    return ticker, underlying, quote_date, _contracts(_read_csv(path))
+
+
+# Same as read_quote_data, but the frame comes as an iterator of frames of
+# at most 2 * chunk_size contracts, so memory stays bounded however large
+# the file is
+def iter_quote_data(path, chunk_size=CHUNK_SIZE):
+
+    ticker, underlying, quote_date = read_header(path)
+
+    def chunks():
+        for raw in _read_csv(path, chunk_size):
+            frame = _contracts(raw)
+            if len(frame.index):
+                yield frame
+
+    return ticker, underlying, quote_date, chunks()
+
+
+# Implied volatility of every row in one batch solve, 0.0 where there is none
+def implied_volatilities(frame, underlying, quote_date, rf_interest_rate,
+                         dividend_rate, direction="average", year=365.0):
+
+    if direction not in DIRECTIONS:
+        raise Exception('Direction must be one of %s.' % ', '.join(DIRECTIONS))
+
+    bid = frame['Bid'].values.astype(float)
+    ask = frame['Ask'].values.astype(float)
+    if direction == "long":
+        premium = bid
+    elif direction == "short":
+        premium = ask
+    else:
+        premium = (bid + ask) / 2.0
+
+    days = (frame['Expiry'].values.astype('M8[D]')
+            - np.datetime64(quote_date, 'D')).astype(int)
+
+    with np.errstate(all='ignore'):
+        sigma = vectorized_implied_volatility(
+            premium, underlying, frame['Strike'].values, days / year,
+            rf_interest_rate, dividend_rate, frame['Type'].values)
+
+    # Failed solves and the below intrinsic / above maximum signals
+    solved = (np.isfinite(sigma) & (sigma > 0.0)
+              & (sigma < VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM))
+    sigma[~solved | (days <= 0)] = 0.0
+    return sigma
@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# As PYTHONPATH=old python -m batch from the repository root
+OLD = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [OLD, os.path.dirname(OLD)]
+from batch import CHECKPOINT, main, read_checkpoint
+from snapshot_store import partition_path, read_partition
+
+QUOTE_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'data', 'QuoteData.dat')
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = os.path.join(self.directory, 'store')
+        self.quote_data = os.path.join(self.directory, 'in', 'QuoteData.dat')
+        os.makedirs(os.path.dirname(self.quote_data))
+        shutil.copy(QUOTE_DATA, self.quote_data)
+        self.partition = partition_path(self.store, 'SPY', '2016-11-14')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_batch(self, *options, **kwargs):
+        argv = [os.path.dirname(self.quote_data), '--store', self.store,
+                '--processes', '1', '--chunk-size', '4'] + list(options)
+        self.assertEqual(main(argv), kwargs.get('status', 0))
+        return os.path.realpath(self.partition)
+
+    def test_writes_partition_and_checkpoint(self):
+        self.run_batch()
+        data = read_partition(self.store, 'SPY', '2016-11-14')
+        self.assertEqual(len(data.index), 11)  # One call without a market
+        self.assertTrue((data['IV'] > 0).all())
+        self.assertEqual(len(read_checkpoint(self.store)), 1)
+
+    def test_resume_skips_processed_files(self):
+        version = self.run_batch()
+        self.assertEqual(self.run_batch(), version)
+        with open(os.path.join(self.store, CHECKPOINT)) as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_modified_file_is_processed_again(self):
+        version = self.run_batch()
+        info = os.stat(self.quote_data)
+        os.utime(self.quote_data, (info.st_atime, info.st_mtime + 10))
+        self.assertNotEqual(self.run_batch(), version)
+        self.assertEqual(len(read_checkpoint(self.store)), 2)
+
+    def test_files_of_the_same_partition_fail(self):
+        version = self.run_batch()
+        again = os.path.join(os.path.dirname(self.quote_data), 'QuoteData (1).dat')
+        shutil.copy(QUOTE_DATA, again)
+        self.assertEqual(self.run_batch(status=1), version)
+        self.assertEqual(len(read_checkpoint(self.store)), 1)
+
+        # Neither is processed until one of them is removed
+        self.assertEqual(self.run_batch('--restart', status=1), version)
+        os.remove(again)
+        self.assertNotEqual(self.run_batch('--restart'), version)
+
+    def test_restart_ignores_checkpoint(self):
+        version = self.run_batch()
+        self.assertNotEqual(self.run_batch('--restart'), version)
+
+
+if __name__ == '__main__':
+    unittest.main()
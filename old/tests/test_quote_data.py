@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+# The scripts in old/ and their vollib
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from quote_data import (iter_quote_data, parse_descriptors, read_header,
+                        read_quote_data)
+
+QUOTE_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'data', 'QuoteData.dat')
+
+
+class TestDescriptors(unittest.TestCase):
+
+    def test_explicit_day(self):
+        parts = parse_descriptors(['16 Nov 18 210.00 (SPY1618K210)'])
+        self.assertEqual(parts['Expiry'][0], pd.Timestamp('2016-11-18'))
+        self.assertEqual(parts['Strike'][0], 210.)
+        self.assertEqual(parts['Root'][0], 'SPY')
+
+    def test_day_from_symbol(self):
+        parts = parse_descriptors(['16 Nov 213.00 (SPY1625K213)',
+                                   '17 Jan 220.00 (SPY1720M220-E)'])
+        self.assertEqual(list(parts['Expiry']), [pd.Timestamp('2016-11-25'),
+                                                 pd.Timestamp('2017-01-20')])
+
+    def test_third_friday_default(self):
+        parts = parse_descriptors(['16 Dec 210.00', '17 Sep 100.5', '16 Jul 50'])
+        self.assertEqual(list(parts['Expiry']), [pd.Timestamp('2016-12-16'),
+                                                 pd.Timestamp('2017-09-15'),
+                                                 pd.Timestamp('2016-07-15')])
+        self.assertEqual(list(parts['Strike']), [210., 100.5, 50.])
+        self.assertTrue(parts['Root'].isnull().all())
+
+    def test_unrecognized_descriptor(self):
+        self.assertRaises(Exception, parse_descriptors, ['16 Dec 210.00', 'SPY Dec 210'])
+
+
+class TestQuoteData(unittest.TestCase):
+
+    def test_header(self):
+        ticker, underlying, quote_date = read_header(QUOTE_DATA)
+        self.assertEqual((ticker, underlying), ('SPY', 213.5))
+        self.assertEqual(str(quote_date), '2016-11-14')
+
+    def test_calls_and_puts(self):
+        _, _, _, frame = read_quote_data(QUOTE_DATA)
+        self.assertEqual(list(frame['Type']), ['c'] * 6 + ['p'] * 6)
+        self.assertEqual(sorted(set(frame['Expiry'].dt.strftime('%Y-%m-%d'))),
+                         ['2016-11-18', '2016-12-16', '2017-01-20'])
+        self.assertEqual(frame['Bid'].iloc[6], .58)
+
+    def test_chunks_match_whole_file(self):
+        _, _, _, frame = read_quote_data(QUOTE_DATA)
+        _, _, _, chunks = iter_quote_data(QUOTE_DATA, chunk_size=4)
+        chunks = list(chunks)
+        self.assertEqual([len(chunk.index) for chunk in chunks], [8, 4])
+        columns = ['Type', 'Contract', 'Strike', 'Expiry', 'Bid', 'Ask']
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks)[columns].sort_values(['Type', 'Contract']).reset_index(drop=True),
+            frame[columns].sort_values(['Type', 'Contract']).reset_index(drop=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.american
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Copyright © 2015 Iota Technologies Pte Ltd
+
+    Vectorized prices of American options on a dividend paying
+    underlying (continuous yield q):
+
+      ======================================================================================
+      vectorized_barone_adesi_whaley    quadratic approximation, Barone-Adesi & Whaley (1987)
+      vectorized_binomial               Cox-Ross-Rubinstein lattice, all options at once
+      ======================================================================================
+
+    Both take the same arguments as
+    vollib.black_scholes_merton.vectorized_black_scholes_merton.
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+
+# Related third party imports
+import numpy
+
+# Local application/library specific imports
+from vollib.black_scholes_merton import _broadcast
+from vollib.black_scholes_merton import vectorized_black_scholes_merton
+from vollib.helper import vectorized_binary_flag
+from vollib.helper.normaldistribution import norm_cdf, norm_pdf
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+# Relative accuracy and iteration cap of the critical price search
+CRITICAL_PRICE_TOLERANCE = 1E-10
+CRITICAL_PRICE_MAX_ITERATIONS = 100
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - BARONE-ADESI AND WHALEY
+
+def _critical_price(theta, K, t, r, sigma, q, q_exponent):
+
+    """Solve for the underlying price at which immediate exercise becomes
+    optimal, with the iteration and seed of Haug, "The Complete Guide to
+    Option Pricing Formulas," 2nd edition, section 3.3.1.
+
+    theta(S* - K) = c(S*) + theta(1 - exp(-q*t) N(theta d1(S*))) S*/q_exponent
+    """
+
+    b = r - q
+    v = sigma * numpy.sqrt(t)
+    carry = numpy.exp(-q*t)
+
+    # Seed from the perpetual (t -> infinity) critical price
+    n = 2*b / (sigma*sigma)
+    q_infinity = (-(n - 1) + theta*numpy.sqrt((n - 1)**2 + 8*r / (sigma*sigma))) / 2
+    s_infinity = K / (1 - 1/q_infinity)
+    # h <= 0 keeps the seed between K and s_infinity at low volatility
+    h = numpy.minimum(-(b*t + theta*2*v) * K / (s_infinity - K), 0.)
+    critical = K + (s_infinity - K) * (1 - numpy.exp(h))
+
+    active = numpy.arange(critical.size)
+    for _ in range(CRITICAL_PRICE_MAX_ITERATIONS):
+        th, Si, k, qe = theta[active], critical[active], K[active], q_exponent[active]
+        c = carry[active]
+        D1 = (numpy.log(Si/k) + (b[active] + 0.5*sigma[active]**2)*t[active]) / v[active]
+        N1 = norm_cdf(th*D1)
+        rhs = (vectorized_black_scholes_merton(th, Si, k, t[active], r[active], sigma[active], q[active])
+               + th*(1 - c*N1)*Si/qe)
+        slope = th*c*N1*(1 - 1/qe) + (th - c*norm_pdf(D1)/v[active])/qe
+
+        converged = numpy.abs(th*(Si - k) - rhs) <= CRITICAL_PRICE_TOLERANCE*k
+        critical[active] = numpy.where(converged, Si, (k + th*rhs - th*slope*Si) / (1 - th*slope))
+        active = active[~converged]
+        if not active.size:
+            break
+
+    return critical
+
+
+def _barone_adesi_whaley_early_exercise(theta, S, K, t, r, sigma, q, european):
+
+    """Early exercise premium added to the European prices, for options
+    where early exercise can be optimal."""
+
+    b = r - q
+    variance = sigma*sigma
+    n = 2*b / variance
+    # 2r / (sigma^2 (1 - exp(-r t))), with its r -> 0 limit
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        m_over_k = numpy.where(numpy.abs(r*t) > 1E-12, 2*r / (variance * -numpy.expm1(-r*t)),
+                               2 / (variance*t))
+    q_exponent = (-(n - 1) + theta*numpy.sqrt((n - 1)**2 + 4*m_over_k)) / 2
+
+    critical = _critical_price(theta, K, t, r, sigma, q, q_exponent)
+    D1 = (numpy.log(critical/K) + (b + 0.5*variance)*t) / (sigma*numpy.sqrt(t))
+    A = theta * (critical/q_exponent) * (1 - numpy.exp(-q*t)*norm_cdf(theta*D1))
+
+    # (S/critical)**q_exponent only overflows where exercise is immediate
+    exercise = theta*(S - critical) >= 0
+    with numpy.errstate(over='ignore', invalid='ignore'):
+        return numpy.where(exercise, theta*(S - K), european + A*(S/critical)**q_exponent)
+
+
+def vectorized_barone_adesi_whaley(flag, S, K, t, r, sigma, q):
+
+    """Return Barone-Adesi and Whaley approximations of American option
+    prices, all arguments broadcast against each other.
+
+    Calls with q <= 0 and puts with r <= 0 are never exercised early and
+    get the Black-Scholes-Merton price.  Where t or sigma is zero the
+    price is the larger of that and the intrinsic value.
+
+    :param flag: +1/-1 or 'c'/'p' for call or put, or an array of them
+    :type flag: int, str or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+
+    >>> p = vectorized_barone_adesi_whaley(['p', 'c', 'c'], 100, 100, .5, .05, .3, [.0, .0, .05])
+    >>> abs(p[1] - vectorized_black_scholes_merton('c', 100, 100, .5, .05, .3, 0.)) < 1e-12
+    True
+    >>> bool(p[0] > vectorized_black_scholes_merton('p', 100, 100, .5, .05, .3, 0.))
+    True
+    >>> print(vectorized_barone_adesi_whaley('p', 50, 100, .5, .05, .3, 0.).round(10))
+    50.0
+    """
+
+    theta, S, K, t, r, sigma, q = _broadcast(vectorized_binary_flag(flag), S, K, t, r, sigma, q)
+    shape = theta.shape
+    theta, S, K, t, r, sigma, q = [a.ravel() for a in (theta, S, K, t, r, sigma, q)]
+
+    european = vectorized_black_scholes_merton(theta, S, K, t, r, sigma, q)
+    price = numpy.maximum(european, theta*(S - K))
+    early = (((theta > 0) & (q > 0)) | ((theta < 0) & (r > 0))) & (sigma*numpy.sqrt(t) > 0)
+    if early.any():
+        i = numpy.flatnonzero(early)
+        price[i] = _barone_adesi_whaley_early_exercise(
+            theta[i], S[i], K[i], t[i], r[i], sigma[i], q[i], european[i])
+
+    return price.reshape(shape)
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - BINOMIAL LATTICE
+
+def vectorized_binomial(flag, S, K, t, r, sigma, q, steps=200, american=True):
+
+    """Return Cox-Ross-Rubinstein lattice prices of options, all arguments
+    broadcast against each other.
+
+    Options with the same S, t, r, sigma and q, such as the strikes of
+    one expiry, share a single lattice of spot prices and only their
+    payoffs are computed per option.  The backward induction of all
+    options runs in the same pass: each of the steps is one array
+    operation over (options x nodes).  Options with too little volatility
+    for a lattice get the larger of the Black-Scholes-Merton price and the
+    intrinsic value.
+
+    :param flag: +1/-1 or 'c'/'p' for call or put, or an array of them
+    :type flag: int, str or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+    :param steps: number of time steps of the lattice
+    :type steps: int
+    :param american: allow early exercise, else price European options
+    :type american: bool
+
+    >>> p = vectorized_binomial('c', 100, [90, 100, 110], .5, .05, .3, 0., steps=500, american=False)
+    >>> numpy.abs(p - vectorized_black_scholes_merton('c', 100, [90, 100, 110], .5, .05, .3, 0.)).max() < .01
+    True
+    >>> a = vectorized_binomial('p', 100, 100, .5, .05, .3, 0., steps=500)
+    >>> abs(a - vectorized_barone_adesi_whaley('p', 100, 100, .5, .05, .3, 0.)) < .02
+    True
+    """
+
+    theta, S, K, t, r, sigma, q = _broadcast(vectorized_binary_flag(flag), S, K, t, r, sigma, q)
+    shape = theta.shape
+    theta, S, K, t, r, sigma, q = [a.ravel() for a in (theta, S, K, t, r, sigma, q)]
+
+    # One lattice per distinct (S, t, r, sigma, q), option i uses group[i]
+    markets, group = numpy.unique(numpy.column_stack([S, t, r, sigma, q]), axis=0,
+                                  return_inverse=True)
+    group = group.ravel()
+    S_, t_, r_, sigma_, q_ = [a[:, None] for a in markets.T]
+
+    # Zero total volatility, or so little that the up probability leaves
+    # [0, 1] (sigma sqrt(dt) <= |r - q| dt): priced in closed form below
+    dt = t_ / steps
+    degenerate = ~(sigma_*numpy.sqrt(dt) > numpy.abs(r_ - q_)*dt)
+    dt = numpy.where(degenerate, 1., dt)
+    up = numpy.exp(numpy.where(degenerate, 1., sigma_) * numpy.sqrt(dt))
+    p = ((numpy.exp((r_ - q_)*dt) - 1/up) / (up - 1/up))[group]
+    discount = numpy.exp(-r_*dt)[group]
+
+    # Spot prices S u^k, k = -steps..steps, cover every node: node j of
+    # step i is k = 2j - i. The exercise values of step i are then a
+    # strided view of the option's row, with no arithmetic per step
+    levels = numpy.arange(-steps, steps + 1) if american else numpy.arange(-steps, steps + 1, 2)
+    exercise = numpy.maximum(theta[:, None]*((S_ * up**levels)[group] - K[:, None]), 0.)
+    values = exercise[:, ::2] if american else exercise
+    for i in range(steps - 1, -1, -1):
+        values = discount * (p*values[:, 1:i + 2] + (1 - p)*values[:, :i + 1])
+        if american:
+            values = numpy.maximum(values, exercise[:, steps - i:steps + i + 1:2])
+
+    price = values[:, 0]
+    degenerate = degenerate[group, 0]
+    if degenerate.any():
+        i = numpy.flatnonzero(degenerate)
+        args = [a[i] for a in (theta, S, K, t, r, sigma, q)]
+        price[i] = vectorized_black_scholes_merton(*args)
+        if american:
+            price[i] = numpy.maximum(price[i], args[0]*(args[1] - args[2]))
+
+    return price.reshape(shape)
+
+
+# -----------------------------------------------------------------------------
+# MAIN
+if __name__=='__main__':
+    import doctest
+    if not doctest.testmod().failed:
+        print("Doctest passed")
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.american.implied_volatility
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Copyright © 2015 Iota Technologies Pte Ltd
+
+    Implied volatilities of American option prices, solved for whole
+    chains at once by a bracketed secant (Illinois) iteration on the
+    prices of vollib.american.
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+
+# Related third party imports
+import numpy
+
+# Local application/library specific imports
+from vollib.american import vectorized_barone_adesi_whaley
+from vollib.american import vectorized_binomial
+from vollib.black_scholes_merton import _broadcast
+from vollib.helper import vectorized_binary_flag
+from vollib.helper.vectorized_lets_be_rational import VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+from vollib.helper.vectorized_lets_be_rational import VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+MODELS = {
+    'baw': vectorized_barone_adesi_whaley,
+    'crr': vectorized_binomial,
+}
+
+# Volatility bracket searched for every price
+SIGMA_LOWER = 1E-4
+SIGMA_UPPER = 5.0
+
+# Prices matched to this relative accuracy count as solved
+PRICE_TOLERANCE = 1E-12
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS
+
+def vectorized_implied_volatility(price, S, K, t, r, q, flag, model='baw', tolerance=1E-8,
+                                  max_iterations=100, **model_args):
+
+    """Calculate the implied volatility of arrays of American option
+    prices.
+
+    Every price is bracketed between SIGMA_LOWER and SIGMA_UPPER and
+    solved by regula falsi with the Illinois modification, all options
+    in the same array evaluations of the pricing model.  Prices below the
+    model price at SIGMA_LOWER or above the one at SIGMA_UPPER give the
+    signal values of vollib.helper.vectorized_lets_be_rational.  Prices
+    equal to the model price at SIGMA_LOWER, such as deep in-the-money
+    puts at their exercise value, are matched by a whole range of
+    volatilities and give NaN.
+
+    :param price: the American option price
+    :type price: float or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+    :param flag: 'c' or 'p' for call or put, or an array of them
+    :type flag: str or numpy.ndarray
+    :param model: 'baw' (Barone-Adesi and Whaley) or 'crr' (binomial lattice)
+    :type model: str
+    :param tolerance: width of the volatility bracket at which to stop
+    :type tolerance: float
+    :param max_iterations: maximum number of pricing passes
+    :type max_iterations: int
+    :param model_args: passed to the pricing model, e.g. steps for 'crr'
+
+    >>> K = numpy.array([90., 100., 110.])
+    >>> prices = vectorized_barone_adesi_whaley('p', 100, K, .5, .05, .3, 0.)
+    >>> iv = vectorized_implied_volatility(prices, 100, K, .5, .05, 0., 'p')
+    >>> numpy.abs(iv - .3).max() < 1e-8
+    True
+    >>> iv = vectorized_implied_volatility([5., 200.], 100, 100, .5, .05, 0., 'p')
+    >>> iv[1] == VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+    True
+    >>> print(vectorized_implied_volatility(50., 100, 150, .5, .05, 0., 'p'))
+    nan
+    """
+
+    if model not in MODELS:
+        raise ValueError('Unknown American pricing model %r, expected one of %s'
+                         % (model, ', '.join(sorted(MODELS))))
+    pricing_function = MODELS[model]
+
+    price, S, K, t, r, q, theta = _broadcast(price, S, K, t, r, q, vectorized_binary_flag(flag))
+    shape = price.shape
+    price, S, K, t, r, q, theta = [a.ravel() for a in (price, S, K, t, r, q, theta)]
+
+    def error(sigma, i):
+        return pricing_function(theta[i], S[i], K[i], t[i], r[i], sigma, q[i], **model_args) - price[i]
+
+    everything = numpy.arange(price.size)
+    lower = numpy.full(price.size, SIGMA_LOWER)
+    upper = numpy.full(price.size, SIGMA_UPPER)
+    f_lower = error(lower, everything)
+    f_upper = error(upper, everything)
+
+    sigma = numpy.full(price.size, numpy.nan)
+    sigma[f_lower > 0] = VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC
+    sigma[f_upper < 0] = VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+
+    # Prices already matched at the lowest volatility are not identifiable
+    # and stay NaN, the search would only return SIGMA_LOWER for them
+    floor = numpy.abs(f_lower) <= PRICE_TOLERANCE*(1 + numpy.abs(price))
+
+    # Which end of the bracket moved last: +1 upper, -1 lower
+    side = numpy.zeros(price.size, dtype=int)
+    active = numpy.flatnonzero((f_lower < 0) & ~floor & (f_upper >= 0))
+    for _ in range(max_iterations):
+        if not active.size:
+            break
+        a, b, fa, fb = lower[active], upper[active], f_lower[active], f_upper[active]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            c = numpy.where(fb != fa, (a*fb - b*fa) / (fb - fa), 0.5*(a + b))
+        fc = error(c, active)
+
+        # Replace the end on the same side of the root, and halve the
+        # other end's error when the same end moves twice in a row
+        moves_upper = fc > 0
+        lower[active] = numpy.where(moves_upper, a, c)
+        upper[active] = numpy.where(moves_upper, c, b)
+        f_lower[active] = numpy.where(moves_upper, numpy.where(side[active] == 1, 0.5*fa, fa), fc)
+        f_upper[active] = numpy.where(moves_upper, fc, numpy.where(side[active] == -1, 0.5*fb, fb))
+        side[active] = numpy.where(moves_upper, 1, -1)
+
+        sigma[active] = c
+        converged = ((numpy.abs(fc) <= PRICE_TOLERANCE*(1 + price[active]))
+                     | (upper[active] - lower[active] <= tolerance))
+        active = active[~converged]
+
+    return sigma.reshape(shape)
+
+
+# -----------------------------------------------------------------------------
+# MAIN
+if __name__=='__main__':
+    import doctest
+    if not doctest.testmod().failed:
+        print("Doctest passed")
@@ -47,9 +47,13 @@ from numpy import log, sqrt, exp
 
 
 # Local application/library specific imports
+from vollib.helper import _runs
 from vollib.helper import binary_flag
+from vollib.helper import expiry_columns
 from vollib.helper import pdf
-from lets_be_rational import norm_cdf as cnd
+from vollib.helper import vectorized_binary_flag
+from vollib.helper import vectorized_lets_be_rational
+from vollib.helper.normaldistribution import norm_cdf as cnd
 
 # -----------------------------------------------------------------------------
 # FUNCTIONS - INTERNAL, FOR COMPARISON
@@ -320,22 +324,115 @@ def test_python_vs_c_values():
     >>> v1 = black('c', F, K, t, r, sigma)
     >>> v2 = black_call(F, K, t, r, sigma)
     
-    >>> print abs(v1-v2) < epsilon
+    >>> print(abs(v1-v2) < epsilon)
     True
     
     
     >>> v1 = black('p', F, K, t, r, sigma)
     >>> v2 = black_put(F, K, t, r, sigma)
-    >>> print abs(v1-v2) < epsilon
+    >>> print(abs(v1-v2) < epsilon)
     True
     """
     pass
 
 
 
+# -----------------------------------------------------------------------------
+# FUNCTIONS - VECTORIZED
+
+def discount_factors(r, t):
+
+    """Calculate exp(-r*t) for arrays of options, evaluating the
+    exponential once per run of equal consecutive (r, t) pairs.  A chain
+    grouped by expiry therefore costs one exponential per expiry; any
+    other order gives the same result, just with less reuse.
+
+    :param r: the risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+
+    >>> print(discount_factors(.02, [.5, .5, 1., 1.]).round(6).tolist())
+    [0.99005, 0.99005, 0.980199, 0.980199]
+    """
+
+    r, t = numpy.broadcast_arrays(numpy.asarray(r, dtype=float), numpy.asarray(t, dtype=float))
+    shape = r.shape
+    r, t = r.ravel(), t.ravel()
+    starts, lengths = _runs(r, t)
+    return numpy.repeat(numpy.exp(-r[starts]*t[starts]), lengths).reshape(shape)
+
+
+def vectorized_undiscounted_black(F, K, sigma, t, flag):
+
+    """Calculate the **undiscounted** Black price of arrays of options,
+    all arguments broadcast against each other.
+
+    :param F: underlying futures price, e.g. one per expiry
+    :type F: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param flag: 'c' or 'p' for call or put, or an array of them
+    :type flag: str or numpy.ndarray
+
+    >>> p = vectorized_undiscounted_black(100, [100, 110], .2, .5, 'c')
+    >>> abs(p[0] - undiscounted_black(100, 100, .2, .5, 'c')) < 1e-12
+    True
+    """
+
+    return vectorized_lets_be_rational.black(F, K, sigma, t, vectorized_binary_flag(flag))
+
+
+def vectorized_black(flag, F, K, t, r, sigma, expiries=None):
+
+    """Calculate the (discounted) Black price of arrays of options, all
+    arguments broadcast against each other.
+
+    :param flag: 'c' or 'p' for call or put, or an array of them
+    :type flag: str or numpy.ndarray
+    :param F: underlying futures price, e.g. one per expiry
+    :type F: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: the risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param expiries: (table, index) from vollib.helper.expiry_table for
+        these options, built with S=F and q=r, whose discount factors are
+        then reused when the same chain is priced repeatedly
+    :type expiries: tuple or None
+
+    >>> p = vectorized_black(['c', 'p'], 100, 100, .5, .02, .2)
+    >>> abs(p[0] - black('c', 100, 100, .5, .02, .2)) < 1e-12
+    True
+    >>> abs(p[1] - black('p', 100, 100, .5, .02, .2)) < 1e-12
+    True
+    """
+
+    return vectorized_undiscounted_black(F, K, sigma, t, flag) * _discount_factor(expiries, t, r, F, K, sigma)
+
+
+def _discount_factor(expiries, t, r, *others):
+
+    """exp(-r*t) for every contract, from the expiry table if there is
+    one, the contracts being the other arguments broadcast with t and r."""
+
+    if expiries is None:
+        return discount_factors(r, t)
+    t, r = numpy.broadcast_arrays(*[numpy.asarray(a, dtype=float) for a in (t, r) + others])[:2]
+    return expiry_columns(expiries, ['discount_factor'], t=t, r=r)[0]
+
+
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
@@ -224,4 +224,4 @@ def test():
 if __name__=='__main__':  
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
@@ -36,6 +36,7 @@
 # IMPORTS
 
 # Standard library imports
+from __future__ import print_function
 from math import e
 
 # Related third party imports
@@ -46,6 +47,9 @@ import numpy
 from vollib.black import black
 from vollib.black import undiscounted_black
 from vollib.black import normalised_black
+from vollib.black import _discount_factor
+from vollib.helper import vectorized_binary_flag
+from vollib.helper import vectorized_lets_be_rational
 
 # -----------------------------------------------------------------------------
 # DATA
@@ -77,9 +81,9 @@ def normalised_implied_volatility(beta, x, flag):
     >>> beta_put = normalised_black(0.1,0.23232323888,'p')
     >>> normalized_b76_iv_call = normalised_implied_volatility(beta_call, 0.0, 'c')
     >>> normalized_b76_iv_put = normalised_implied_volatility(beta_put, 0.1, 'p')
-    >>> print beta_call, normalized_b76_iv_call
+    >>> print(beta_call, normalized_b76_iv_call)
     0.0796556745541 0.2
-    >>> print beta_put, normalized_b76_iv_put
+    >>> print(beta_put, normalized_b76_iv_put)
     0.0509710222785 0.23232323888
     """    
 
@@ -105,9 +109,9 @@ def normalised_implied_volatility_limited_iterations(beta, x, flag, N):
     >>> beta_put = normalised_black(0.1,0.23232323888,'p')
     >>> normalized_b76_iv_call = normalised_implied_volatility_limited_iterations(beta_call, 0.0, 'c',1)
     >>> normalized_b76_iv_put = normalised_implied_volatility_limited_iterations(beta_put, 0.1, 'p',1)
-    >>> print beta_call, normalized_b76_iv_call
+    >>> print(beta_call, normalized_b76_iv_call)
     0.0796556745541 0.2
-    >>> print beta_put, normalized_b76_iv_put
+    >>> print(beta_put, normalized_b76_iv_put)
     0.0509710222785 0.23232323888
     """    
 
@@ -138,7 +142,7 @@ def implied_volatility_of_undiscounted_option_price(undiscounted_option_price, F
     >>> iv = implied_volatility_of_undiscounted_option_price(
     ... undiscounted_call_price, F, K, t, flag)
 
-    >>> print undiscounted_call_price, iv
+    >>> print(undiscounted_call_price, iv)
     5.6371977797 0.2
     """
 
@@ -180,7 +184,7 @@ def implied_volatility_of_discounted_option_price(discounted_option_price, F, K,
     >>> iv = implied_volatility_of_discounted_option_price(
     ... discounted_call_price, F, K, r, t, flag)
 
-    >>> print discounted_call_price, iv
+    >>> print(discounted_call_price, iv)
     5.5811067246 0.2
     """
     
@@ -223,7 +227,7 @@ def implied_volatility_of_undiscounted_option_price_limited_iterations(
     >>> iv = implied_volatility_of_undiscounted_option_price_limited_iterations(
     ... price, F, K, t, flag, 1)
 
-    >>> print price, iv    
+    >>> print(price, iv)
     6.54635543387 0.232323232
     """  
 
@@ -236,9 +240,123 @@ def implied_volatility_of_undiscounted_option_price_limited_iterations(
         N
     )
 
+# -----------------------------------------------------------------------------
+# FUNCTIONS - VECTORIZED IMPLIED VOLATILITY
+
+def vectorized_normalised_implied_volatility(beta, x, flag):
+
+    """Calculate the normalised Black implied volatility of whole arrays
+    of options at once, using the numpy port of LetsBeRational.
+
+    Prices below intrinsic or above the maximum do not raise, but give
+    VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC or
+    VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM respectively.
+
+    :param beta: the normalized Black price
+    :type beta: float or numpy.ndarray
+    :param x: ln(F/K) where K is the strike price, and F is the futures price
+    :type x: float or numpy.ndarray
+    :param flag: 'p' or 'c' for put or call
+    :type flag: str or numpy.ndarray
+
+    >>> beta = numpy.array([normalised_black(0.0, 0.2, 'c'), normalised_black(0.1, 0.23232323888, 'p')])
+    >>> s = vectorized_normalised_implied_volatility(beta, [0.0, 0.1], ['c', 'p'])
+    >>> numpy.abs(s - [0.2, 0.23232323888]).max() < 1e-14
+    True
+    """
+
+    return vectorized_lets_be_rational.normalised_implied_volatility_from_a_transformed_rational_guess(
+        beta, x, vectorized_binary_flag(flag))
+
+
+def vectorized_normalised_implied_volatility_limited_iterations(beta, x, flag, N):
+
+    """Calculate the normalised Black implied volatility of whole arrays
+    of options at once, with limited iterations.
+
+    :param beta: the normalized Black price
+    :type beta: float or numpy.ndarray
+    :param x: ln(F/K) where K is the strike price, and F is the futures price
+    :type x: float or numpy.ndarray
+    :param flag: 'p' or 'c' for put or call
+    :type flag: str or numpy.ndarray
+    :param N: the maximum number of iterations to perform
+    :type N: int
+
+    >>> beta = numpy.array([normalised_black(0.0, 0.2, 'c'), normalised_black(0.1, 0.23232323888, 'p')])
+    >>> s = vectorized_normalised_implied_volatility_limited_iterations(beta, [0.0, 0.1], ['c', 'p'], 1)
+    >>> numpy.abs(s - [0.2, 0.23232323888]).max() < 1e-14
+    True
+    """
+
+    return vectorized_lets_be_rational.normalised_implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(
+        beta, x, vectorized_binary_flag(flag), N)
+
+
+def vectorized_implied_volatility_of_undiscounted_option_price(undiscounted_option_price, F, K, t, flag):
+
+    """Calculate the implied volatility of arrays of undiscounted Black
+    option prices.
+
+    :param undiscounted_option_price: undiscounted Black price of a futures option
+    :type undiscounted_option_price: float or numpy.ndarray
+    :param F: underlying futures price
+    :type F: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param flag: 'p' or 'c' for put or call
+    :type flag: str or numpy.ndarray
+
+    >>> prices = [undiscounted_black(100, k, .2, .5, 'p') for k in [90, 100, 110]]
+    >>> iv = vectorized_implied_volatility_of_undiscounted_option_price(prices, 100, [90, 100, 110], .5, 'p')
+    >>> numpy.abs(iv - .2).max() < 1e-12
+    True
+    """
+
+    return vectorized_lets_be_rational.implied_volatility_from_a_transformed_rational_guess(
+        undiscounted_option_price, F, K, t, vectorized_binary_flag(flag))
+
+
+def vectorized_implied_volatility_of_discounted_option_price(discounted_option_price, F, K, r, t, flag,
+                                                             expiries=None):
+
+    """Calculate the implied volatility of arrays of Black option prices.
+
+    :param discounted_option_price: discounted Black price of a futures option
+    :type discounted_option_price: float or numpy.ndarray
+    :param F: underlying futures price
+    :type F: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param r: the risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param flag: 'p' or 'c' for put or call
+    :type flag: str or numpy.ndarray
+    :param expiries: (table, index) from vollib.helper.expiry_table for
+        these options, built with S=F and q=r, whose discount factors are
+        then reused
+    :type expiries: tuple or None
+
+    >>> K = [90, 100, 110]
+    >>> prices = [black('c', 100, k, .5, .02, .2) for k in K]
+    >>> iv = vectorized_implied_volatility_of_discounted_option_price(prices, 100, K, .02, .5, 'c')
+    >>> numpy.abs(iv - .2).max() < 1e-12
+    True
+    """
+
+    discount_factor = _discount_factor(expiries, t, r, discounted_option_price, F, K)
+    undiscounted_option_price = numpy.asarray(discounted_option_price, dtype=float) / discount_factor
+
+    return vectorized_implied_volatility_of_undiscounted_option_price(
+        undiscounted_option_price, F, K, t, flag)
+
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
@@ -43,7 +43,7 @@
 import numpy
 
 # Local application/library specific imports
-from lets_be_rational import norm_cdf as cnd
+from vollib.helper.normaldistribution import norm_cdf as cnd
 from vollib.helper import pdf
 from vollib.black_scholes import d1,d2
 
@@ -296,4 +296,4 @@ def rho(flag, S, K, t, r, sigma):
 if __name__=='__main__':  
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
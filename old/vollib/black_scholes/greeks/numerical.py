@@ -312,4 +312,4 @@ def hull_book_tests():
 if __name__=='__main__':  
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
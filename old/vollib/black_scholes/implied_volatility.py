@@ -38,6 +38,7 @@
 # IMPORTS
 
 # Standard library imports
+from __future__ import print_function
 
 # Related third party imports
 import lets_be_rational
@@ -48,6 +49,8 @@ import numpy
 from vollib.helper import forward_price
 from vollib.black_scholes import black_scholes
 from vollib.helper import binary_flag
+from vollib.helper import vectorized_binary_flag
+from vollib.helper import vectorized_lets_be_rational
 
 
 e = numpy.e
@@ -88,7 +91,7 @@ def implied_volatility_limited_iterations(price, S, K, t, r, flag, N):
     >>> price = black_scholes(flag, S, K, t, r, sigma)
     >>> iv = implied_volatility_limited_iterations(price, S, K, t, r, flag,1)
 
-    >>> print price, iv    
+    >>> print(price, iv)
     6.78242400926 0.232323232
     """  
 
@@ -136,7 +139,7 @@ def implied_volatility(price, S, K, t, r, flag):
     >>> price = black_scholes(flag, S, K, t, r, sigma)
     >>> iv = implied_volatility(price, S, K, t, r, flag)
 
-    >>> print price, iv
+    >>> print(price, iv)
     5.87602423383 0.2
     """  
 
@@ -150,9 +153,89 @@ def implied_volatility(price, S, K, t, r, flag):
         binary_flag[flag]
     )
     
+def vectorized_implied_volatility(price, S, K, t, r, flag):
+
+    """Calculate the Black-Scholes implied volatility of arrays of option
+    prices at once.  Prices outside the attainable range give the
+    signal values of vollib.helper.vectorized_lets_be_rational.
+
+    :param price: the Black-Scholes option price
+    :type price: float or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param flag: 'c' or 'p' for call or put.
+    :type flag: str or numpy.ndarray
+
+    >>> K = [90, 100, 110]
+    >>> flags = ['p', 'c', 'c']
+    >>> prices = [black_scholes(f, 100, k, .5, .01, .2) for f, k in zip(flags, K)]
+    >>> iv = vectorized_implied_volatility(prices, 100, K, .5, .01, flags)
+    >>> numpy.abs(iv - .2).max() < 1e-12
+    True
+    """
+
+    t = numpy.asarray(t, dtype=float)
+    r = numpy.asarray(r, dtype=float)
+    adjusted_price = numpy.asarray(price, dtype=float) / numpy.exp(-r*t)
+
+    return vectorized_lets_be_rational.implied_volatility_from_a_transformed_rational_guess(
+        adjusted_price,
+        forward_price(numpy.asarray(S, dtype=float), t, r),
+        K,
+        t,
+        vectorized_binary_flag(flag)
+    )
+
+def vectorized_implied_volatility_limited_iterations(price, S, K, t, r, flag, N):
+
+    """Calculate the Black-Scholes implied volatility of arrays of option
+    prices with at most N iterations per option, for callers that can
+    trade accuracy for speed.
+
+    :param price: the Black-Scholes option price
+    :type price: float or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param flag: 'c' or 'p' for call or put.
+    :type flag: str or numpy.ndarray
+    :param N: the maximum number of iterations to perform
+    :type N: int
+
+    >>> K = [90, 100, 110]
+    >>> prices = [black_scholes('c', 100, k, .5, .01, .232323232) for k in K]
+    >>> iv = vectorized_implied_volatility_limited_iterations(prices, 100, K, .5, .01, 'c', 1)
+    >>> numpy.abs(iv - .232323232).max() < 1e-9
+    True
+    """
+
+    t = numpy.asarray(t, dtype=float)
+    r = numpy.asarray(r, dtype=float)
+    adjusted_price = numpy.asarray(price, dtype=float) / numpy.exp(-r*t)
+
+    return vectorized_lets_be_rational.implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(
+        adjusted_price,
+        forward_price(numpy.asarray(S, dtype=float), t, r),
+        K,
+        t,
+        vectorized_binary_flag(flag),
+        N
+    )
+
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
\ No newline at end of file
+        print("Doctest passed")
\ No newline at end of file
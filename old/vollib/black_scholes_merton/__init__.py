@@ -43,10 +43,15 @@ import numpy
 
 # Local application/library specific imports
 from lets_be_rational import black
-from lets_be_rational import norm_cdf as cnd
+from vollib.helper.normaldistribution import norm_cdf as cnd
 from vollib.helper import forward_price
 from vollib.helper import binary_flag
 from vollib.helper import pdf
+from vollib.helper import vectorized_binary_flag
+from vollib.helper.backends import get_kernel
+from vollib.helper.normaldistribution import norm_cdf
+from vollib.helper import expiry_columns
+from vollib.helper import expiry_table
 
 # -----------------------------------------------------------------------------
 # FUNCTIONS, FOR REFERENCE AND TESTING
@@ -297,9 +302,150 @@ def black_scholes_merton(flag, S, K, t, r, sigma, q):
     return p * conversion_factor
 
 
+# -----------------------------------------------------------------------------
+# FUNCTIONS - VECTORIZED
+
+def _broadcast(*args):
+
+    """Convert the arguments to float arrays broadcast against each other."""
+
+    return numpy.broadcast_arrays(*[numpy.asarray(a, dtype=float) for a in args])
+
+
+def _expiry_factors(expiries, t, r, q):
+
+    """Per-contract (dividend factor, discount factor) from an expiry
+    table, or None to have the kernels compute them."""
+
+    if expiries is None:
+        return None
+    return tuple(expiry_columns(expiries, ['dividend_factor', 'discount_factor'], t=t, r=r, q=q))
+
+
+def vectorized_d1(S, K, t, r, sigma, q):
+
+    """Calculate d1 for arrays of options.  Elements with a zero total
+    volatility sigma*sqrt(t) give +/-inf, or nan at the money.
+
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+
+    >>> D1 = vectorized_d1(100, [95, 100], .5, .1, .2, .05)
+    >>> abs(D1[0] - d1(100, 95, .5, .1, .2, .05)) < 1e-12
+    True
+    """
+
+    S, K, t, r, sigma, q = _broadcast(S, K, t, r, sigma, q)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return (numpy.log(S/K) + (r - q + sigma*sigma/2.0)*t) / (sigma*numpy.sqrt(t))
+
+
+def vectorized_d2(S, K, t, r, sigma, q):
+
+    """Calculate d2 for arrays of options.
+
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+
+    >>> D2 = vectorized_d2(100, [95, 100], .5, .1, .2, .05)
+    >>> abs(D2[0] - d2(100, 95, .5, .1, .2, .05)) < 1e-12
+    True
+    """
+
+    return vectorized_d1(S, K, t, r, sigma, q) - numpy.asarray(sigma)*numpy.sqrt(t)
+
+
+def vectorized_black_scholes_merton(flag, S, K, t, r, sigma, q, backend=None, expiries=None):
+
+    """Return Black-Scholes-Merton prices for arrays of options, all
+    arguments broadcast against each other.
+
+    Where t or sigma is zero the price is the discounted intrinsic value
+    max(flag*(S*exp(-q*t) - K*exp(-r*t)), 0), selected by mask.  NaN or
+    negative sigma gives NaN.
+
+    :param flag: +1/-1 or 'c'/'p' for call or put, or an array of them
+    :type flag: int, str or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+    :param backend: compute backend, see vollib.helper.backends
+    :type backend: str or None
+    :param expiries: (table, index) from expiry_table for these options,
+        whose discount and dividend factors are then reused
+    :type expiries: tuple or None
+
+    >>> p = vectorized_black_scholes_merton([-1, 1], 100, 95, .5, .1, .2, .05)
+    >>> abs(p[0] - 2.4648) < 0.0001
+    True
+    >>> abs(p[1] - bsm_call(100, 95, .5, .1, .2, .05)) < 1e-12
+    True
+    >>> p = vectorized_black_scholes_merton(1, 100, [90, 110], [0., .5], .1, [.2, 0.], 0.)
+    >>> print(p.round(10).tolist())
+    [10.0, 0.0]
+    """
+
+    theta, S, K, t, r, sigma, q = _broadcast(
+        vectorized_binary_flag(flag), S, K, t, r, sigma, q)
+    return get_kernel('black_scholes_merton', backend)(
+        theta, S, K, t, r, sigma, q, _expiry_factors(expiries, t, r, q))
+
+
+def _black_scholes_merton_kernel(theta, S, K, t, r, sigma, q, factors=None):
+
+    """NumPy backend of vectorized_black_scholes_merton."""
+
+    dividend_factor, discount_factor = factors or (numpy.exp(-q*t), numpy.exp(-r*t))
+    discounted_S = S * dividend_factor
+    discounted_K = K * discount_factor
+    intrinsic = numpy.maximum(theta * (discounted_S - discounted_K), 0.)
+
+    # Zero total volatility: no time value, keep the arithmetic finite.
+    # Negative volatility is invalid, it and NaN give NaN
+    v = sigma * numpy.sqrt(t)
+    v = numpy.where(sigma < 0, numpy.nan, v)
+    degenerate = v == 0
+    v = numpy.where(degenerate, 1., v)
+
+    D1 = (numpy.log(discounted_S/discounted_K) + 0.5*v*v) / v
+    D2 = D1 - v
+    price = theta * (discounted_S*norm_cdf(theta*D1) - discounted_K*norm_cdf(theta*D2))
+
+    return numpy.where(degenerate, intrinsic, numpy.maximum(price, 0.))
+
+
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
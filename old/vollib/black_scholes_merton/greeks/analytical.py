@@ -43,7 +43,7 @@
 import numpy
 
 # Local application/library specific imports
-from lets_be_rational import norm_cdf as cnd
+from vollib.helper.normaldistribution import norm_cdf as cnd
 from vollib.helper import pdf
 from vollib.black_scholes_merton import d1,d2
 
@@ -59,9 +59,16 @@ from vollib.black_scholes_merton import d1,d2
 import numpy
 
 # Local application/library specific imports
-from lets_be_rational import norm_cdf as cnd
+from vollib.helper.normaldistribution import norm_cdf as cnd
 from vollib.helper import pdf
 from vollib.black_scholes_merton import d1,d2, black_scholes_merton
+from vollib.black_scholes_merton import _broadcast
+from vollib.black_scholes_merton import _expiry_factors
+from vollib.helper import greeks_dtype
+from vollib.helper import risk_greeks_dtype
+from vollib.helper import vectorized_binary_flag
+from vollib.helper.backends import get_kernel
+from vollib.helper.normaldistribution import norm_cdf, norm_pdf
 
 
 # -----------------------------------------------------------------------------
@@ -244,12 +251,171 @@ def rho(flag, S, K, t, r, sigma, q):
         return -t * K * numpy.exp(-r*t) * cnd(-D2) * .01
 
 
+# -----------------------------------------------------------------------------
+# FUNCTIONS - FUSED VECTORIZED GREEKS
+
+def vectorized_greeks(flag, S, K, t, r, sigma, q, backend=None, expiries=None):
+
+    """Returns the Black-Scholes-Merton price and analytical greeks of
+    arrays of options in one pass.
+
+    d1, d2, N(d1), N(d2) and the pdf are evaluated once per option and
+    shared by every greek.  The units match delta, gamma, theta (per day),
+    vega and rho (per 1%) above.  Options with t or sigma of zero get the
+    limiting values: intrinsic price, 0/1 delta, and zero gamma and vega.
+
+    :param flag: +1/-1 or 'c'/'p' for call or put, or an array of them
+    :type flag: int, str or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: annual risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend yield
+    :type q: float or numpy.ndarray
+    :param backend: compute backend, see vollib.helper.backends
+    :type backend: str or None
+    :param expiries: (table, index) from expiry_table for these options,
+        whose discount and dividend factors are then reused
+    :type expiries: tuple or None
+    :returns:  numpy structured array with fields price, delta, gamma,
+        theta, vega and rho (pass it to pandas.DataFrame for a table)
+
+    >>> g = vectorized_greeks(['c', 'p'], 100, 95, .5, .1, .2, .05)
+    >>> abs(g['delta'][1] - delta('p', 100, 95, .5, .1, .2, .05)) < 1e-12
+    True
+    >>> abs(g['theta'][0] - theta('c', 100, 95, .5, .1, .2, .05)) < 1e-12
+    True
+    >>> abs(g['vega'][0] - vega('c', 100, 95, .5, .1, .2, .05)) < 1e-12
+    True
+    >>> print(vectorized_greeks(1, 100, 90, 0., .1, .2, 0.)[['delta', 'gamma']].tolist())
+    (1.0, 0.0)
+    """
+
+    theta_, S, K, t, r, sigma, q = _broadcast(
+        vectorized_binary_flag(flag), S, K, t, r, sigma, q)
+    return get_kernel('greeks', backend)(
+        theta_, S, K, t, r, sigma, q, _expiry_factors(expiries, t, r, q))
+
+
+def vectorized_risk_greeks(flag, S, K, t, r, sigma, q, backend=None, expiries=None):
+
+    """Returns the price, the first order greeks of vectorized_greeks and
+    the second order greeks vanna, volga, charm, speed and color of
+    arrays of options in one pass, all from the same d1, d2, N(d1),
+    N(d2) and pdf.
+
+    Units follow the first order greeks: vanna is the change in delta
+    and volga the change in vega for a 1% change in volatility, charm
+    and color are the changes in delta and gamma per day, and speed is
+    the change in gamma per unit of S.  Options with t or sigma of zero
+    get zero vanna, volga, speed and color.
+
+    :param flag: +1/-1 or 'c'/'p' for call or put, or an array of them
+    :type flag: int, str or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: annual risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend yield
+    :type q: float or numpy.ndarray
+    :param backend: compute backend, see vollib.helper.backends
+    :type backend: str or None
+    :param expiries: (table, index) from expiry_table for these options,
+        whose discount and dividend factors are then reused
+    :type expiries: tuple or None
+    :returns:  numpy structured array with the fields of vectorized_greeks
+        plus vanna, volga, charm, speed and color
+
+    >>> g = vectorized_risk_greeks(['c', 'p'], 100, 95, .5, .1, .2, .05)
+    >>> abs(g['gamma'][0] - gamma('c', 100, 95, .5, .1, .2, .05)) < 1e-12
+    True
+    >>> abs(g['vanna'][0] - g['vanna'][1]) < 1e-15
+    True
+    >>> print(numpy.round(g[['vanna', 'volga', 'speed']][0].tolist(), 6).tolist())
+    [-0.007571, 0.003266, -0.001214]
+    """
+
+    theta_, S, K, t, r, sigma, q = _broadcast(
+        vectorized_binary_flag(flag), S, K, t, r, sigma, q)
+    return get_kernel('risk_greeks', backend)(
+        theta_, S, K, t, r, sigma, q, _expiry_factors(expiries, t, r, q))
+
+
+def _risk_greeks_kernel(theta_, S, K, t, r, sigma, q, factors=None):
+
+    """NumPy backend of vectorized_risk_greeks."""
+
+    return _greeks_kernel(theta_, S, K, t, r, sigma, q, factors, risk_greeks_dtype)
+
+
+def _greeks_kernel(theta_, S, K, t, r, sigma, q, factors=None, dtype=greeks_dtype):
+
+    """NumPy backend of vectorized_greeks, filling the second order
+    greeks too when dtype has their fields."""
+
+    dividend_factor, discount_factor = factors or (numpy.exp(-q*t), numpy.exp(-r*t))
+    sqrt_t = numpy.sqrt(t)
+    discounted_S = S * dividend_factor
+    discounted_K = K * discount_factor
+
+    # Zero total volatility: keep the arithmetic finite, limits set below.
+    # Negative volatility is invalid, it and NaN give NaN
+    v = sigma * sqrt_t
+    v = numpy.where(sigma < 0, numpy.nan, v)
+    degenerate = v == 0
+    v = numpy.where(degenerate, 1., v)
+
+    D1 = (numpy.log(discounted_S/discounted_K) + 0.5*v*v) / v
+    D2 = D1 - v
+    in_the_money = (theta_ * (discounted_S - discounted_K) > 0) * 1.
+    N1 = numpy.where(degenerate, in_the_money, norm_cdf(theta_*D1))
+    N2 = numpy.where(degenerate, in_the_money, norm_cdf(theta_*D2))
+    phi = numpy.where(degenerate, 0., norm_pdf(D1))
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        decay = numpy.where(degenerate, 0., discounted_S * phi * sigma / (2 * sqrt_t))
+
+    greeks = numpy.empty(theta_.shape, dtype=dtype)
+    greeks['price'] = numpy.maximum(theta_ * (discounted_S*N1 - discounted_K*N2), 0.)
+    greeks['delta'] = theta_ * dividend_factor * N1
+    greeks['gamma'] = dividend_factor * phi / (S * v)
+    greeks['theta'] = (-decay + theta_ * (q*discounted_S*N1 - r*discounted_K*N2)) / 365.0
+    greeks['vega'] = discounted_S * phi * sqrt_t * 0.01
+    greeks['rho'] = theta_ * t * discounted_K * N2 * .01
+    if 'vanna' not in greeks.dtype.names:
+        return greeks
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        # (2*(r-q)*t - d2*sigma*sqrt(t)) / (sigma*sqrt(t)), shared by charm and color
+        drift = (2*(r - q)*t - D2*v) / v
+        greeks['vanna'] = numpy.where(degenerate, 0., -dividend_factor * phi * D2 / sigma * .01)
+        greeks['volga'] = numpy.where(degenerate, 0., discounted_S * phi * sqrt_t * D1 * D2 / sigma * .0001)
+        greeks['charm'] = (theta_ * q * dividend_factor * N1
+                           - numpy.where(degenerate, 0., dividend_factor * phi * drift / (2 * t))) / 365.0
+        greeks['speed'] = -greeks['gamma'] / S * (D1 / v + 1)
+        greeks['color'] = numpy.where(
+            degenerate, 0., dividend_factor * phi / (2 * S * t * v) * (2*q*t + 1 + drift * D1)) / 365.0
+    return greeks
+
+
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':  
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
         
 
 
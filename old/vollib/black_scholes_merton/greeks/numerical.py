@@ -44,6 +44,7 @@ import numpy
 
 # Local application/library specific imports
 from vollib.black_scholes_merton import black_scholes_merton
+from vollib.black_scholes_merton import vectorized_black_scholes_merton
 
 # numerical greeks
 from vollib.helper.numerical_greeks import delta as numerical_delta
@@ -51,6 +52,7 @@ from vollib.helper.numerical_greeks import vega as numerical_vega
 from vollib.helper.numerical_greeks import theta as numerical_theta
 from vollib.helper.numerical_greeks import rho as numerical_rho
 from vollib.helper.numerical_greeks import gamma as numerical_gamma
+from vollib.helper.numerical_greeks import vectorized_greeks as numerical_vectorized_greeks
 
 # analytical greeks
 from vollib.black_scholes_merton.greeks.analytical import gamma as agamma
@@ -183,7 +185,32 @@ def gamma(flag, S, K, t, r, sigma, q):
     return numerical_gamma(flag, S, K, t, r, sigma, q, f)
 
 
-plot_numerical_vs_analytical('t','p')
+def vectorized_greeks(flag, S, K, t, r, sigma, q, backend=None):
+
+    """Returns the Black-Scholes-Merton price and numerical greeks of
+    arrays of options, from one batched repricing of all bumped scenarios.
+
+    :param flag: 'c' or 'p' for call or put, or an array of them.
+    :type flag: str or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: annual risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend yield
+    :type q: float or numpy.ndarray
+    :param backend: compute backend for the repricing, see vollib.helper.backends
+    :type backend: str or None
+
+    :returns:  numpy structured array with fields price, delta, gamma, theta, vega and rho
+    """
+    price = lambda flag, S, K, t, r, sigma, q: vectorized_black_scholes_merton(flag, S, K, t, r, sigma, q, backend)
+    return numerical_vectorized_greeks(flag, S, K, t, r, sigma, q, price)
 
 
 
@@ -191,7 +218,7 @@ plot_numerical_vs_analytical('t','p')
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':  
-    print 'running doctests'
+    print('running doctests')
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
@@ -48,7 +48,12 @@ import numpy
 from vollib.helper import forward_price
 from vollib.black_scholes_merton import black_scholes_merton
 from vollib.black_scholes_merton import python_black_scholes_merton
+from vollib.black_scholes_merton import _broadcast
+from vollib.black_scholes_merton import _expiry_factors
 from vollib.helper import binary_flag
+from vollib.helper import vectorized_binary_flag
+from vollib.helper import vectorized_lets_be_rational
+from vollib.helper.backends import get_kernel
 
 # -----------------------------------------------------------------------------
 # FUNCTIONS, FOR REFERENCE AND TESTING
@@ -101,9 +106,60 @@ def implied_volatility(price, S, K, t, r, q, flag):
     S = S * numpy.exp((r-q)*t)
     return iv(adjusted_price, S, K, t, binary_flag[flag])
     
+def vectorized_implied_volatility(price, S, K, t, r, q, flag, backend=None, expiries=None):
+
+    """Calculate the Black-Scholes-Merton implied volatility of arrays
+    of option prices at once.  Prices outside the attainable range give
+    the signal values of vollib.helper.vectorized_lets_be_rational.
+
+    :param price: the Black-Scholes-Merton option price
+    :type price: float or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+    :param flag: 'c' or 'p' for call or put.
+    :type flag: str or numpy.ndarray
+    :param backend: compute backend, see vollib.helper.backends
+    :type backend: str or None
+    :param expiries: (table, index) from expiry_table for these options,
+        whose discount and dividend factors are then reused
+    :type expiries: tuple or None
+
+    >>> K = [90, 100, 110]
+    >>> flags = ['p', 'c', 'c']
+    >>> prices = [python_black_scholes_merton(f, 100, k, .5, .01, .2, .02) for f, k in zip(flags, K)]
+    >>> iv = vectorized_implied_volatility(prices, 100, K, .5, .01, .02, flags)
+    >>> numpy.abs(iv - .2).max() < 1e-12
+    True
+    """
+
+    price, S, K, t, r, q, theta = _broadcast(
+        price, S, K, t, r, q, vectorized_binary_flag(flag))
+    return get_kernel('implied_volatility', backend)(
+        price, S, K, t, r, q, theta, _expiry_factors(expiries, t, r, q))
+
+
+def _implied_volatility_kernel(price, S, K, t, r, q, theta, factors=None):
+
+    """NumPy backend of vectorized_implied_volatility."""
+
+    dividend_factor, discount_factor = factors or (numpy.exp(-q*t), numpy.exp(-r*t))
+    adjusted_price = price / discount_factor
+    F = S * dividend_factor / discount_factor
+
+    return vectorized_lets_be_rational.implied_volatility_from_a_transformed_rational_guess(
+        adjusted_price, F, K, t, theta)
+
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.black_scholes_merton.scenarios
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Copyright © 2015 Iota Technologies Pte Ltd
+
+    Scenario P&L of a portfolio of options over a grid of spot shocks,
+    parallel volatility shifts and time decay.  Positions and scenarios
+    are priced as one broadcast (positions x scenarios) array, in chunks
+    of positions so that the working arrays stay bounded.
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+
+# Related third party imports
+import numpy
+
+# Local application/library specific imports
+from vollib.black_scholes_merton import _broadcast
+from vollib.black_scholes_merton import vectorized_black_scholes_merton
+from vollib.helper import vectorized_binary_flag
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+# Option prices evaluated per chunk: positions per chunk x scenarios
+CHUNK_SIZE = 1 << 20
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS
+
+def scenario_pnl(flag, S, K, t, r, sigma, q, quantity, spot_shocks=(0.,), vol_shifts=(0.,),
+                 time_decay=(0.,), relative=True, by_position=False, chunk_size=CHUNK_SIZE,
+                 backend=None):
+
+    """Calculate the P&L of a portfolio of options for every combination
+    of spot shock, volatility shift and time decay.
+
+    Each scenario moves S to S*(1 + shock) (or S + shock when relative
+    is False), sigma to max(sigma + shift, 0) and t to max(t - decay, 0),
+    and the P&L is quantity * (scenario price - current price).
+
+    :param flag: 'c' or 'p' for call or put, or an array of them
+    :type flag: str or numpy.ndarray
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param t: time to expiration in years
+    :type t: float or numpy.ndarray
+    :param r: annual risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param sigma: volatility
+    :type sigma: float or numpy.ndarray
+    :param q: annualized continuous dividend yield
+    :type q: float or numpy.ndarray
+    :param quantity: signed number of options held, times the contract size
+    :type quantity: float or numpy.ndarray
+    :param spot_shocks: relative (or absolute) moves of the underlying
+    :type spot_shocks: sequence of float
+    :param vol_shifts: parallel volatility shifts, e.g. .01 for one vol point
+    :type vol_shifts: sequence of float
+    :param time_decay: time elapsed in years, e.g. numpy.arange(5) / 365.
+    :type time_decay: sequence of float
+    :param relative: whether spot_shocks are relative to S
+    :type relative: bool
+    :param by_position: keep the P&L of every position instead of summing
+    :type by_position: bool
+    :param chunk_size: option prices evaluated at once, bounding memory
+    :type chunk_size: int
+    :param backend: compute backend, see vollib.helper.backends
+    :type backend: str or None
+    :returns: P&L of shape (spot shocks, vol shifts, time decay), with a
+        leading positions axis if by_position
+
+    >>> pnl = scenario_pnl(['c', 'p'], 100, [100, 90], .5, .01, .2, 0., [10, -5],
+    ...                    spot_shocks=[-.1, 0., .1], vol_shifts=[-.02, 0., .02])
+    >>> pnl.shape
+    (3, 3, 1)
+    >>> print(round(pnl[1, 1, 0], 12))
+    0.0
+    """
+
+    theta, S, K, t, r, sigma, q, quantity = [a.ravel() for a in _broadcast(
+        vectorized_binary_flag(flag), S, K, t, r, sigma, q, quantity)]
+    spot, vol, decay = numpy.meshgrid(
+        numpy.asarray(spot_shocks, dtype=float), numpy.asarray(vol_shifts, dtype=float),
+        numpy.asarray(time_decay, dtype=float), indexing='ij')
+    grid_shape = spot.shape
+    spot, vol, decay = spot.ravel(), vol.ravel(), decay.ravel()
+
+    base = vectorized_black_scholes_merton(theta, S, K, t, r, sigma, q, backend)
+    if by_position:
+        pnl = numpy.empty((theta.size, spot.size))
+    else:
+        pnl = numpy.zeros(spot.size)
+
+    rows = max(1, chunk_size // spot.size)
+    for start in range(0, theta.size, rows):
+        # Positions down, scenarios across
+        chunk = slice(start, start + rows)
+        shocked_S = S[chunk, None] * (1. + spot) if relative else S[chunk, None] + spot
+        prices = vectorized_black_scholes_merton(
+            theta[chunk, None], shocked_S, K[chunk, None],
+            numpy.maximum(t[chunk, None] - decay, 0.), r[chunk, None],
+            numpy.maximum(sigma[chunk, None] + vol, 0.), q[chunk, None], backend)
+        chunk_pnl = (prices - base[chunk, None]) * quantity[chunk, None]
+        if by_position:
+            pnl[chunk] = chunk_pnl
+        else:
+            pnl += chunk_pnl.sum(axis=0)
+
+    if by_position:
+        return pnl.reshape((theta.size,) + grid_shape)
+    return pnl.reshape(grid_shape)
+
+
+# -----------------------------------------------------------------------------
+# MAIN
+if __name__=='__main__':
+    import doctest
+    if not doctest.testmod().failed:
+        print("Doctest passed")
@@ -40,6 +40,9 @@
 import numpy
 from numpy import log, sqrt, exp
 
+# Local application/library specific imports
+from vollib.helper.normaldistribution import norm_pdf
+
 # -----------------------------------------------------------------------------
 # DATA
 
@@ -49,6 +52,37 @@ PUT = 'p'
 
 binary_flag = {CALL:1,PUT:-1}
 
+# Columns returned by the vectorized greek engines
+greeks_dtype = numpy.dtype([
+    ('price', float),
+    ('delta', float),
+    ('gamma', float),
+    ('theta', float),
+    ('vega', float),
+    ('rho', float),
+])
+
+# Columns returned by the vectorized second order greek engines
+risk_greeks_dtype = numpy.dtype(greeks_dtype.descr + [
+    ('vanna', float),
+    ('volga', float),
+    ('charm', float),
+    ('speed', float),
+    ('color', float),
+])
+
+# Rows of an expiry table, see expiry_table
+expiry_table_dtype = numpy.dtype([
+    ('start', int),
+    ('S', float),
+    ('t', float),
+    ('r', float),
+    ('q', float),
+    ('discount_factor', float),
+    ('dividend_factor', float),
+    ('forward', float),
+])
+
 def test_binary_flag():
     
     """
@@ -74,7 +108,7 @@ def test_binary_flag():
 # -----------------------------------------------------------------------------
 # FUNCTIONS
 
-pdf = lambda x: ONE_OVER_SQRT_TWO_PI * numpy.exp(-.5*x*x)
+pdf = norm_pdf
 """the probability density function
 
     :param x: a continuous random variable
@@ -107,10 +141,140 @@ def forward_price(S,t,r):
     return S/numpy.exp(-r*t)
 
 
+def vectorized_binary_flag(flag):
+
+    """Convert a 'c'/'p' flag, or an array of them, to an array of +1/-1.
+    Numeric flags are passed through as +1/-1 by sign.
+
+    :param flag: 'c' or 'p' for call or put, or a sequence of them
+    :type flag: str or numpy.ndarray
+
+    >>> print(vectorized_binary_flag(['c', 'p', 'c']).tolist())
+    [1.0, -1.0, 1.0]
+    >>> print(vectorized_binary_flag([1, -1]).tolist())
+    [1.0, -1.0]
+    """
+    flag = numpy.asarray(flag)
+    if flag.dtype.kind in 'SUO':
+        return numpy.where(flag == PUT, -1., 1.)
+    return numpy.where(flag < 0, -1., 1.)
+
+
+def _runs(*arrays):
+
+    """Start and length of every run of equal consecutive elements of
+    flat arrays of the same size, compared across all of them at once."""
+
+    size = arrays[0].size
+    if size < 2:
+        return numpy.arange(size), numpy.ones(size, dtype=int)
+
+    changed = numpy.zeros(size - 1, dtype=bool)
+    for a in arrays:
+        changed |= a[1:] != a[:-1]
+    starts = numpy.concatenate([[0], numpy.flatnonzero(changed) + 1])
+    lengths = numpy.diff(numpy.concatenate([starts, [size]]))
+    return starts, lengths
+
+
+def expiry_table(S, t, r, q=0.):
+
+    """Tabulate the discount factor exp(-r*t), the dividend factor
+    exp(-q*t) and the forward S*exp((r-q)*t) once per run of contracts
+    with equal consecutive (S, t, r, q).  A chain grouped by expiry
+    therefore costs one row, and one set of exponentials, per expiry.
+
+    Build one table per snapshot of the prices, rates and time
+    convention, and pass it as the expiries argument of the vectorized
+    Black and Black-Scholes-Merton functions along with the same
+    arguments.  Black-76 options take the futures price as S and q=r, so
+    that the forward is the futures price.
+
+    :param S: underlying asset price
+    :type S: float or numpy.ndarray
+    :param t: time to expiration in years of every contract
+    :type t: float or numpy.ndarray
+    :param r: risk-free interest rate
+    :type r: float or numpy.ndarray
+    :param q: annualized continuous dividend rate
+    :type q: float or numpy.ndarray
+    :returns: (table, index), the expiry_table_dtype rows of the runs,
+        each with the flat position of its first contract as start, and
+        for every contract its row in the table
+
+    >>> table, index = expiry_table(100, [.25, .25, .5, .5], .05, .01)
+    >>> print(table['t'].tolist())
+    [0.25, 0.5]
+    >>> print(index.tolist())
+    [0, 0, 1, 1]
+    >>> abs(table['forward'][1] - 100*numpy.exp(.04 * .5)) < 1e-12
+    True
+    """
+
+    arguments = [numpy.asarray(a, dtype=float) for a in (t, r, q, S)]
+    shape = numpy.broadcast(*arguments).shape
+
+    # Scalars, broadcast or not, cannot start a run: only arrays are compared
+    constant = [a.size == 1 or a.size > 0 and not any(a.strides) for a in arguments]
+    arguments = [a[(0,) * a.ndim] if c else numpy.broadcast_to(a, shape).ravel()
+                 for a, c in zip(arguments, constant)]
+    varying = [a for a, c in zip(arguments, constant) if not c]
+    starts, lengths = _runs(*varying or [numpy.zeros(int(numpy.prod(shape)))])
+
+    table = numpy.empty(starts.shape, dtype=expiry_table_dtype)
+    table['start'] = starts
+    for name, value, c in zip(['t', 'r', 'q', 'S'], arguments, constant):
+        table[name] = value if c else value[starts]
+    table['discount_factor'] = numpy.exp(-table['r']*table['t'])
+    table['dividend_factor'] = numpy.exp(-table['q']*table['t'])
+    table['forward'] = table['S'] * numpy.exp((table['r'] - table['q'])*table['t'])
+    return table, numpy.repeat(numpy.arange(starts.size), lengths).reshape(shape)
+
+
+def expiry_columns(expiries, names, **options):
+
+    """The named columns of an expiry table for every contract, gathered
+    by the index of the table.
+
+    The options, broadcast against each other, must have the shape the
+    table was built for and the values it was built from, or ValueError
+    is raised.  Values are compared at the first contract of every row,
+    so the check costs one comparison per row rather than per contract.
+
+    :param expiries: (table, index) from expiry_table
+    :type expiries: tuple
+    :param names: the expiry_table_dtype columns wanted
+    :type names: list of str
+    :param options: S, t, r and/or q of the options, by name
+    :returns: list of numpy.ndarray, one per name
+
+    >>> expiries = expiry_table(100, [.25, .25, .5], .05)
+    >>> print(expiry_columns(expiries, ['t'], t=[.25, .25, .5])[0].tolist())
+    [0.25, 0.25, 0.5]
+    >>> expiry_columns(expiries, ['t'], t=[.25, .25, 1.])
+    Traceback (most recent call last):
+    ...
+    ValueError: expiries was built for another t
+    """
+
+    table, index = expiries
+    values = numpy.broadcast_arrays(*[numpy.asarray(v, dtype=float) for v in options.values()])
+    shape = values[0].shape
+    if numpy.shape(index) != shape:
+        raise ValueError("expiries was built for options of another shape")
+
+    starts = numpy.unravel_index(table['start'], shape) if shape else ()
+    for name, value in zip(options, values):
+        built, given = table[name], value[starts]
+        if not ((built == given) | (numpy.isnan(built) & numpy.isnan(given))).all():
+            raise ValueError("expiries was built for another %s" % name)
+    return [table[name][index] for name in names]
+
+
 
 # -----------------------------------------------------------------------------
 # MAIN
 if __name__=='__main__':
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
+        print("Doctest passed")
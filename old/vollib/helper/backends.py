@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.helper.backends
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Registry of compute backends for the vectorized Black-Scholes-Merton
+    kernels.  A backend is a table of kernels loaded on first use:
+
+      ======================================================================================
+      numpy     pure NumPy, always available (the reference implementation)
+      numexpr   numexpr expressions for the arithmetic of large arrays
+      numba     Numba-compiled loops running in parallel across cores
+      auto      the first of numba, numexpr and numpy that is installed
+      ======================================================================================
+
+    The backend is chosen per call with the backend argument of the
+    vectorized functions, or else by the VOLLIB_BACKEND environment
+    variable, or else numpy.  A backend whose dependency is missing
+    falls back to numpy with a warning, and kernels a backend does not
+    provide are taken from numpy.
+
+    Kernels take float arrays broadcast against each other, with the
+    flag already converted to +1/-1, and optionally the (exp(-q*t),
+    exp(-r*t)) factors of every option, from an expiry table:
+
+      ======================================================================================
+      black_scholes_merton(theta, S, K, t, r, sigma, q, factors=None)    -> prices
+      greeks(theta, S, K, t, r, sigma, q, factors=None)                  -> greeks_dtype array
+      risk_greeks(theta, S, K, t, r, sigma, q, factors=None)             -> risk_greeks_dtype array
+      implied_volatility(price, S, K, t, r, q, theta, factors=None)      -> sigmas
+      ======================================================================================
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+import importlib
+import os
+import warnings
+from collections import OrderedDict
+
+# Related third party imports
+
+# Local application/library specific imports
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+ENVIRONMENT_VARIABLE = 'VOLLIB_BACKEND'
+DEFAULT_BACKEND = 'numpy'
+AUTO_BACKEND = 'auto'
+KERNELS = ('black_scholes_merton', 'greeks', 'risk_greeks', 'implied_volatility')
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - LOADERS
+
+def _numpy_kernels():
+
+    """The reference kernels, which live next to the public functions."""
+
+    from vollib.black_scholes_merton import _black_scholes_merton_kernel
+    from vollib.black_scholes_merton.greeks.analytical import _greeks_kernel
+    from vollib.black_scholes_merton.greeks.analytical import _risk_greeks_kernel
+    from vollib.black_scholes_merton.implied_volatility import _implied_volatility_kernel
+    return {
+        'black_scholes_merton': _black_scholes_merton_kernel,
+        'greeks': _greeks_kernel,
+        'risk_greeks': _risk_greeks_kernel,
+        'implied_volatility': _implied_volatility_kernel,
+    }
+
+
+def _module_kernels(module_name):
+
+    """Loader for the kernels of a module, whose load() imports the
+    backend's dependency and returns them.  The dependency is only
+    imported here, so the module itself imports without it."""
+
+    def load():
+        return importlib.import_module(module_name).load()
+    return load
+
+
+# name -> loader returning the kernel table, raising ImportError if the
+# backend's dependency is missing.  Ordered fastest last for 'auto'.
+_loaders = OrderedDict([
+    ('numpy', _numpy_kernels),
+    ('numexpr', _module_kernels('vollib.helper.numexpr_kernels')),
+    ('numba', _module_kernels('vollib.helper.numba_kernels')),
+])
+
+# name -> loaded kernel table, None if the backend could not be loaded
+_tables = {}
+
+
+def _table(name):
+
+    if name not in _tables:
+        try:
+            _tables[name] = _loaders[name]()
+        except ImportError as e:
+            _tables[name] = None
+            warnings.warn('vollib backend %r is unavailable (%s), falling back to %r'
+                          % (name, e, DEFAULT_BACKEND))
+    return _tables[name]
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - REGISTRY
+
+def register_backend(name, loader):
+
+    """Add or replace a backend.
+
+    :param name: name used with the backend argument and VOLLIB_BACKEND
+    :type name: str
+    :param loader: function returning a dict of kernel name -> function,
+        raising ImportError when the backend cannot be used
+    :type loader: python function object
+    """
+
+    _loaders[name] = loader
+    _tables.pop(name, None)
+
+
+def available_backends():
+
+    """Names of the backends that load in this environment.
+
+    >>> 'numpy' in available_backends()
+    True
+    """
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return [name for name in _loaders if _table(name) is not None]
+
+
+def resolve_backend(backend=None):
+
+    """Name of the backend to use for a call.
+
+    :param backend: backend name, 'auto', or None for the VOLLIB_BACKEND
+        environment variable (numpy if unset)
+    :type backend: str or None
+
+    >>> resolve_backend('numpy')
+    'numpy'
+    >>> resolve_backend('auto') in available_backends()
+    True
+    """
+
+    name = backend or os.environ.get(ENVIRONMENT_VARIABLE) or DEFAULT_BACKEND
+    if name == AUTO_BACKEND:
+        return available_backends()[-1]
+    if name not in _loaders:
+        raise ValueError('Unknown vollib backend %r, expected one of %s'
+                         % (name, ', '.join(list(_loaders) + [AUTO_BACKEND])))
+    return name
+
+
+def get_kernel(kernel, backend=None):
+
+    """Look up a kernel, falling back to numpy when the backend is
+    unavailable or does not implement it.
+
+    :param kernel: one of vollib.helper.backends.KERNELS
+    :type kernel: str
+    :param backend: see resolve_backend
+    :type backend: str or None
+
+    >>> get_kernel('greeks', 'numpy').__name__
+    '_greeks_kernel'
+    """
+
+    table = _table(resolve_backend(backend)) or {}
+    if kernel in table:
+        return table[kernel]
+    return _table(DEFAULT_BACKEND)[kernel]
+
+
+# -----------------------------------------------------------------------------
+# MAIN
+if __name__=='__main__':
+    import doctest
+    if not doctest.testmod().failed:
+        print("Doctest passed")
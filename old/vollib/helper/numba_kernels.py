@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.helper.numba_kernels
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The numba backend (see vollib.helper.backends).  Each option is
+    priced by a compiled loop body, and the loops over options run in
+    parallel across cores (numba.prange).  The normal distribution is
+    the erfc form of the NumPy backend, using the C library's erfc.
+
+    numba is imported and the loops compiled by load(), so this module
+    imports without numba.  Compiled code is cached on disk.  Implied
+    volatility is not compiled and comes from the NumPy backend.
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+import math
+
+# Related third party imports
+import numpy
+
+# Local application/library specific imports
+from vollib.helper import greeks_dtype
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+ONE_OVER_SQRT_TWO = 0.7071067811865475244008443621048490392848359376887
+ONE_OVER_SQRT_TWO_PI = 0.3989422804014326779399460599343818684758586311649
+
+prange = range  # numba.prange once load() compiled the loops
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - COMPILED
+
+def load():
+
+    """Import numba, compile the loops and return the kernels of this
+    backend, raising ImportError if numba is missing."""
+
+    global prange, _norm_cdf, _price_loop, _greeks_loop
+    import numba
+    if prange is range:
+        prange = numba.prange
+        _norm_cdf = numba.njit(cache=True)(_norm_cdf)
+        _price_loop = numba.njit(parallel=True, cache=True)(_price_loop)
+        _greeks_loop = numba.njit(parallel=True, cache=True)(_greeks_loop)
+    return {'black_scholes_merton': black_scholes_merton, 'greeks': greeks}
+
+
+def _norm_cdf(z):
+    return 0.5 * math.erfc(-z * ONE_OVER_SQRT_TWO)
+
+
+def _price_loop(theta, S, K, t, r, sigma, q, dividend_factor, discount_factor, out):
+    for i in prange(out.size):
+        discounted_S = S[i] * dividend_factor[i]
+        discounted_K = K[i] * discount_factor[i]
+        v = sigma[i] * math.sqrt(t[i])
+        if sigma[i] < 0:
+            v = math.nan  # Invalid, gives NaN like NaN sigma
+        if v == 0:
+            price = theta[i] * (discounted_S - discounted_K)
+        else:
+            D1 = (math.log(discounted_S/discounted_K) + 0.5*v*v) / v
+            price = theta[i] * (discounted_S*_norm_cdf(theta[i]*D1)
+                                - discounted_K*_norm_cdf(theta[i]*(D1 - v)))
+        out[i] = 0. if price < 0 else price
+
+
+def _greeks_loop(theta, S, K, t, r, sigma, q, dividend_factor, discount_factor, out):
+    for i in prange(theta.size):
+        sqrt_t = math.sqrt(t[i])
+        discounted_S = S[i] * dividend_factor[i]
+        discounted_K = K[i] * discount_factor[i]
+        v = sigma[i] * sqrt_t
+        if sigma[i] < 0:
+            v = math.nan  # Invalid, gives NaN like NaN sigma
+        if v == 0:
+            # Zero total volatility: same limits as the NumPy backend
+            N1 = N2 = 1. if theta[i] * (discounted_S - discounted_K) > 0 else 0.
+            phi = decay = gamma = 0.
+        else:
+            D1 = (math.log(discounted_S/discounted_K) + 0.5*v*v) / v
+            N1 = _norm_cdf(theta[i]*D1)
+            N2 = _norm_cdf(theta[i]*(D1 - v))
+            phi = ONE_OVER_SQRT_TWO_PI * math.exp(-0.5*D1*D1)
+            decay = discounted_S * phi * sigma[i] / (2 * sqrt_t)
+            gamma = dividend_factor[i] * phi / (S[i] * v)
+        price = theta[i] * (discounted_S*N1 - discounted_K*N2)
+        out[0, i] = 0. if price < 0 else price
+        out[1, i] = theta[i] * dividend_factor[i] * N1
+        out[2, i] = gamma
+        out[3, i] = (-decay + theta[i] * (q[i]*discounted_S*N1 - r[i]*discounted_K*N2)) / 365.0
+        out[4, i] = discounted_S * phi * sqrt_t * 0.01
+        out[5, i] = theta[i] * t[i] * discounted_K * N2 * .01
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - KERNELS
+
+def _flat(theta, S, K, t, r, sigma, q, factors):
+
+    """Contiguous 1-d copies of the broadcast arguments and the discount
+    factors, as the loops index them."""
+
+    factors = factors or (numpy.exp(-q*t), numpy.exp(-r*t))
+    return [numpy.ascontiguousarray(a).ravel() for a in (theta, S, K, t, r, sigma, q) + tuple(factors)]
+
+
+def black_scholes_merton(theta, S, K, t, r, sigma, q, factors=None):
+
+    """numba version of vollib.black_scholes_merton._black_scholes_merton_kernel."""
+
+    out = numpy.empty(theta.size)
+    _price_loop(*(_flat(theta, S, K, t, r, sigma, q, factors) + [out]))
+    return out.reshape(theta.shape)
+
+
+def greeks(theta, S, K, t, r, sigma, q, factors=None):
+
+    """numba version of vollib.black_scholes_merton.greeks.analytical._greeks_kernel."""
+
+    out = numpy.empty((len(greeks_dtype.names), theta.size))
+    _greeks_loop(*(_flat(theta, S, K, t, r, sigma, q, factors) + [out]))
+
+    result = numpy.empty(theta.shape, dtype=greeks_dtype)
+    for name, column in zip(greeks_dtype.names, out):
+        result[name] = column.reshape(theta.shape)
+    return result
@@ -63,8 +63,11 @@
 # Standard library imports
 
 # Related third party imports
+import numpy
 
 # Local application/library specific imports
+from vollib.helper import greeks_dtype
+from vollib.helper import vectorized_binary_flag
 
 
 # -----------------------------------------------------------------------------
@@ -221,3 +224,75 @@ def gamma(flag, S, K, t, r, sigma, b, pricing_function):
     return (pricing_function(flag, S + dS, K, t, r, sigma, b) - 2. * \
             pricing_function(flag, S, K, t, r, sigma, b) + \
             pricing_function(flag, S - dS, K, t, r, sigma, b)) / dS ** 2.
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - BATCHED BUMP AND REPRICE
+
+def vectorized_greeks(flag, S, K, t, r, sigma, b, pricing_function):
+
+    """Calculate price, delta, gamma, theta, vega and rho of arrays of
+    options with one call to a vectorized pricing function.
+
+    The base case and the seven bumped scenarios (S +/- dS, sigma +/- .01,
+    r +/- .01 and t minus one day) are stacked along a new leading axis
+    and priced together.  Bump sizes and the t = 0 limits are the same as
+    in delta, gamma, theta, vega and rho above.
+
+        :param S: underlying asset price
+        :type S: float or numpy.ndarray
+        :param K: strike price
+        :type K: float or numpy.ndarray
+        :param sigma: annualized standard deviation, or volatility
+        :type sigma: float or numpy.ndarray
+        :param t: time to expiration in years
+        :type t: float or numpy.ndarray
+        :param r: risk-free interest rate
+        :type r: float or numpy.ndarray
+        :param b: see above
+        :type b: float or numpy.ndarray
+        :param flag: 'c' or 'p' for call or put, or an array of them
+        :type flag: str or numpy.ndarray
+        :param pricing_function: option pricing function that broadcasts
+            all of its arguments, e.g. vectorized_black_scholes_merton
+        :type pricing_function: python function object
+        :returns: numpy structured array of vollib.helper.greeks_dtype
+
+    >>> from vollib.black_scholes_merton import vectorized_black_scholes_merton
+    >>> g = vectorized_greeks(['c', 'p'], 100, 95, .5, .1, .2, .05, vectorized_black_scholes_merton)
+    >>> print(numpy.round(g['delta'], 4))
+    [ 0.7111 -0.2642]
+    """
+
+    flag, S, K, t, r, sigma, b = numpy.broadcast_arrays(
+        numpy.asarray(flag), *[numpy.asarray(x, dtype=float) for x in (S, K, t, r, sigma, b)])
+    shape = (8,) + S.shape
+
+    # One day back, or down to (almost) expiry for the last day
+    dt = numpy.where(t <= 1. / 365., t - 0.00001, 1. / 365.)
+
+    # Rows: base, S+dS, S-dS, sigma+.01, sigma-.01, r+.01, r-.01, t-dt
+    prices = pricing_function(
+        numpy.broadcast_to(flag, shape),
+        numpy.stack([S, S + dS, S - dS, S, S, S, S, S]),
+        numpy.broadcast_to(K, shape),
+        numpy.stack([t, t, t, t, t, t, t, t - dt]),
+        numpy.stack([r, r, r, r, r, r + 0.01, r - 0.01, r]),
+        numpy.stack([sigma, sigma, sigma, sigma + 0.01, sigma - 0.01, sigma, sigma, sigma]),
+        numpy.broadcast_to(b, shape))
+
+    expired = t == 0.0
+    put = vectorized_binary_flag(flag) < 0
+    with numpy.errstate(invalid='ignore'):
+        expired_delta = (numpy.sign(S - K) + 1.) / 2. - put
+        expired_gamma = numpy.where(S == K, numpy.inf, 0.)
+
+    greeks = numpy.empty(S.shape, dtype=greeks_dtype)
+    greeks['price'] = prices[0]
+    greeks['delta'] = numpy.where(expired, expired_delta, (prices[1] - prices[2]) / (2 * dS))
+    greeks['gamma'] = numpy.where(expired, expired_gamma,
+                                  (prices[1] - 2. * prices[0] + prices[2]) / dS ** 2.)
+    greeks['theta'] = prices[7] - prices[0]
+    greeks['vega'] = (prices[3] - prices[4]) / 2.
+    greeks['rho'] = (prices[5] - prices[6]) / 2.
+    return greeks
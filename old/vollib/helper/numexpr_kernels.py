@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.helper.numexpr_kernels
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The numexpr backend (see vollib.helper.backends).  The element-wise
+    arithmetic is compiled by numexpr and evaluated in cache-sized
+    blocks on all cores, without the temporaries NumPy allocates for
+    every operation.  numexpr has no error function, so the normal
+    distribution still comes from vollib.helper.normaldistribution.
+
+    Arrays smaller than MIN_SIZE are handed to the NumPy kernels, for
+    which numexpr's per-expression overhead is not worth paying.
+
+    numexpr is imported by load(), so this module imports without it.
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+
+# Related third party imports
+import numpy
+
+# Local application/library specific imports
+from vollib.helper import greeks_dtype
+from vollib.helper.normaldistribution import norm_cdf
+from vollib.black_scholes_merton import _black_scholes_merton_kernel
+from vollib.black_scholes_merton.greeks.analytical import _greeks_kernel
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+MIN_SIZE = 1 << 15
+
+numexpr = None  # Set by load()
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS
+
+def load():
+
+    """Import numexpr and return the kernels of this backend, raising
+    ImportError if numexpr is missing."""
+
+    global numexpr
+    import numexpr
+    return {'black_scholes_merton': black_scholes_merton, 'greeks': greeks}
+
+
+def _factors(t, r, q):
+
+    return numexpr.evaluate('exp(-q*t)'), numexpr.evaluate('exp(-r*t)')
+
+
+def black_scholes_merton(theta, S, K, t, r, sigma, q, factors=None):
+
+    """numexpr version of vollib.black_scholes_merton._black_scholes_merton_kernel."""
+
+    if theta.size < MIN_SIZE:
+        return _black_scholes_merton_kernel(theta, S, K, t, r, sigma, q, factors)
+
+    dividend_factor, discount_factor = factors or _factors(t, r, q)
+    discounted_S = numexpr.evaluate('S * dividend_factor')
+    discounted_K = numexpr.evaluate('K * discount_factor')
+
+    v = numexpr.evaluate('sigma * sqrt(t)')
+    v[sigma < 0] = numpy.nan  # Invalid, gives NaN like NaN sigma
+    degenerate = numexpr.evaluate('v == 0')
+    v = numexpr.evaluate('where(degenerate, 1., v)')
+
+    D1 = numexpr.evaluate('(log(discounted_S/discounted_K) + 0.5*v*v) / v')
+    N1 = norm_cdf(numexpr.evaluate('theta*D1'))
+    N2 = norm_cdf(numexpr.evaluate('theta*(D1 - v)'))
+
+    intrinsic = numexpr.evaluate('theta * (discounted_S - discounted_K)')
+    price = numexpr.evaluate('theta * (discounted_S*N1 - discounted_K*N2)')
+    return numexpr.evaluate(
+        'where(degenerate, where(intrinsic > 0, intrinsic, 0.), where(price < 0, 0., price))')
+
+
+def greeks(theta, S, K, t, r, sigma, q, factors=None):
+
+    """numexpr version of vollib.black_scholes_merton.greeks.analytical._greeks_kernel."""
+
+    if theta.size < MIN_SIZE:
+        return _greeks_kernel(theta, S, K, t, r, sigma, q, factors)
+
+    dividend_factor, discount_factor = factors or _factors(t, r, q)
+    sqrt_t = numexpr.evaluate('sqrt(t)')
+    discounted_S = numexpr.evaluate('S * dividend_factor')
+    discounted_K = numexpr.evaluate('K * discount_factor')
+
+    v = numexpr.evaluate('sigma * sqrt_t')
+    v[sigma < 0] = numpy.nan  # Invalid, gives NaN like NaN sigma
+    degenerate = numexpr.evaluate('v == 0')
+    v = numexpr.evaluate('where(degenerate, 1., v)')
+
+    D1 = numexpr.evaluate('(log(discounted_S/discounted_K) + 0.5*v*v) / v')
+    in_the_money = numexpr.evaluate('where(theta * (discounted_S - discounted_K) > 0, 1., 0.)')
+    N1 = norm_cdf(numexpr.evaluate('theta*D1'))
+    N1 = numexpr.evaluate('where(degenerate, in_the_money, N1)')
+    N2 = norm_cdf(numexpr.evaluate('theta*(D1 - v)'))
+    N2 = numexpr.evaluate('where(degenerate, in_the_money, N2)')
+    phi = numexpr.evaluate('where(degenerate, 0., 0.3989422804014327 * exp(-0.5*D1*D1))')
+    decay = numexpr.evaluate('where(degenerate, 0., discounted_S * phi * sigma / (2 * sqrt_t))')
+
+    result = numpy.empty(theta.shape, dtype=greeks_dtype)
+    price = numexpr.evaluate('theta * (discounted_S*N1 - discounted_K*N2)')
+    result['price'] = numexpr.evaluate('where(price < 0, 0., price)')
+    result['delta'] = numexpr.evaluate('theta * dividend_factor * N1')
+    result['gamma'] = numexpr.evaluate('dividend_factor * phi / (S * v)')
+    result['theta'] = numexpr.evaluate(
+        '(-decay + theta * (q*discounted_S*N1 - r*discounted_K*N2)) / 365.0')
+    result['vega'] = numexpr.evaluate('discounted_S * phi * sqrt_t * 0.01')
+    result['rho'] = numexpr.evaluate('theta * t * discounted_K * N2 * 0.01')
+    return result
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.helper.rationalcubic
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Array-native versions of the shape-preserving rational cubic
+    interpolation routines (Delbourgo and Gregory) used by
+    LetsBeRational to build its initial implied volatility guesses.
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+
+    About LetsBeRational:
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    The source code of LetsBeRational resides at www.jaeckel.org/LetsBeRational.7z .
+
+    ::
+
+      ======================================================================================
+      Copyright © 2013-2014 Peter Jäckel.
+
+      Permission to use, copy, modify, and distribute this software is freely granted,
+      provided that this notice is preserved.
+
+      WARRANTY DISCLAIMER
+      The Software is provided "as is" without warranty of any kind, either express or implied,
+      including without limitation any implied warranties of condition, uninterrupted use,
+      merchantability, fitness for a particular purpose, or non-infringement.
+      ======================================================================================
+
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+import sys
+
+# Related third party imports
+import numpy
+
+# Local application/library specific imports
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+DBL_EPSILON = sys.float_info.epsilon
+DBL_MIN = sys.float_info.min
+DBL_MAX = sys.float_info.max
+
+minimum_rational_cubic_control_parameter_value = -(1 - numpy.sqrt(DBL_EPSILON))
+maximum_rational_cubic_control_parameter_value = 2 / (DBL_EPSILON * DBL_EPSILON)
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS
+
+def _is_zero(x):
+    return numpy.abs(x) < DBL_MIN
+
+
+def rational_cubic_interpolation(x, x_l, x_r, y_l, y_r, d_l, d_r, r):
+    """Evaluate the rational cubic interpolant through (x_l, y_l) and (x_r, y_r)
+    with end slopes d_l and d_r and control parameter r, element-wise.
+
+    >>> print(rational_cubic_interpolation(0.5, 0., 1., 0., 1., 1., 1., 3.))
+    0.5
+    """
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        h = x_r - x_l
+        t = (x - x_l) / h
+        omt = 1 - t
+        t2 = t * t
+        omt2 = omt * omt
+        # Formula (2.4) divided by formula (2.5)
+        cubic = ((y_r * t2 * t + (r * y_r - h * d_r) * t2 * omt
+                  + (r * y_l + h * d_l) * t * omt2 + y_l * omt2 * omt)
+                 / (1 + (r - 3) * t * omt))
+        # Linear interpolation without over- or underflow
+        linear = y_r * t + y_l * (1 - t)
+        result = numpy.where(r >= maximum_rational_cubic_control_parameter_value, linear, cubic)
+        return numpy.where(numpy.abs(h) <= 0, 0.5 * (y_l + y_r), result)
+
+
+def rational_cubic_control_parameter_to_fit_second_derivative_at_left_side(
+        x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_l):
+    """Control parameter r so that the interpolant matches second_derivative_l at x_l."""
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        h = x_r - x_l
+        numerator = 0.5 * h * second_derivative_l + (d_r - d_l)
+        denominator = (y_r - y_l) / h - d_l
+        limit = numpy.where(numerator > 0,
+                            maximum_rational_cubic_control_parameter_value,
+                            minimum_rational_cubic_control_parameter_value)
+        r = numpy.where(_is_zero(denominator), limit, numerator / denominator)
+        return numpy.where(_is_zero(numerator), 0.0, r)
+
+
+def rational_cubic_control_parameter_to_fit_second_derivative_at_right_side(
+        x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_r):
+    """Control parameter r so that the interpolant matches second_derivative_r at x_r."""
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        h = x_r - x_l
+        numerator = 0.5 * h * second_derivative_r + (d_r - d_l)
+        denominator = d_r - (y_r - y_l) / h
+        limit = numpy.where(numerator > 0,
+                            maximum_rational_cubic_control_parameter_value,
+                            minimum_rational_cubic_control_parameter_value)
+        r = numpy.where(_is_zero(denominator), limit, numerator / denominator)
+        return numpy.where(_is_zero(numerator), 0.0, r)
+
+
+def minimum_rational_cubic_control_parameter(d_l, d_r, s, prefer_shape_preservation_over_smoothness):
+    """Smallest control parameter that keeps the interpolant monotonic and convex
+    (or concave) wherever the data allow it."""
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        monotonic = (d_l * s >= 0) & (d_r * s >= 0)
+        convex = (d_l <= s) & (s <= d_r)
+        concave = (d_l >= s) & (s >= d_r)
+        d_r_m_d_l = d_r - d_l
+        d_r_m_s = d_r - s
+        s_m_d_l = s - d_l
+
+        # Monotonicity condition (3.8)
+        shape = numpy.broadcast(d_l, d_r, s).shape
+        r1 = numpy.full(shape, -DBL_MAX)
+        if prefer_shape_preservation_over_smoothness:
+            r1 = numpy.where(monotonic & _is_zero(s), maximum_rational_cubic_control_parameter_value, r1)
+        r1 = numpy.where(monotonic & ~_is_zero(s), (d_r + d_l) / s, r1)
+
+        # Convexity condition (3.18)
+        r2 = numpy.full(shape, -DBL_MAX)
+        degenerate = _is_zero(s_m_d_l) | _is_zero(d_r_m_s)
+        if prefer_shape_preservation_over_smoothness:
+            r2 = numpy.where((convex | concave) & degenerate, maximum_rational_cubic_control_parameter_value, r2)
+            r2 = numpy.where(~(convex | concave) & monotonic, maximum_rational_cubic_control_parameter_value, r2)
+        r2 = numpy.where((convex | concave) & ~degenerate,
+                         numpy.maximum(numpy.abs(d_r_m_d_l / d_r_m_s), numpy.abs(d_r_m_d_l / s_m_d_l)), r2)
+
+        r = numpy.maximum(minimum_rational_cubic_control_parameter_value, numpy.maximum(r1, r2))
+        return numpy.where(monotonic | convex | concave, r, minimum_rational_cubic_control_parameter_value)
+
+
+def convex_rational_cubic_control_parameter_to_fit_second_derivative_at_left_side(
+        x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_l, prefer_shape_preservation_over_smoothness):
+    """Left side second derivative fit, bounded below by the shape-preserving minimum."""
+    r = rational_cubic_control_parameter_to_fit_second_derivative_at_left_side(
+        x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_l)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        r_min = minimum_rational_cubic_control_parameter(
+            d_l, d_r, (y_r - y_l) / (x_r - x_l), prefer_shape_preservation_over_smoothness)
+    return numpy.maximum(r, r_min)
+
+
+def convex_rational_cubic_control_parameter_to_fit_second_derivative_at_right_side(
+        x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_r, prefer_shape_preservation_over_smoothness):
+    """Right side second derivative fit, bounded below by the shape-preserving minimum."""
+    r = rational_cubic_control_parameter_to_fit_second_derivative_at_right_side(
+        x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_r)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        r_min = minimum_rational_cubic_control_parameter(
+            d_l, d_r, (y_r - y_l) / (x_r - x_l), prefer_shape_preservation_over_smoothness)
+    return numpy.maximum(r, r_min)
+
+
+# -----------------------------------------------------------------------------
+# MAIN
+if __name__=='__main__':
+    import doctest
+    if not doctest.testmod().failed:
+        print("Doctest passed")
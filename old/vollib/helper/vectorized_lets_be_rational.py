@@ -0,0 +1,667 @@
+# -*- coding: utf-8 -*-
+"""
+    vollib.helper.vectorized_lets_be_rational
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    A pure numpy port of LetsBeRational that works on whole arrays
+    of (beta, x, q) at once instead of one option per call.
+
+    The four rational guess regions of the transformed rational guess
+    are selected with masks, and the Householder(3) iterations run on
+    all options still in need of refinement at the same time, so two
+    iterations give machine precision exactly as in the scalar code.
+
+    Prices outside of the attainable range do not raise, but return
+    VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC or
+    VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM element-wise, as
+    in Jaeckel's original C++ code.
+
+    :copyright: © 2015 Iota Technologies Pte Ltd
+    :license: MIT, see LICENSE for more details.
+
+    About LetsBeRational:
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    The source code of LetsBeRational resides at www.jaeckel.org/LetsBeRational.7z .
+
+    ::
+
+      ======================================================================================
+      Copyright © 2013-2014 Peter Jäckel.
+
+      Permission to use, copy, modify, and distribute this software is freely granted,
+      provided that this notice is preserved.
+
+      WARRANTY DISCLAIMER
+      The Software is provided "as is" without warranty of any kind, either express or implied,
+      including without limitation any implied warranties of condition, uninterrupted use,
+      merchantability, fitness for a particular purpose, or non-infringement.
+      ======================================================================================
+
+"""
+
+
+# -----------------------------------------------------------------------------
+# IMPORTS
+
+# Standard library imports
+import sys
+
+# Related third party imports
+import numpy
+
+# Local application/library specific imports
+from vollib.helper.normaldistribution import norm_cdf
+from vollib.helper.normaldistribution import norm_pdf
+from vollib.helper.normaldistribution import inverse_norm_cdf
+from vollib.helper.normaldistribution import erfcx_cody
+from vollib.helper.rationalcubic import rational_cubic_interpolation
+from vollib.helper.rationalcubic import convex_rational_cubic_control_parameter_to_fit_second_derivative_at_left_side
+from vollib.helper.rationalcubic import convex_rational_cubic_control_parameter_to_fit_second_derivative_at_right_side
+
+
+# -----------------------------------------------------------------------------
+# DATA
+
+DBL_EPSILON = sys.float_info.epsilon
+DBL_MIN = sys.float_info.min
+DBL_MAX = sys.float_info.max
+
+SQRT_DBL_EPSILON = numpy.sqrt(DBL_EPSILON)
+FOURTH_ROOT_DBL_EPSILON = numpy.sqrt(SQRT_DBL_EPSILON)
+EIGHTH_ROOT_DBL_EPSILON = numpy.sqrt(FOURTH_ROOT_DBL_EPSILON)
+SIXTEENTH_ROOT_DBL_EPSILON = numpy.sqrt(EIGHTH_ROOT_DBL_EPSILON)
+SQRT_DBL_MIN = numpy.sqrt(DBL_MIN)
+SQRT_DBL_MAX = numpy.sqrt(DBL_MAX)
+
+DENORMALIZATION_CUTOFF = 0
+
+VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC = -DBL_MAX
+VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM = DBL_MAX
+
+ONE_OVER_SQRT_TWO = 0.7071067811865475244008443621048490392848359376887
+ONE_OVER_SQRT_TWO_PI = 0.3989422804014326779399460599343818684758586311649
+SQRT_TWO_PI = 2.506628274631000502415765284811045253006986740610
+TWO_PI = 6.283185307179586476925286766559005768394338798750
+SQRT_PI_OVER_TWO = 1.253314137315500251207882642405522626503493370305
+SQRT_THREE = 1.732050807568877293527446341505872366942805253810
+SQRT_ONE_OVER_THREE = 0.577350269189625764509148780501957455647601751270
+TWO_PI_OVER_SQRT_TWENTY_SEVEN = 1.209199576156145233729385505094770488189377498728
+PI_OVER_SIX = 0.523598775598298873077107230546583814032861566563
+
+implied_volatility_maximum_iterations = 2
+asymptotic_expansion_accuracy_threshold = -10.0
+small_t_expansion_of_normalized_black_threshold = 2 * SIXTEENTH_ROOT_DBL_EPSILON
+
+_MIDDLE, _LOWER, _UPPER = 0, 1, 2
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - INTERNAL
+
+def _broadcast(*args):
+    """Broadcast the arguments against each other as flat float arrays."""
+    arrays = numpy.broadcast_arrays(*[numpy.asarray(a, dtype=float) for a in args])
+    shape = arrays[0].shape
+    return [a.ravel().copy() for a in arrays] + [shape]
+
+
+def _reshape(result, shape):
+    result = result.reshape(shape)
+    return result[()] if not shape else result
+
+
+def _is_below_horizon(x):
+    """This weeds out denormalized (a.k.a. 'subnormal') numbers."""
+    return numpy.abs(x) < DENORMALIZATION_CUTOFF
+
+
+def _householder_factor(newton, halley, hh3):
+    return (1 + 0.5 * halley * newton) / (1 + newton * (halley + hh3 * newton / 6))
+
+
+def _normalised_intrinsic(x, q):
+    x2 = x * x
+    sign = numpy.where(q < 0, -1.0, 1.0)
+    # The factor 98 is computed from last coefficient: √√92897280 = 98.1749
+    series = sign * x * (1 + x2 * ((1.0 / 24.0) + x2 * ((1.0 / 1920.0) + x2 * (
+        (1.0 / 322560.0) + (1.0 / 92897280.0) * x2))))
+    b_max = numpy.exp(0.5 * x)
+    full = sign * (b_max - 1 / b_max)
+    intrinsic = numpy.where(x2 < 98 * FOURTH_ROOT_DBL_EPSILON, series, full)
+    return numpy.where(q * x <= 0, 0.0, numpy.abs(numpy.maximum(intrinsic, 0.0)))
+
+
+def _asymptotic_expansion_of_normalized_black_call(h, t):
+    """Asymptotic expansion of b = Φ(h+t)·exp(h·t) - Φ(h-t)·exp(-h·t) for
+    large negative (t-|h|), see Abramowitz & Stegun (26.2.12)."""
+    e = (t / h) * (t / h)
+    r = ((h + t) * (h - t))
+    q = (h / r) * (h / r)
+    # 17th order asymptotic expansion of A(h,t) in q, sufficient for Φ(h) [and thus y(h)] to have relative accuracy of 1.64E-16 for h <= η  with  η:=-10.
+    asymptotic_expansion_sum = (2.0+q*(-6.0E0-2.0*e+3.0*q*(1.0E1+e*(2.0E1+2.0*e)+5.0*q*(-1.4E1+e*(-7.0E1+e*(-4.2E1-2.0*e))+7.0*q*(1.8E1+e*(1.68E2+e*(2.52E2+e*(7.2E1+2.0*e)))+9.0*q*(-2.2E1+e*(-3.3E2+e*(-9.24E2+e*(-6.6E2+e*(-1.1E2-2.0*e))))+1.1E1*q*(2.6E1+e*(5.72E2+e*(2.574E3+e*(3.432E3+e*(1.43E3+e*(1.56E2+2.0*e)))))+1.3E1*q*(-3.0E1+e*(-9.1E2+e*(-6.006E3+e*(-1.287E4+e*(-1.001E4+e*(-2.73E3+e*(-2.1E2-2.0*e))))))+1.5E1*q*(3.4E1+e*(1.36E3+e*(1.2376E4+e*(3.8896E4+e*(4.862E4+e*(2.4752E4+e*(4.76E3+e*(2.72E2+2.0*e)))))))+1.7E1*q*(-3.8E1+e*(-1.938E3+e*(-2.3256E4+e*(-1.00776E5+e*(-1.84756E5+e*(-1.51164E5+e*(-5.4264E4+e*(-7.752E3+e*(-3.42E2-2.0*e))))))))+1.9E1*q*(4.2E1+e*(2.66E3+e*(4.0698E4+e*(2.3256E5+e*(5.8786E5+e*(7.05432E5+e*(4.0698E5+e*(1.08528E5+e*(1.197E4+e*(4.2E2+2.0*e)))))))))+2.1E1*q*(-4.6E1+e*(-3.542E3+e*(-6.7298E4+e*(-4.90314E5+e*(-1.63438E6+e*(-2.704156E6+e*(-2.288132E6+e*(-9.80628E5+e*(-2.01894E5+e*(-1.771E4+e*(-5.06E2-2.0*e))))))))))+2.3E1*q*(5.0E1+e*(4.6E3+e*(1.0626E5+e*(9.614E5+e*(4.08595E6+e*(8.9148E6+e*(1.04006E7+e*(6.53752E6+e*(2.16315E6+e*(3.542E5+e*(2.53E4+e*(6.0E2+2.0*e)))))))))))+2.5E1*q*(-5.4E1+e*(-5.85E3+e*(-1.6146E5+e*(-1.77606E6+e*(-9.37365E6+e*(-2.607579E7+e*(-4.01166E7+e*(-3.476772E7+e*(-1.687257E7+e*(-4.44015E6+e*(-5.9202E5+e*(-3.51E4+e*(-7.02E2-2.0*e))))))))))))+2.7E1*q*(5.8E1+e*(7.308E3+e*(2.3751E5+e*(3.12156E6+e*(2.003001E7+e*(6.919458E7+e*(1.3572783E8+e*(1.5511752E8+e*(1.0379187E8+e*(4.006002E7+e*(8.58429E6+e*(9.5004E5+e*(4.7502E4+e*(8.12E2+2.0*e)))))))))))))+2.9E1*q*(-6.2E1+e*(-8.99E3+e*(-3.39822E5+e*(-5.25915E6+e*(-4.032015E7+e*(-1.6934463E8+e*(-4.1250615E8+e*(-6.0108039E8+e*(-5.3036505E8+e*(-2.8224105E8+e*(-8.870433E7+e*(-1.577745E7+e*(-1.472562E6+e*(-6.293E4+e*(-9.3E2-2.0*e))))))))))))))+3.1E1*q*(6.6E1+e*(1.0912E4+e*(4.74672E5+e*(8.544096E6+e*(7.71342E7+e*(3.8707344E8+e*(1.14633288E9+e*(2.07431664E9+e*(2.33360622E9+e*(1.6376184E9+e*(7.0963464E8+e*(1.8512208E8+e*(2.7768312E7+e*(2.215136E6+e*(8.184E4+e*(1.056E3+2.0*e)))))))))))))))+3.3E1*(-7.0E1+e*(-1.309E4+e*(-6.49264E5+e*(-1.344904E7+e*(-1.4121492E8+e*(-8.344518E8+e*(-2.9526756E9+e*(-6.49588632E9+e*(-9.0751353E9+e*(-8.1198579E9+e*(-4.6399188E9+e*(-1.6689036E9+e*(-3.67158792E8+e*(-4.707164E7+e*(-3.24632E6+e*(-1.0472E5+e*(-1.19E3-2.0*e)))))))))))))))))*q)))))))))))))))))
+    b = ONE_OVER_SQRT_TWO_PI * numpy.exp(-0.5 * (h * h + t * t)) * (t / r) * asymptotic_expansion_sum
+    return numpy.abs(numpy.maximum(b, 0.0))
+
+
+def _small_t_expansion_of_normalized_black_call(h, t):
+    """Expansion of b = Φ(h+t)·exp(h·t) - Φ(h-t)·exp(-h·t) to twelfth
+    order in t, accurate to machine precision for h <= 0 and t < 0.21."""
+    # Y(h) := Φ(h)/φ(h) = √(π/2)·erfcx(-h/√2)
+    # a := 1+h·Y(h)  --- Note that due to h<0, and h·Y(h) -> -1 (from above) as h -> -∞, we also have that a>0 and a -> 0 as h -> -∞
+    # w := t² , h2 := h²
+    a = 1 + h * (0.5 * SQRT_TWO_PI) * erfcx_cody(-ONE_OVER_SQRT_TWO * h)
+    w = t * t
+    h2 = h * h
+    expansion = 2*t*(a+w*((-1+3*a+a*h2)/6+w*((-7+15*a+h2*(-1+10*a+a*h2))/120+w*((-57+105*a+h2*(-18+105*a+h2*(-1+21*a+a*h2)))/5040+w*((-561+945*a+h2*(-285+1260*a+h2*(-33+378*a+h2*(-1+36*a+a*h2))))/362880+w*((-6555+10395*a+h2*(-4680+17325*a+h2*(-840+6930*a+h2*(-52+990*a+h2*(-1+55*a+a*h2)))))/39916800+((-89055+135135*a+h2*(-82845+270270*a+h2*(-20370+135135*a+h2*(-1926+25740*a+h2*(-75+2145*a+h2*(-1+78*a+a*h2))))))*w)/6227020800.0))))))
+    b = ONE_OVER_SQRT_TWO_PI * numpy.exp(-0.5 * (h * h + t * t)) * expansion
+    return numpy.abs(numpy.maximum(b, 0.0))
+
+
+def _normalised_black_call_using_norm_cdf(x, s):
+    h = x / s
+    t = 0.5 * s
+    b_max = numpy.exp(0.5 * x)
+    b = norm_cdf(h + t) * b_max - norm_cdf(h - t) / b_max
+    return numpy.abs(numpy.maximum(b, 0.0))
+
+
+def _normalised_black_call_using_erfcx(h, t):
+    """b = ½·exp(-½(h²+t²))·[erfcx(-(h+t)/√2) - erfcx(-(h-t)/√2)], which
+    only needs one exponential when |h|+|t| is large."""
+    b = 0.5 * numpy.exp(-0.5 * (h * h + t * t)) * (
+        erfcx_cody(-ONE_OVER_SQRT_TWO * (h + t)) - erfcx_cody(-ONE_OVER_SQRT_TWO * (h - t)))
+    return numpy.abs(numpy.maximum(b, 0.0))
+
+
+def _normalised_black_call(x, s):
+    """Normalised Black call on flat arrays of equal size."""
+    b = numpy.zeros_like(x)
+    ax = numpy.abs(x)
+    xn = -ax
+    positive = s > ax * DENORMALIZATION_CUTOFF
+
+    # Region 1: h < η and t < τ + |h| - |η|, evaluated without dividing by s
+    region1 = positive & (xn < s * asymptotic_expansion_accuracy_threshold) & (
+        0.5 * s * s + xn < s * (small_t_expansion_of_normalized_black_threshold
+                                + asymptotic_expansion_accuracy_threshold))
+    # Region 2: small t
+    region2 = positive & ~region1 & (0.5 * s < small_t_expansion_of_normalized_black_threshold)
+    # Region 3: b dominated by the first term, h+t > 0.85
+    region3 = positive & ~region1 & ~region2 & (xn + 0.5 * s * s > s * 0.85)
+    # Region 4
+    region4 = positive & ~region1 & ~region2 & ~region3
+
+    with numpy.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        if region1.any():
+            b[region1] = _asymptotic_expansion_of_normalized_black_call(
+                xn[region1] / s[region1], 0.5 * s[region1])
+        if region2.any():
+            b[region2] = _small_t_expansion_of_normalized_black_call(
+                xn[region2] / s[region2], 0.5 * s[region2])
+        if region3.any():
+            b[region3] = _normalised_black_call_using_norm_cdf(xn[region3], s[region3])
+        if region4.any():
+            b[region4] = _normalised_black_call_using_erfcx(
+                xn[region4] / s[region4], 0.5 * s[region4])
+
+    # In-the-money calls are intrinsic plus the out-of-the-money value
+    return b + _normalised_intrinsic(x, numpy.ones_like(x))
+
+
+def _normalised_vega(x, s):
+    ax = numpy.abs(x)
+    with numpy.errstate(divide='ignore', invalid='ignore', under='ignore'):
+        general = ONE_OVER_SQRT_TWO_PI * numpy.exp(-0.5 * ((x / s) * (x / s) + (0.5 * s) * (0.5 * s)))
+        general = numpy.where((s <= 0) | (s <= ax * SQRT_DBL_MIN), 0.0, general)
+        return numpy.where(ax <= 0, ONE_OVER_SQRT_TWO_PI * numpy.exp(-0.125 * s * s), general)
+
+
+def _compute_f_lower_map_and_first_two_derivatives(x, s):
+    ax = numpy.abs(x)
+    z = SQRT_ONE_OVER_THREE * ax / s
+    y = z * z
+    s2 = s * s
+    Phi = norm_cdf(-z)
+    phi = norm_pdf(z)
+    fpp = PI_OVER_SIX * y / (s2 * s) * Phi * (
+        8 * SQRT_THREE * s * ax + (3 * s2 * (s2 - 8) - 8 * x * x) * Phi / phi) * numpy.exp(2 * y + 0.25 * s2)
+    Phi2 = Phi * Phi
+    fp = numpy.where(_is_below_horizon(s), 1.0, TWO_PI * y * Phi2 * numpy.exp(y + 0.125 * s * s))
+    f = numpy.where(_is_below_horizon(s) | _is_below_horizon(x), 0.0,
+                    TWO_PI_OVER_SQRT_TWENTY_SEVEN * ax * (Phi2 * Phi))
+    return f, fp, fpp
+
+
+def _compute_f_upper_map_and_first_two_derivatives(x, s):
+    f = norm_cdf(-0.5 * s)
+    w = (x / s) * (x / s)
+    below = _is_below_horizon(x)
+    fp = numpy.where(below, -0.5, -0.5 * numpy.exp(0.5 * w))
+    fpp = numpy.where(below, 0.0, SQRT_PI_OVER_TWO * numpy.exp(w + 0.125 * s * s) * w / s)
+    return f, fp, fpp
+
+
+def _inverse_f_lower_map(x, f):
+    s = numpy.abs(x / (SQRT_THREE * inverse_norm_cdf(
+        numpy.power(f / (TWO_PI_OVER_SQRT_TWENTY_SEVEN * numpy.abs(x)), 1. / 3.))))
+    return numpy.where(_is_below_horizon(f), 0.0, s)
+
+
+def _inverse_f_upper_map(f):
+    return -2. * inverse_norm_cdf(f)
+
+
+def _initial_guess(beta, x, b_max):
+    """Transformed rational guess for out-of-the-money calls (x <= 0).
+
+    Returns the guess, the initial bracket and the objective function
+    to use in each of the four segments.
+    """
+    n = beta.size
+    s = numpy.empty(n)
+    s_left = numpy.full(n, DBL_MIN)
+    s_right = numpy.full(n, DBL_MAX)
+    objective = numpy.full(n, _MIDDLE)
+
+    # The temptation is great to use the optimised form b_c = exp(x/2)/2-exp(-x/2)·Phi(sqrt(-2·x)) but that would require implementing all of the above types of round-off and over/underflow handling for this expression, too.
+    s_c = numpy.sqrt(numpy.abs(2 * x))
+    b_c = _normalised_black_call(x, s_c)
+    v_c = _normalised_vega(x, s_c)
+
+    lower = numpy.flatnonzero(beta < b_c)
+    if lower.size:
+        xl, beta_l, sc, bc, vc = x[lower], beta[lower], s_c[lower], b_c[lower], v_c[lower]
+        s_l = sc - bc / vc
+        b_l = _normalised_black_call(xl, s_l)
+
+        # Lowest segment, interpolate the lower map f(beta)
+        i = beta_l < b_l
+        if i.any():
+            f_l, fp_l, fpp_l = _compute_f_lower_map_and_first_two_derivatives(xl[i], s_l[i])
+            zero, one = numpy.zeros_like(f_l), numpy.ones_like(f_l)
+            r_ll = convex_rational_cubic_control_parameter_to_fit_second_derivative_at_right_side(
+                zero, b_l[i], zero, f_l, one, fp_l, fpp_l, True)
+            f = rational_cubic_interpolation(beta_l[i], zero, b_l[i], zero, f_l, one, fp_l, r_ll)
+            # This can happen due to roundoff truncation for extreme values such as |x|>500.
+            # We switch to quadratic interpolation using f(0)≡0, f(b_l), and f'(0)≡1 to specify the quadratic.
+            t = beta_l[i] / b_l[i]
+            f = numpy.where(f > 0, f, (f_l * t + b_l[i] * (1 - t)) * t)
+            s[lower[i]] = _inverse_f_lower_map(xl[i], f)
+            s_right[lower[i]] = s_l[i]
+            objective[lower[i]] = _LOWER
+
+        # Lower middle segment, interpolate s(beta) directly
+        j = ~i
+        if j.any():
+            v_l = _normalised_vega(xl[j], s_l[j])
+            r_lm = convex_rational_cubic_control_parameter_to_fit_second_derivative_at_right_side(
+                b_l[j], bc[j], s_l[j], sc[j], 1 / v_l, 1 / vc[j], 0.0, False)
+            s[lower[j]] = rational_cubic_interpolation(
+                beta_l[j], b_l[j], bc[j], s_l[j], sc[j], 1 / v_l, 1 / vc[j], r_lm)
+            s_left[lower[j]] = s_l[j]
+            s_right[lower[j]] = sc[j]
+
+    upper = numpy.flatnonzero(beta >= b_c)
+    if upper.size:
+        xu, beta_u, sc, bc, vc, bm = x[upper], beta[upper], s_c[upper], b_c[upper], v_c[upper], b_max[upper]
+        s_h = numpy.where(vc > DBL_MIN, sc + (bm - bc) / vc, sc)
+        b_h = _normalised_black_call(xu, s_h)
+
+        # Upper middle segment, interpolate s(beta) directly
+        i = beta_u <= b_h
+        if i.any():
+            v_h = _normalised_vega(xu[i], s_h[i])
+            r_hm = convex_rational_cubic_control_parameter_to_fit_second_derivative_at_left_side(
+                bc[i], b_h[i], sc[i], s_h[i], 1 / vc[i], 1 / v_h, 0.0, False)
+            s[upper[i]] = rational_cubic_interpolation(
+                beta_u[i], bc[i], b_h[i], sc[i], s_h[i], 1 / vc[i], 1 / v_h, r_hm)
+            s_left[upper[i]] = sc[i]
+            s_right[upper[i]] = s_h[i]
+
+        # Highest segment, interpolate the upper map f(beta)
+        j = ~i
+        if j.any():
+            bh, bmj, bj = b_h[j], bm[j], beta_u[j]
+            f_h, fp_h, fpp_h = _compute_f_upper_map_and_first_two_derivatives(xu[j], s_h[j])
+            zero, half = numpy.zeros_like(f_h), numpy.full_like(f_h, -0.5)
+            r_hh = convex_rational_cubic_control_parameter_to_fit_second_derivative_at_left_side(
+                bh, bmj, f_h, zero, fp_h, half, fpp_h, True)
+            f = numpy.where((fpp_h > -SQRT_DBL_MAX) & (fpp_h < SQRT_DBL_MAX),
+                            rational_cubic_interpolation(bj, bh, bmj, f_h, zero, fp_h, half, r_hh),
+                            -DBL_MAX)
+            # We switch to quadratic interpolation using f(b_h), f(b_max)≡0, and f'(b_max)≡-1/2 to specify the quadratic.
+            h = bmj - bh
+            t = (bj - bh) / h
+            f = numpy.where(f > 0, f, (f_h * (1 - t) + 0.5 * h * t) * (1 - t))
+            s[upper[j]] = _inverse_f_upper_map(f)
+            s_left[upper[j]] = s_h[j]
+            # Else we better drop through and let the objective function be g(s) = b(x,s)-beta.
+            objective[upper[j]] = numpy.where(bj > 0.5 * bmj, _UPPER, _MIDDLE)
+
+    return s, s_left, s_right, objective
+
+
+def _householder_step(beta, x, s, b, bp, b_max, s_left, s_right, objective):
+    """One Householder(3) step for every option, using the objective function
+    of its segment (see the scalar implementation for the derivations)."""
+    ds = numpy.empty_like(s)
+    h = x / s
+    b_halley = h * h / s - s / 4
+    b_hh3 = b_halley * b_halley - 3 * (h / s) * (h / s) - 0.25
+    bisection = 0.5 * (s_left + s_right) - s
+
+    # Middle segments: g(s) = b(x,s) - beta
+    m = objective == _MIDDLE
+    newton = (beta[m] - b[m]) / bp[m]
+    ds[m] = newton * _householder_factor(newton, b_halley[m], b_hh3[m])
+
+    # Lowest segment: g(s) = 1/ln(b(x,s)) - 1/ln(beta)
+    lo = objective == _LOWER
+    if lo.any():
+        bl, bpl = b[lo], bp[lo]
+        underflow = (bl <= 0) | (bpl <= 0)
+        ln_b = numpy.log(bl)
+        ln_beta = numpy.log(beta[lo])
+        bpob = bpl / bl
+        newton = (ln_beta - ln_b) * ln_b / ln_beta / bpob
+        halley = b_halley[lo] - bpob * (1 + 2 / ln_b)
+        hh3 = (b_hh3[lo] + 2 * bpob * bpob * (1 + 3 / ln_b * (1 + 1 / ln_b))
+               - 3 * b_halley[lo] * bpob * (1 + 2 / ln_b))
+        # Numerical underflow. Switch to binary nesting for this iteration.
+        ds[lo] = numpy.where(underflow, bisection[lo], newton * _householder_factor(newton, halley, hh3))
+
+    # Highest segment: g(s) = ln(b_max-beta) - ln(b_max-b(x,s))
+    hi = objective == _UPPER
+    if hi.any():
+        bh, bph, bmh = b[hi], bp[hi], b_max[hi]
+        underflow = (bh >= bmh) | (bph <= DBL_MIN)
+        b_max_minus_b = bmh - bh
+        g = numpy.log((bmh - beta[hi]) / b_max_minus_b)
+        gp = bph / b_max_minus_b
+        newton = -g / gp
+        halley = b_halley[hi] + gp
+        hh3 = b_hh3[hi] + gp * (2 * gp + 3 * b_halley[hi])
+        ds[hi] = numpy.where(underflow, bisection[hi], newton * _householder_factor(newton, halley, hh3))
+
+    return numpy.maximum(-0.5 * s, ds)
+
+
+def _unchecked_normalised_implied_volatility(beta, x, q, N):
+    """Normalised implied volatility on flat arrays; returns 0 for
+    beta <= 0, NaN for NaN inputs and flags prices at or above b_max."""
+    # Subtract intrinsic.
+    itm = q * x > 0
+    beta = numpy.where(itm, numpy.abs(numpy.maximum(beta - _normalised_intrinsic(x, q), 0.0)), beta)
+    q = numpy.where(itm, -q, q)
+    # Map puts to calls
+    x = numpy.where(q < 0, -x, x)
+
+    result = numpy.where(numpy.isnan(beta + x + q), numpy.nan, 0.0)
+    b_max = numpy.exp(0.5 * x)
+    above = (beta > 0) & ~(beta < DENORMALIZATION_CUTOFF) & (beta >= b_max)
+    result[above] = VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+
+    todo = numpy.flatnonzero((beta > 0) & ~(beta < DENORMALIZATION_CUTOFF) & ~above)
+    if not todo.size:
+        return result
+    beta, x, b_max = beta[todo], x[todo], b_max[todo]
+
+    with numpy.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        s, s_left, s_right, objective = _initial_guess(beta, x, b_max)
+
+        ds = numpy.full_like(s, -DBL_MAX)
+        ds_previous = numpy.zeros_like(s)
+        direction_reversal_count = numpy.zeros(s.shape, dtype=int)
+        stopped = numpy.zeros(s.shape, dtype=bool)
+
+        for iterations in range(N):
+            active = numpy.flatnonzero(~stopped & (numpy.abs(ds) > DBL_EPSILON * s))
+            if not active.size:
+                break
+
+            reversal = ds[active] * ds_previous[active] < 0
+            direction_reversal_count[active[reversal]] += 1
+            if iterations > 0:
+                # If looping inefficently, or the forecast step takes us outside the bracket, or onto its edges, switch to binary nesting.
+                sa = s[active]
+                nest = active[(direction_reversal_count[active] == 3)
+                              | ~((sa > s_left[active]) & (sa < s_right[active]))]
+                s[nest] = 0.5 * (s_left[nest] + s_right[nest])
+                stopped[nest[s_right[nest] - s_left[nest] <= DBL_EPSILON * s[nest]]] = True
+                direction_reversal_count[nest] = 0
+                ds[nest] = 0
+                active = active[~stopped[active]]
+                if not active.size:
+                    break
+
+            ds_previous[active] = ds[active]
+            xa, sa, beta_a = x[active], s[active], beta[active]
+            b = _normalised_black_call(xa, sa)
+            bp = _normalised_vega(xa, sa)
+
+            # Tighten the bracket if applicable.
+            right = (b > beta_a) & (sa < s_right[active])
+            left = ~right & (b < beta_a) & (sa > s_left[active])
+            s_right[active[right]] = sa[right]
+            s_left[active[left]] = sa[left]
+
+            step = _householder_step(beta_a, xa, sa, b, bp, b_max[active],
+                                     s_left[active], s_right[active], objective[active])
+            ds[active] = step
+            s[active] = sa + step
+
+    result[todo] = s
+    return result
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - NORMALISED BLACK
+
+def normalised_vega(x, s):
+    """Calculate the derivative of the normalised Black price with respect to s.
+
+    :param x: ln(F/K)
+    :type x: float or numpy.ndarray
+    :param s: volatility times the square root of time to expiration
+    :type s: float or numpy.ndarray
+
+    >>> v = normalised_vega(numpy.array([0., -0.1]), numpy.array([0.2, 0.2]))
+    >>> numpy.abs(v - [0.3969525474770118, 0.35030939362152747]).max() < 1e-15
+    True
+    """
+    x, s, shape = _broadcast(x, s)
+    return _reshape(_normalised_vega(x, s), shape)
+
+
+def normalised_black_call(x, s):
+    """Calculate the normalised Black call price
+    b(x,s) = Φ(x/s+s/2)·exp(x/2) - Φ(x/s-s/2)·exp(-x/2).
+
+    :param x: ln(F/K)
+    :type x: float or numpy.ndarray
+    :param s: volatility times the square root of time to expiration
+    :type s: float or numpy.ndarray
+
+    >>> b = normalised_black_call(numpy.log(100/95.), 0.3 * numpy.sqrt(0.5))
+    >>> abs(b - 0.11259558142181655) < 1e-15
+    True
+    """
+    x, s, shape = _broadcast(x, s)
+    return _reshape(_normalised_black_call(x, s), shape)
+
+
+def normalised_black(x, s, q):
+    """Calculate the normalised Black price for q=+1 (calls) or q=-1 (puts).
+
+    :param x: ln(F/K)
+    :type x: float or numpy.ndarray
+    :param s: volatility times the square root of time to expiration
+    :type s: float or numpy.ndarray
+    :param q: +1 for calls, -1 for puts
+    :type q: float or numpy.ndarray
+
+    >>> x = numpy.log(100/95.)
+    >>> s = 0.3 * numpy.sqrt(0.5)
+    >>> b = normalised_black(x, s, numpy.array([-1, 1]))
+    >>> numpy.abs(b - [0.061296663817558904, 0.11259558142181655]).max() < 1e-15
+    True
+    """
+    x, s, q, shape = _broadcast(x, s, q)
+    # Reciprocal-strike call-put equivalence
+    return _reshape(_normalised_black_call(numpy.where(q < 0, -x, x), s), shape)
+
+
+def black(F, K, sigma, T, q):
+    """Calculate the undiscounted Black price for arrays of options.
+
+    :param F: forward price
+    :type F: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param sigma: annualized standard deviation, or volatility
+    :type sigma: float or numpy.ndarray
+    :param T: time to expiration in years
+    :type T: float or numpy.ndarray
+    :param q: +1 for calls, -1 for puts
+    :type q: float or numpy.ndarray
+
+    >>> p = black(100., numpy.array([90., 100., 110.]), .2, .5, 1)
+    >>> numpy.abs(p - [11.7724511, 5.6371978, 2.2112464]).max() < 1e-7
+    True
+    """
+    F, K, sigma, T, q, shape = _broadcast(F, K, sigma, T, q)
+    intrinsic = numpy.abs(numpy.maximum(numpy.where(q < 0, K - F, F - K), 0.0))
+    # Map in-the-money to out-of-the-money
+    q = numpy.where(q * (F - K) > 0, -q, q)
+    x = numpy.log(F / K)
+    b = _normalised_black_call(numpy.where(q < 0, -x, x), sigma * numpy.sqrt(T))
+    return _reshape(intrinsic + numpy.maximum(0.0, numpy.sqrt(F) * numpy.sqrt(K) * b), shape)
+
+
+# -----------------------------------------------------------------------------
+# FUNCTIONS - IMPLIED VOLATILITY
+
+def normalised_implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(beta, x, q, N):
+    """Calculate the normalised implied volatility s = sigma*sqrt(T) of
+    arrays of normalised Black prices with at most N iterations.
+
+    :param beta: normalised Black price
+    :type beta: float or numpy.ndarray
+    :param x: ln(F/K)
+    :type x: float or numpy.ndarray
+    :param q: +1 for calls, -1 for puts
+    :type q: float or numpy.ndarray
+    :param N: maximum number of Householder iterations
+    :type N: int
+
+    >>> x = numpy.array([0.0, 0.1])
+    >>> q = numpy.array([1, -1])
+    >>> beta = normalised_black(x, numpy.array([0.2, 0.23232323888]), q)
+    >>> s = normalised_implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(beta, x, q, 1)
+    >>> numpy.abs(s - [0.2, 0.23232323888]).max() < 1e-12
+    True
+    """
+    beta, x, q, shape = _broadcast(beta, x, q)
+    # Map in-the-money to out-of-the-money
+    itm = q * x > 0
+    beta = numpy.where(itm, beta - _normalised_intrinsic(x, q), beta)
+    q = numpy.where(itm, -q, q)
+    below = beta < 0
+    result = _unchecked_normalised_implied_volatility(beta, x, q, N)
+    result[below] = VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC
+    return _reshape(result, shape)
+
+
+def normalised_implied_volatility_from_a_transformed_rational_guess(beta, x, q):
+    """Calculate the normalised implied volatility s = sigma*sqrt(T) of
+    arrays of normalised Black prices to machine precision.
+
+    :param beta: normalised Black price
+    :type beta: float or numpy.ndarray
+    :param x: ln(F/K)
+    :type x: float or numpy.ndarray
+    :param q: +1 for calls, -1 for puts
+    :type q: float or numpy.ndarray
+
+    >>> x = numpy.array([-3., -0.5, 0., 0.5, 3.])
+    >>> s = numpy.array([0.5, 0.3, 1.0, 2.5, 4.0])
+    >>> beta = normalised_black(x, s, 1)
+    >>> numpy.abs(normalised_implied_volatility_from_a_transformed_rational_guess(beta, x, 1) / s - 1).max() < 1e-14
+    True
+    """
+    return normalised_implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(
+        beta, x, q, implied_volatility_maximum_iterations)
+
+
+def implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(price, F, K, T, q, N):
+    """Calculate the Black implied volatility of arrays of undiscounted
+    option prices with at most N iterations.
+
+    :param price: undiscounted Black price
+    :type price: float or numpy.ndarray
+    :param F: forward price
+    :type F: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param T: time to expiration in years
+    :type T: float or numpy.ndarray
+    :param q: +1 for calls, -1 for puts
+    :type q: float or numpy.ndarray
+    :param N: maximum number of Householder iterations
+    :type N: int
+
+    >>> K = numpy.array([80., 100., 120.])
+    >>> price = black(100., K, .232323232, .5, 1)
+    >>> sigma = implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(price, 100., K, .5, 1, 1)
+    >>> numpy.abs(sigma - .232323232).max() < 1e-9
+    True
+    """
+    price, F, K, T, q, shape = _broadcast(price, F, K, T, q)
+    intrinsic = numpy.abs(numpy.maximum(numpy.where(q < 0, K - F, F - K), 0.0))
+    below = price < intrinsic
+    above = price >= numpy.where(q < 0, K, F)
+    x = numpy.log(F / K)
+    # Map in-the-money to out-of-the-money
+    itm = q * x > 0
+    price = numpy.where(itm, numpy.abs(numpy.maximum(price - intrinsic, 0.0)), price)
+    q = numpy.where(itm, -q, q)
+    with numpy.errstate(over='ignore'):
+        result = _unchecked_normalised_implied_volatility(
+            price / (numpy.sqrt(F) * numpy.sqrt(K)), x, q, N) / numpy.sqrt(T)
+    result[above] = VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+    result[below] = VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC
+    return _reshape(result, shape)
+
+
+def implied_volatility_from_a_transformed_rational_guess(price, F, K, T, q):
+    """Calculate the Black implied volatility of arrays of undiscounted
+    option prices to machine precision.
+
+    :param price: undiscounted Black price
+    :type price: float or numpy.ndarray
+    :param F: forward price
+    :type F: float or numpy.ndarray
+    :param K: strike price
+    :type K: float or numpy.ndarray
+    :param T: time to expiration in years
+    :type T: float or numpy.ndarray
+    :param q: +1 for calls, -1 for puts
+    :type q: float or numpy.ndarray
+
+    >>> q = numpy.array([1, -1, 1])
+    >>> price = black(100., 100., .2, .5, q)
+    >>> sigma = implied_volatility_from_a_transformed_rational_guess(price, 100., 100., .5, q)
+    >>> numpy.abs(sigma - .2).max() < 1e-15
+    True
+    """
+    return implied_volatility_from_a_transformed_rational_guess_with_limited_iterations(
+        price, F, K, T, q, implied_volatility_maximum_iterations)
+
+
+# -----------------------------------------------------------------------------
+# MAIN
+if __name__=='__main__':
+    import doctest
+    if not doctest.testmod().failed:
+        print("Doctest passed")
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy
+
+from vollib.american import vectorized_barone_adesi_whaley
+from vollib.american import vectorized_binomial
+from vollib.american.implied_volatility import vectorized_implied_volatility
+from vollib.black_scholes_merton import vectorized_black_scholes_merton
+
+
+class TestAmerican(unittest.TestCase):
+
+    def setUp(self):
+        rng = numpy.random.RandomState(0)
+        n = 200
+        self.flag = numpy.where(rng.rand(n) < .5, 'c', 'p')
+        self.S = 100.
+        self.K = rng.uniform(70, 130, n)
+        self.t = rng.uniform(.05, 1.5, n)
+        self.r, self.q = .04, .02
+        self.sigma = rng.uniform(.15, .6, n)
+
+    def test_barone_adesi_whaley_matches_haug(self):
+
+        # Haug, The Complete Guide to Option Pricing Formulas, table 3-2:
+        # calls with K = 100, t = .25, r = .08, b = -.04, sigma = .2
+        prices = vectorized_barone_adesi_whaley('c', [80., 90., 100., 110., 120.], 100., .25, .08, .2, .12)
+        self.assertTrue(numpy.abs(prices - [.03, .59, 3.52, 10.31, 20.]).max() < .005)
+
+    def test_barone_adesi_whaley_close_to_binomial(self):
+
+        args = (self.flag, self.S, self.K, self.t, self.r, self.sigma, self.q)
+        baw = vectorized_barone_adesi_whaley(*args)
+        crr = vectorized_binomial(*args, steps=1000)
+        self.assertTrue(numpy.abs(baw - crr).max() < .1)
+        self.assertTrue(numpy.all(baw >= vectorized_black_scholes_merton(*args) - 1e-12))
+
+    def test_european_binomial_converges_to_black_scholes_merton(self):
+
+        args = (self.flag, self.S, self.K, self.t, self.r, self.sigma, self.q)
+        crr = vectorized_binomial(*args, steps=1000, american=False)
+        self.assertTrue(numpy.abs(crr - vectorized_black_scholes_merton(*args)).max() < .01)
+
+    def test_binomial_shared_lattice_matches_single_options(self):
+
+        # Three expiries of strikes sharing lattices, priced one at a time
+        t = numpy.repeat([.1, .5, 1.], len(self.K) // 3 + 1)[:len(self.K)]
+        args = (self.flag, self.S, self.K, t, self.r, .3, self.q)
+        for american in (True, False):
+            crr = vectorized_binomial(*args, steps=100, american=american)
+            single = [vectorized_binomial(f, self.S, k, e, self.r, .3, self.q, steps=100, american=american)
+                      for f, k, e in zip(self.flag, self.K, t)]
+            self.assertTrue(numpy.abs(crr - single).max() < 1e-10)
+
+    def test_invalid_volatility_gives_nan(self):
+
+        sigma = numpy.array([numpy.nan, -.2, .2, numpy.nan, -.2, .2])
+        flag = ['p'] * 3 + ['c'] * 3
+        for pricing_function in (vectorized_barone_adesi_whaley, vectorized_binomial):
+            prices = pricing_function(flag, self.S, 120., .5, self.r, sigma, .05)
+            self.assertTrue(numpy.isnan(prices[[0, 1, 3, 4]]).all())
+            self.assertTrue(numpy.isfinite(prices[[2, 5]]).all())
+
+    def test_implied_volatility_round_trip(self):
+
+        for model, pricing_function in (('baw', vectorized_barone_adesi_whaley), ('crr', vectorized_binomial)):
+            prices = pricing_function(self.flag, self.S, self.K, self.t, self.r, self.sigma, self.q)
+            ivs = vectorized_implied_volatility(prices, self.S, self.K, self.t, self.r, self.q, self.flag,
+                                                model=model)
+            # Prices at intrinsic value have no unique volatility and give
+            # NaN, check that the volatilities found reprice the others
+            intrinsic = numpy.where(self.flag == 'c', self.S - self.K, self.K - self.S)
+            solved = ~numpy.isnan(ivs)
+            self.assertTrue(numpy.abs(prices - intrinsic)[~solved].max() < 1e-9)
+            repriced = pricing_function(self.flag, self.S, self.K, self.t, self.r, ivs, self.q)
+            self.assertTrue(numpy.abs(repriced - prices)[solved].max() < 1e-6)
+            time_value = prices - intrinsic > .01
+            self.assertTrue(numpy.abs(ivs - self.sigma)[time_value].max() < 1e-6)
+
+    def test_exercise_value_is_not_identifiable(self):
+
+        # Deep in-the-money puts worth their exercise value at any low
+        # volatility, next to ones with time value
+        K = numpy.linspace(60, 200, 400)
+        prices = vectorized_barone_adesi_whaley('p', 100., K, .5, .05, .3, 0.)
+        ivs = vectorized_implied_volatility(prices, 100., K, .5, .05, 0., 'p')
+        at_exercise = numpy.abs(prices - (K - 100.)) < 1e-12
+        self.assertTrue(at_exercise.any())
+        self.assertTrue(numpy.isnan(ivs[at_exercise]).all())
+        self.assertTrue(numpy.abs(ivs[~at_exercise] - .3).max() < 1e-8)
+
+    def test_unknown_model(self):
+
+        self.assertRaises(ValueError, vectorized_implied_volatility, 5., 100., 100., .5, .05, 0., 'p', model='tree')
+
+
+if __name__ == '__main__':
+    unittest.main()
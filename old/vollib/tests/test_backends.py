@@ -0,0 +1,150 @@
+import os
+import sys
+import importlib
+import subprocess
+import unittest
+import warnings
+
+import numpy
+
+from vollib.helper import backends
+from vollib.black_scholes_merton import expiry_table
+from vollib.black_scholes_merton import vectorized_black_scholes_merton
+from vollib.black_scholes_merton.implied_volatility import vectorized_implied_volatility
+from vollib.black_scholes_merton.greeks.analytical import vectorized_greeks
+
+
+def _installed(module):
+
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        return False
+    return True
+
+
+class TestBackends(unittest.TestCase):
+
+    def setUp(self):
+        rng = numpy.random.RandomState(0)
+        n = 1 << 16  # Large enough for numexpr not to hand back to numpy
+        self.args = (
+            numpy.where(rng.rand(n) < .5, 'c', 'p'),
+            rng.uniform(50, 150, n), rng.uniform(50, 150, n),
+            numpy.r_[numpy.zeros(10), rng.uniform(0, 2, n - 10)],
+            rng.uniform(0, .1, n), rng.uniform(.05, .8, n), rng.uniform(0, .05, n))
+
+    def test_backends_match_numpy(self):
+
+        prices = vectorized_black_scholes_merton(*self.args, backend='numpy')
+        greeks = vectorized_greeks(*self.args, backend='numpy')
+        for name in backends.available_backends():
+            self.assertTrue(numpy.abs(
+                vectorized_black_scholes_merton(*self.args, backend=name) - prices).max() < 1e-12)
+            other = vectorized_greeks(*self.args, backend=name)
+            for column in greeks.dtype.names:
+                self.assertTrue(numpy.abs(other[column] - greeks[column]).max() < 1e-12)
+
+    def assert_backend_matches_numpy(self, name):
+
+        flag, S, K, t, r, sigma, q = self.args
+        t = numpy.round(t, 1)
+        expiries = expiry_table(S, t, r, q)
+        for kernel in ('black_scholes_merton', 'greeks'):
+            self.assertIs(backends.get_kernel(kernel, name), backends._table(name)[kernel])
+        prices = vectorized_black_scholes_merton(flag, S, K, t, r, sigma, q, backend='numpy')
+        greeks = vectorized_greeks(flag, S, K, t, r, sigma, q, backend='numpy')
+        for factors in (None, expiries):
+            self.assertTrue(numpy.abs(vectorized_black_scholes_merton(
+                flag, S, K, t, r, sigma, q, backend=name, expiries=factors) - prices).max() < 1e-12)
+            other = vectorized_greeks(flag, S, K, t, r, sigma, q, backend=name, expiries=factors)
+            for column in greeks.dtype.names:
+                self.assertTrue(numpy.abs(other[column] - greeks[column]).max() < 1e-12)
+
+    @unittest.skipUnless(_installed('numexpr'), 'numexpr is not installed')
+    def test_numexpr_matches_numpy(self):
+
+        self.assert_backend_matches_numpy('numexpr')
+
+    @unittest.skipUnless(_installed('numba'), 'numba is not installed')
+    def test_numba_matches_numpy(self):
+
+        self.assert_backend_matches_numpy('numba')
+
+    def test_kernel_modules_import_without_their_dependency(self):
+
+        code = ("import sys; sys.modules['numba'] = sys.modules['numexpr'] = None; "
+                "import vollib.helper.numba_kernels, vollib.helper.numexpr_kernels; "
+                "from vollib.helper import backends; print(backends.available_backends())")
+        output = subprocess.check_output([sys.executable, '-W', 'ignore', '-c', code],
+                                         cwd=os.path.dirname(os.path.dirname(os.path.dirname(
+                                             os.path.abspath(__file__)))))
+        self.assertEqual(output.decode().strip(), "['numpy']")
+
+    def test_invalid_volatility_gives_nan(self):
+
+        flag, S, K, t, r, sigma, q = self.args
+        sigma = sigma.copy()
+        sigma[::3] = numpy.nan
+        sigma[1::3] = -sigma[1::3]
+        valid = numpy.arange(len(sigma)) % 3 == 2
+        for name in backends.available_backends():
+            prices = vectorized_black_scholes_merton(flag, S, K, t, r, sigma, q, backend=name)
+            self.assertTrue(numpy.isnan(prices[~valid]).all())
+            self.assertFalse(numpy.isnan(prices[valid]).any())
+            greeks = vectorized_greeks(flag, S, K, t, r, sigma, q, backend=name)
+            for column in greeks.dtype.names:
+                self.assertTrue(numpy.isnan(greeks[column][~valid]).all())
+                self.assertFalse(numpy.isnan(greeks[column][valid]).any())
+
+    def test_expiry_table_matches_direct_evaluation(self):
+
+        flag, S, K, t, r, sigma, q = self.args
+        t = numpy.round(t, 1)  # About twenty expiries
+        expiries = expiry_table(100., t, .03, .01)
+        prices = vectorized_black_scholes_merton(flag, 100., K, t, .03, sigma, .01)
+        greeks = vectorized_greeks(flag, 100., K, t, .03, sigma, .01)
+        for name in backends.available_backends():
+            self.assertTrue(numpy.abs(vectorized_black_scholes_merton(
+                flag, 100., K, t, .03, sigma, .01, backend=name, expiries=expiries) - prices).max() < 1e-12)
+            other = vectorized_greeks(flag, 100., K, t, .03, sigma, .01, backend=name, expiries=expiries)
+            for column in greeks.dtype.names:
+                self.assertTrue(numpy.abs(other[column] - greeks[column]).max() < 1e-12)
+
+        ivs = vectorized_implied_volatility(prices, 100., K, t, .03, .01, flag)
+        self.assertTrue(numpy.allclose(vectorized_implied_volatility(
+            prices, 100., K, t, .03, .01, flag, expiries=expiries), ivs, rtol=1e-12, equal_nan=True))
+
+    def test_expiry_table_must_match_the_options(self):
+
+        flag, S, K, t, r, sigma, q = self.args
+        expiries = expiry_table(100., t, .03, .01)
+        for args in [(t, .04, .01), (t, .03, 0.), (t + 1., .03, .01)]:
+            with self.assertRaises(ValueError):
+                vectorized_black_scholes_merton(flag, 100., K, args[0], args[1], sigma, args[2],
+                                                expiries=expiries)
+        with self.assertRaises(ValueError):
+            vectorized_black_scholes_merton(flag[:10], 100., K[:10], t[:10], .03, sigma[:10], .01,
+                                            expiries=expiries)
+
+    def test_missing_dependency_falls_back_to_numpy(self):
+
+        backends.register_backend('missing', lambda: __import__('vollib_no_such_module'))
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                kernel = backends.get_kernel('black_scholes_merton', 'missing')
+            self.assertIs(kernel, backends.get_kernel('black_scholes_merton', 'numpy'))
+            self.assertEqual(len(caught), 1)
+        finally:
+            # Leave the registry as other tests expect it
+            backends._loaders.pop('missing', None)
+            backends._tables.pop('missing', None)
+
+    def test_unknown_backend(self):
+
+        self.assertRaises(ValueError, backends.resolve_backend, 'no_such_backend')
+
+
+if __name__ == '__main__':
+    unittest.main()
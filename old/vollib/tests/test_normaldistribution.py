@@ -0,0 +1,28 @@
+import unittest
+
+import numpy
+
+from vollib.helper.normaldistribution import erf_cody, erfc_cody, erfcx_cody
+from vollib.helper.normaldistribution import norm_cdf, inverse_norm_cdf
+
+
+class TestNormalDistribution(unittest.TestCase):
+
+    def test_nan_gives_nan(self):
+
+        # NaN next to values from every range of Cody's approximations
+        x = numpy.array([numpy.nan, .1, 1., numpy.nan, 10., -10., numpy.nan])
+        for f in (erf_cody, erfc_cody, erfcx_cody, norm_cdf):
+            result = f(x)
+            self.assertTrue(numpy.isnan(result[[0, 3, 6]]).all())
+            self.assertTrue(numpy.isfinite(result[[1, 2, 4, 5]]).all())
+            self.assertTrue(numpy.isnan(f(numpy.nan)))
+        self.assertTrue(numpy.isnan(norm_cdf(numpy.array([-40., numpy.nan])))[1])
+
+        result = inverse_norm_cdf(numpy.array([numpy.nan, .01, .5, .99, numpy.nan]))
+        self.assertTrue(numpy.isnan(result[[0, 4]]).all())
+        self.assertTrue(numpy.isfinite(result[1:4]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy
+
+from vollib.black_scholes_merton.greeks.analytical import vectorized_greeks
+from vollib.black_scholes_merton.greeks.analytical import vectorized_risk_greeks
+
+
+class TestRiskGreeks(unittest.TestCase):
+
+    def setUp(self):
+        rng = numpy.random.RandomState(2)
+        n = 500
+        self.args = (
+            numpy.where(rng.rand(n) < .5, 'c', 'p'), rng.uniform(70, 130, n), rng.uniform(70, 130, n),
+            rng.uniform(.05, 2, n), rng.uniform(0, .1, n), rng.uniform(.1, .6, n), rng.uniform(0, .05, n))
+        self.greeks = vectorized_risk_greeks(*self.args)
+
+    def bumped(self, position, h):
+        up, down = list(self.args), list(self.args)
+        up[position] = up[position] + h
+        down[position] = down[position] - h
+        return vectorized_greeks(*up), vectorized_greeks(*down)
+
+    def assertMatches(self, name, finite_difference):
+        self.assertTrue(numpy.abs(self.greeks[name] - finite_difference).max() < 1e-8)
+
+    def test_first_order_greeks_unchanged(self):
+
+        first_order = vectorized_greeks(*self.args)
+        for name in first_order.dtype.names:
+            self.assertTrue(numpy.array_equal(self.greeks[name], first_order[name]))
+
+    def test_volatility_derivatives(self):
+
+        up, down = self.bumped(5, 1e-5)
+        self.assertMatches('vanna', (up['delta'] - down['delta']) / 2e-5 * .01)
+        self.assertMatches('volga', (up['vega'] - down['vega']) / 2e-5 * .01)
+
+    def test_time_derivatives(self):
+
+        later, earlier = self.bumped(3, 1e-5)
+        self.assertMatches('charm', -(later['delta'] - earlier['delta']) / 2e-5 / 365.)
+        self.assertMatches('color', -(later['gamma'] - earlier['gamma']) / 2e-5 / 365.)
+
+    def test_speed(self):
+
+        up, down = self.bumped(1, 1e-3)
+        self.assertMatches('speed', (up['gamma'] - down['gamma']) / 2e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy
+
+from vollib.black_scholes_merton import black_scholes_merton
+from vollib.black_scholes_merton.scenarios import scenario_pnl
+
+
+class TestScenarioPnl(unittest.TestCase):
+
+    def setUp(self):
+        self.flag = ['c', 'p', 'c', 'p']
+        self.S = 100.
+        self.K = [95., 100., 110., 90.]
+        self.t = [.1, .25, .5, 1.]
+        self.sigma = [.25, .2, .3, .35]
+        self.quantity = [100., -200., 50., 300.]
+        self.r, self.q = .02, .01
+        self.grid = dict(spot_shocks=[-.05, 0., .05], vol_shifts=[-.02, .03], time_decay=[0., 5 / 365.])
+
+    def test_matches_scalar_repricing(self):
+
+        pnl = scenario_pnl(self.flag, self.S, self.K, self.t, self.r, self.sigma, self.q,
+                           self.quantity, **self.grid)
+        for i, shock in enumerate(self.grid['spot_shocks']):
+            for j, shift in enumerate(self.grid['vol_shifts']):
+                for k, decay in enumerate(self.grid['time_decay']):
+                    expected = sum(
+                        n * (black_scholes_merton(f, self.S * (1 + shock), K, t - decay, self.r, v + shift, self.q)
+                             - black_scholes_merton(f, self.S, K, t, self.r, v, self.q))
+                        for f, K, t, v, n in zip(self.flag, self.K, self.t, self.sigma, self.quantity))
+                    self.assertTrue(abs(pnl[i, j, k] - expected) < 1e-8)
+
+    def test_chunking_does_not_change_results(self):
+
+        args = (self.flag, self.S, self.K, self.t, self.r, self.sigma, self.q, self.quantity)
+        whole = scenario_pnl(*args, by_position=True, **self.grid)
+        chunked = scenario_pnl(*args, by_position=True, chunk_size=1, **self.grid)
+        self.assertEqual(whole.shape, (4, 3, 2, 2))
+        self.assertTrue(numpy.allclose(whole, chunked, rtol=0, atol=1e-12))
+        self.assertTrue(numpy.allclose(whole.sum(axis=0), scenario_pnl(*args, **self.grid), rtol=0, atol=1e-9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,10 +12,10 @@ class TestDataIterator(object):
 
     """
     >>> data_iterator = TestDataIterator()
-    >>> print data_iterator.has_next()
+    >>> print(data_iterator.has_next())
     True
     >>> r = data_iterator.next_row()
-    >>> print r['S']
+    >>> print(r['S'])
     100.0
     """
     
@@ -50,4 +50,4 @@ class TestDataIterator(object):
 if __name__=='__main__':  
     import doctest
     if not doctest.testmod().failed:
-        print "Doctest passed"
\ No newline at end of file
+        print("Doctest passed")
\ No newline at end of file
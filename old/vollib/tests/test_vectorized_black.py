@@ -0,0 +1,60 @@
+import unittest
+
+import numpy
+
+from vollib.black import black
+from vollib.black import discount_factors
+from vollib.black import vectorized_black
+from vollib.black.implied_volatility import vectorized_implied_volatility_of_discounted_option_price
+from vollib.helper import expiry_table
+
+
+class TestVectorizedBlack(unittest.TestCase):
+
+    def setUp(self):
+        # Three expiries of nine strikes each, grouped by expiry
+        self.t = numpy.repeat([.1, .5, 1.5], 18)
+        self.F = numpy.repeat([98., 101., 104.], 18)
+        self.K = numpy.tile(numpy.linspace(80, 120, 9), 6)
+        self.flag = numpy.tile(numpy.repeat(['c', 'p'], 9), 3)
+        self.sigma = numpy.linspace(.2, .9, self.t.size)
+        self.r = .03
+
+    def test_matches_scalar_black(self):
+
+        prices = vectorized_black(self.flag, self.F, self.K, self.t, self.r, self.sigma)
+        for f, F, k, t, sigma, price in zip(self.flag, self.F, self.K, self.t, self.sigma, prices):
+            self.assertTrue(abs(price - black(f, F, k, t, self.r, sigma)) < 1e-12)
+
+    def test_discount_factors_do_not_depend_on_order(self):
+
+        order = numpy.random.RandomState(0).permutation(self.t.size)
+        grouped = discount_factors(self.r, self.t)
+        self.assertTrue(numpy.array_equal(grouped, numpy.exp(-self.r*self.t)))
+        self.assertTrue(numpy.array_equal(discount_factors(self.r, self.t[order]), grouped[order]))
+
+    def test_recovers_volatility(self):
+
+        expiries = expiry_table(self.F, self.t, self.r, self.r)
+        self.assertEqual(expiries[0].size, 3)
+        self.assertTrue(numpy.array_equal(expiries[0]['forward'], [98., 101., 104.]))
+        prices = vectorized_black(self.flag, self.F, self.K, self.t, self.r, self.sigma,
+                                  expiries=expiries)
+        self.assertTrue(numpy.abs(prices - vectorized_black(
+            self.flag, self.F, self.K, self.t, self.r, self.sigma)).max() < 1e-12)
+        ivs = vectorized_implied_volatility_of_discounted_option_price(
+            prices, self.F, self.K, self.r, self.t, self.flag, expiries=expiries)
+        self.assertTrue(numpy.abs(ivs - self.sigma).max() < 1e-8)
+
+    def test_expiry_table_must_match_the_options(self):
+
+        expiries = expiry_table(self.F, self.t, self.r, self.r)
+        with self.assertRaises(ValueError):
+            vectorized_black(self.flag, self.F, self.K, self.t, .04, self.sigma, expiries=expiries)
+        with self.assertRaises(ValueError):
+            vectorized_black(self.flag[:9], self.F[:9], self.K[:9], self.t[:9], self.r,
+                             self.sigma[:9], expiries=expiries)
+
+
+if __name__ == '__main__':
+    unittest.main()
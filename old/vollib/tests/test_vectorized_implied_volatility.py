@@ -0,0 +1,59 @@
+import unittest
+
+import numpy
+
+from vollib.tests.test_utils import almost_equal
+from vollib.black_scholes import black_scholes
+from vollib.black_scholes.implied_volatility import implied_volatility
+from vollib.black_scholes.implied_volatility import vectorized_implied_volatility
+from vollib.helper.vectorized_lets_be_rational import VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC
+from vollib.helper.vectorized_lets_be_rational import VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM
+
+
+class TestVectorizedImpliedVolatility(unittest.TestCase):
+
+    def setUp(self):
+        self.S, self.t, self.r = 100., .25, .01
+        K, sigma, flag = numpy.meshgrid(
+            numpy.linspace(80, 120, 9), [.1, .2, .6, 1.5], ['c', 'p'])
+        self.K, self.sigma, self.flag = K.ravel(), sigma.ravel(), flag.ravel()
+        self.prices = numpy.array([
+            black_scholes(f, self.S, k, self.t, self.r, v)
+            for f, k, v in zip(self.flag, self.K, self.sigma)])
+
+    def test_matches_scalar_implied_volatility(self):
+
+        ivs = vectorized_implied_volatility(
+            self.prices, self.S, self.K, self.t, self.r, self.flag)
+        for price, k, f, iv in zip(self.prices, self.K, self.flag, ivs):
+            self.assertTrue(
+                almost_equal(
+                    iv, implied_volatility(price, self.S, k, self.t, self.r, f), epsilon=1e-10
+                )
+            )
+
+    def test_recovers_volatility(self):
+
+        ivs = vectorized_implied_volatility(
+            self.prices, self.S, self.K, self.t, self.r, self.flag)
+        self.assertTrue(numpy.abs(ivs - self.sigma).max() < 1e-8)
+
+    def test_signals_unattainable_prices(self):
+
+        ivs = vectorized_implied_volatility(
+            [1., 60., 101.], self.S, [50., 100., 100.], self.t, self.r, ['c', 'c', 'c'])
+        self.assertEqual(ivs[0], VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_BELOW_INTRINSIC)
+        self.assertTrue(0 < ivs[1] < VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM)
+        self.assertEqual(ivs[2], VOLATILITY_VALUE_TO_SIGNAL_PRICE_IS_ABOVE_MAXIMUM)
+
+    def test_nan_inputs_give_nan(self):
+
+        ivs = vectorized_implied_volatility(
+            [numpy.nan, 5., 5., 5.], self.S, [100., numpy.nan, 100., 100.], [self.t, self.t, numpy.nan, self.t],
+            self.r, 'c')
+        self.assertTrue(numpy.isnan(ivs[:3]).all())
+        self.assertTrue(0 < ivs[3] < 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
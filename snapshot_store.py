@@ -0,0 +1,351 @@
+# Import required libraries
+import os
+import shutil
+import tempfile
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None  # Only needed for the parquet format
+
+
+# Partitions are directories <root>/<TICKER>/<YYYY-MM-DD>/ of parts, written
+# chunk by chunk and each sorted by expiry then strike. Per part statistics
+# in _stats.npy let reads skip parts outside the requested expiry and strike
+# ranges without opening them
+DATE_FORMAT = '%Y-%m-%d'
+PART_PREFIX = 'part-%05d'
+STATS_FILE = '_stats.npy'
+
+# Reads of a partition replaced while being read, before giving up
+READ_ATTEMPTS = 3
+
+# Part formats: 'npz' one compressed file, 'npy' a directory of one
+# memory-mappable file per column, 'parquet' a compressed Parquet file
+# (needs pyarrow). npy is the default since only it reads the expiry and
+# strike range of a part without decoding the whole part: a chain written
+# as one part still only has the pages of the requested expiries read
+FORMATS = {'npz': '.npz', 'npy': '', 'parquet': '.parquet'}
+DEFAULT_FORMAT = 'npy'
+
+# Typed columns of every snapshot, missing ones are filled with MISSING.
+# Other columns are kept after these with their own types
+SNAPSHOT_COLUMNS = [('Strike', 'f8'), ('Expiry', 'M8[D]'), ('Type', 'U1'),
+                    ('Bid', 'f8'), ('Ask', 'f8'), ('Last', 'f8'),
+                    ('Volume', 'i8'), ('Open_Interest', 'i8'),
+                    ('Underlying_Price', 'f8'), ('Vendor_IV', 'f8'),
+                    ('IV', 'f8')]
+
+# Column names of pandas_datareader style chains (see data_sources) and of
+# CBOE QuoteData frames (see old/quote_data.py) in the snapshot schema
+CHAIN_NAMES = {'Vol': 'Volume', 'Open_Int': 'Open_Interest', 'IV': 'Vendor_IV'}
+QUOTE_DATA_NAMES = {'Last Sale': 'Last', 'Vol': 'Volume',
+                    'Open Int': 'Open_Interest'}
+
+# Open ends of expiry ranges
+EXPIRY_BOUNDS = (np.datetime64('0001-01-01'), np.datetime64('9999-12-31'))
+
+MISSING = {'f8': np.nan, 'i8': 0, 'M8[D]': 'NaT', 'U1': ''}
+
+STATS_DTYPE = np.dtype([('rows', 'i8'),
+                        ('expiry_min', 'M8[D]'), ('expiry_max', 'M8[D]'),
+                        ('strike_min', 'f8'), ('strike_max', 'f8')])
+
+
+def partition_path(root, ticker, date):
+    return os.path.join(root, ticker.upper(),
+                        pd.Timestamp(date).strftime(DATE_FORMAT))
+
+
+# Frame in the snapshot schema, renaming columns with names first. Types
+# like 'call' or 'P' become 'c' or 'p'
+def to_snapshot(frame, names=None):
+
+    frame = frame.reset_index() if frame.index.names[0] is not None else frame
+    frame = frame.rename(columns=names or {})
+
+    snapshot = pd.DataFrame(index=np.arange(len(frame.index)))
+    for column, dtype in SNAPSHOT_COLUMNS:
+        if column not in frame.columns:
+            snapshot[column] = np.full(len(frame.index), MISSING[dtype], dtype)
+            continue
+        values = frame[column].values
+        if column == 'Type':
+            values = pd.Series(values).astype(str).str[0].str.lower().values
+        elif dtype == 'i8':
+            values = pd.Series(values).fillna(0).values
+        snapshot[column] = values.astype(dtype)
+
+    for column in frame.columns:
+        if column not in snapshot.columns and column != 'index':
+            values = frame[column].values
+            snapshot[str(column)] = values.astype(str) if values.dtype == object else values
+
+    return snapshot
+
+
+# Writes the parts of one partition into a hidden version directory next to
+# it. On commit the partition, a symbolic link to its current version, is
+# pointed at the new one in a single os.replace, so readers always find a
+# complete partition, concurrent writers never fail and the last to commit
+# wins. The replaced version is then deleted, read_partition retries a read
+# that loses its parts to it. An interrupted writer leaves the previous
+# version in place. Frames are written as given, pass them through
+# to_snapshot for the typed schema.
+class PartitionWriter(object):
+
+    def __init__(self, root, ticker, date, format=DEFAULT_FORMAT):
+        if format not in FORMATS:
+            raise Exception('Unknown snapshot format %r, expected one of %s.'
+                            % (format, ', '.join(sorted(FORMATS))))
+        if format == 'parquet' and pq is None:
+            raise Exception('Parquet snapshots need pyarrow.')
+
+        self.path = partition_path(root, ticker, date)
+        self.format = format
+        folder, name = os.path.split(self.path)
+        os.makedirs(folder, exist_ok=True)  # Concurrent first writers
+
+        self.parts = 0
+        self.rows = 0
+        self._stats = []
+        self._temporary = tempfile.mkdtemp(dir=folder, prefix='.' + name + '.')
+
+    def write(self, frame):
+        if not len(frame.index):
+            return
+        if 'Expiry' in frame.columns and 'Strike' in frame.columns:
+            frame = frame.sort_values(['Expiry', 'Strike'])
+            expiry = frame['Expiry'].values.astype('M8[D]')
+            strike = frame['Strike'].values
+            self._stats.append((len(frame.index), expiry[0], expiry[-1],
+                                np.nanmin(strike), np.nanmax(strike)))
+        else:
+            self._stats.append((len(frame.index), 'NaT', 'NaT', np.nan, np.nan))
+
+        path = os.path.join(self._temporary,
+                            PART_PREFIX % self.parts + FORMATS[self.format])
+        columns = {}
+        for column in frame.columns:
+            values = frame[column].values
+            if values.dtype == object:
+                values = values.astype(str)  # No pickles in the store
+            columns[str(column)] = values
+
+        if self.format == 'npz':
+            np.savez_compressed(path, **columns)
+        elif self.format == 'npy':
+            os.mkdir(path)
+            for column, values in columns.items():
+                np.save(os.path.join(path, column + '.npy'), values)
+        else:
+            pq.write_table(pa.Table.from_pandas(
+                pd.DataFrame(columns, columns=list(columns)), preserve_index=False),
+                path, compression='snappy')
+
+        self.parts += 1
+        self.rows += len(frame.index)
+
+    def commit(self):
+        np.save(os.path.join(self._temporary, STATS_FILE),
+                np.array(self._stats, dtype=STATS_DTYPE))
+
+        folder = os.path.dirname(self.path)
+        previous = None
+        if os.path.islink(self.path):
+            previous = os.path.join(folder, os.readlink(self.path))
+        elif os.path.exists(self.path):
+            # Plain directory of an older store, moved aside once
+            previous = self._temporary + '.previous'
+            os.rename(self.path, previous)
+
+        link = self._temporary + '.link'
+        os.symlink(os.path.basename(self._temporary), link)
+        os.replace(link, self.path)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    def abort(self):
+        shutil.rmtree(self._temporary, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        if kind is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+# Write one chain as a single part
+def write_partition(root, ticker, date, frame, format=DEFAULT_FORMAT):
+    with PartitionWriter(root, ticker, date, format) as writer:
+        writer.write(frame)
+    return writer.path
+
+
+# Part paths of a partition, in the order they were written. They are in
+# the version current when called, later commits do not change them
+def partition_parts(root, ticker, date):
+    return _version_parts(os.path.realpath(partition_path(root, ticker, date)))
+
+
+def _version_parts(version):
+    return [os.path.join(version, name) for name in sorted(os.listdir(version))
+            if name.startswith('part-')]
+
+
+# (low, high) bounds of a read, with open ends filled in
+def _expiry_bounds(bounds):
+    low, high = bounds if bounds is not None else (None, None)
+    low = EXPIRY_BOUNDS[0] if low is None else \
+        np.datetime64(pd.Timestamp(low).date(), 'D')
+    high = EXPIRY_BOUNDS[1] if high is None else \
+        np.datetime64(pd.Timestamp(high).date(), 'D')
+    return low, high
+
+
+def _strike_bounds(bounds):
+    low, high = bounds if bounds is not None else (None, None)
+    return (-np.inf if low is None else float(low),
+            np.inf if high is None else float(high))
+
+
+# Rows of one part with expiry and strike within the bounds. Parts are
+# sorted by expiry, so the expiry range is one slice, found by binary search
+# on the memory-mapped column for the npy format
+def _read_part(path, columns, expiry, strike):
+
+    if path.endswith('.parquet'):
+        filters = []
+        if expiry[0] > EXPIRY_BOUNDS[0]:
+            filters.append(('Expiry', '>=', pd.Timestamp(expiry[0])))
+        if expiry[1] < EXPIRY_BOUNDS[1]:
+            filters.append(('Expiry', '<=', pd.Timestamp(expiry[1])))
+        if np.isfinite(strike[0]):
+            filters.append(('Strike', '>=', strike[0]))
+        if np.isfinite(strike[1]):
+            filters.append(('Strike', '<=', strike[1]))
+        frame = pq.read_table(path, columns=columns,
+                              filters=filters or None).to_pandas()
+        if 'Expiry' in frame.columns:
+            frame['Expiry'] = frame['Expiry'].values.astype('M8[D]')
+        return frame
+
+    if path.endswith('.npz'):
+        data = np.load(path)
+        names = data.files
+    else:
+        # Schema columns in schema order, then the others by name
+        names = [name[:-4] for name in sorted(os.listdir(path))]
+        order = dict((name, i) for i, (name, _) in enumerate(SNAPSHOT_COLUMNS))
+        names.sort(key=lambda name: order.get(name, len(order)))
+        data = dict((name, np.load(os.path.join(path, name + '.npy'), mmap_mode='r'))
+                    for name in names)
+
+    try:
+        selected = slice(None)
+        if 'Expiry' in names and 'Strike' in names:
+            # Bounds in the column's own unit, open ends need no search
+            dates = data['Expiry']
+            start, stop = 0, len(dates)
+            if expiry[0] > EXPIRY_BOUNDS[0]:
+                start = np.searchsorted(dates, expiry[0].astype(dates.dtype))
+            if expiry[1] < EXPIRY_BOUNDS[1]:
+                stop = np.searchsorted(dates, (expiry[1] + 1).astype(dates.dtype))
+            values = np.asarray(data['Strike'][start:stop])
+            selected = start + np.flatnonzero((values >= strike[0])
+                                              & (values <= strike[1]))
+
+        names = names if columns is None else columns
+        return pd.DataFrame(dict((name, np.asarray(data[name][selected]))
+                                 for name in names), columns=names)
+    finally:
+        if hasattr(data, 'close'):
+            data.close()
+
+
+# Read a partition, or only the rows with expiry and strike within
+# (low, high) bounds, either end None for open. Parts whose statistics fall
+# outside the bounds are skipped unread.
+def read_partition(root, ticker, date, columns=None, expiry=None, strike=None):
+
+    expiry = _expiry_bounds(expiry)
+    strike = _strike_bounds(strike)
+
+    # A commit deletes the version it replaces, possibly under this read:
+    # it is then read again from the new version
+    path = partition_path(root, ticker, date)
+    for attempt in range(READ_ATTEMPTS):
+        version = os.path.realpath(path)
+        try:
+            return _read_version(version, columns, expiry, strike)
+        except (IOError, OSError):
+            if attempt + 1 == READ_ATTEMPTS or os.path.realpath(path) == version:
+                raise
+
+
+def _read_version(version, columns, expiry, strike):
+
+    parts = _version_parts(version)
+    stats_path = os.path.join(os.path.dirname(parts[0]), STATS_FILE) if parts else ''
+    if os.path.exists(stats_path):
+        stats = np.load(stats_path)
+        keep = ~((stats['expiry_max'] < expiry[0]) | (stats['expiry_min'] > expiry[1])
+                 | (stats['strike_max'] < strike[0]) | (stats['strike_min'] > strike[1]))
+        parts = [part for part, k in zip(parts, keep) if k]
+
+    frames = [_read_part(part, columns, expiry, strike) for part in parts]
+    if not frames:
+        return pd.DataFrame(columns=columns or [name for name, _ in SNAPSHOT_COLUMNS])
+    return pd.concat(frames, ignore_index=True)
+
+
+# (ticker, date) of every partition, optionally of one ticker only and of
+# dates from start to end
+def list_partitions(root, ticker=None, start=None, end=None):
+
+    if not os.path.isdir(root):
+        return []
+
+    tickers = [ticker.upper()] if ticker is not None else sorted(os.listdir(root))
+    partitions = []
+    for name in tickers:
+        folder = os.path.join(root, name)
+        if not os.path.isdir(folder):
+            continue
+        for stem in sorted(os.listdir(folder)):
+            try:
+                date = pd.Timestamp(dt.datetime.strptime(stem, DATE_FORMAT))
+            except ValueError:
+                continue  # Hidden partitions still being written
+            if start is not None and date < pd.Timestamp(start):
+                continue
+            if end is not None and date > pd.Timestamp(end):
+                continue
+            partitions.append((name, date))
+
+    return partitions
+
+
+# Rows of every partition from start to end in one frame, with Ticker and
+# Date columns, filtered on expiry and strike like read_partition
+def read_snapshots(root, ticker=None, start=None, end=None, columns=None,
+                   expiry=None, strike=None):
+
+    frames = []
+    for name, date in list_partitions(root, ticker, start, end):
+        frame = read_partition(root, name, date, columns, expiry, strike)
+        frame.insert(0, 'Date', date)
+        frame.insert(0, 'Ticker', name)
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=['Ticker', 'Date'] + (columns or []))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The app imports the vendored vollib under old/, which the Procfile puts on
+# the path with gunicorn's --pythonpath
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'old'))
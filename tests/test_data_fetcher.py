@@ -0,0 +1,139 @@
+import datetime as dt
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import iv_solver
+from data_fetcher import get_chain_ivs, get_filtered_data, get_time_delta
+from iv_cache import IVCache
+from iv_solver import QUOTE_VALID, QUOTE_BELOW_INTRINSIC, QUOTE_NO_PREMIUM
+from trading_calendar import USTradingCalendar
+
+
+# get_time_delta as it was before the compiled calendar, with dates passed
+# to numpy as the numpy of the time did
+def baseline_time_delta(today, date_list, trading_calendar=True):
+
+    delta_list = []
+
+    if trading_calendar:
+        year = 252
+        calendar = USTradingCalendar()
+
+        for date in date_list:
+            trading_holidays = [d.date() for d in calendar.holidays(today, date)]
+            delta = np.busday_count(today.date(), date.date(),
+                                    holidays=trading_holidays) + 1
+            delta_list.append(delta)
+    else:
+        year = 365
+
+        for date in date_list:
+            delta = abs((today - date).days) + 1
+            delta_list.append(delta)
+
+    delta_list = np.array(delta_list)
+    normalized = delta_list / float(year)
+
+    return delta_list, normalized
+
+
+class TestTimeDelta(unittest.TestCase):
+
+    def setUp(self):
+        # Business days around the turn of several years, at 10:30
+        rng = np.random.RandomState(0)
+        days = np.busday_offset('2015-11-01', rng.randint(0, 1000, 20),
+                                roll='forward')
+        holidays = USTradingCalendar().holidays('2015-01-01', '2020-12-31')
+        self.todays = [dt.datetime.combine(day.astype(dt.date), dt.time(10, 30))
+                       for day in days if day not in holidays.values.astype('M8[D]')]
+
+    def expiries(self, today):
+        # Same day, then Fridays over the next year, unsorted and repeated
+        fridays = np.busday_offset(np.datetime64(today.date()), np.arange(0, 52, 3),
+                                   roll='forward', weekmask='Fri')
+        expiries = [dt.datetime.combine(day.astype(dt.date), dt.time())
+                    for day in fridays[::-1]]
+        return [dt.datetime.combine(today.date(), dt.time())] + expiries + expiries[:3]
+
+    def test_trading_calendar_matches_baseline(self):
+        for today in self.todays:
+            expiries = self.expiries(today)
+            days, years = get_time_delta(today, expiries, True)
+            baseline_days, baseline_years = baseline_time_delta(today, expiries, True)
+            np.testing.assert_array_equal(days, baseline_days)
+            np.testing.assert_array_equal(years, baseline_years)
+
+    def test_calendar_days_match_baseline(self):
+        for today in self.todays:
+            expiries = self.expiries(today)
+            days, years = get_time_delta(today, expiries, False)
+            baseline_days, baseline_years = baseline_time_delta(today, expiries, False)
+            np.testing.assert_array_equal(days, baseline_days)
+            np.testing.assert_array_equal(years, baseline_years)
+
+
+class TestQuoteStatus(unittest.TestCase):
+
+    def setUp(self):
+        # Calls a month out, one without a premium and one below intrinsic
+        expiry = dt.datetime.combine(dt.date.today() + dt.timedelta(days=30), dt.time())
+        index = pd.MultiIndex.from_product([[80., 90., 100., 110.], [expiry], ['call']],
+                                           names=['Strike', 'Expiry', 'Type'])
+        self.data = pd.DataFrame({'Ask': [21., 0., 3., .5], 'Bid': 0., 'Last': 0.,
+                                  'Vol': 10, 'IV': np.nan, 'Underlying_Price': 100.},
+                                 index=index)
+
+    def test_status_is_checked_once_per_solved_row(self):
+        cache = IVCache()
+        check = mock.Mock(wraps=iv_solver.quote_status)
+        with mock.patch('iv_solver.quote_status', check), \
+                mock.patch('data_fetcher.quote_status', check):
+            first = get_filtered_data(self.data, cache=cache, return_status=True)
+            self.assertEqual([len(args[0]) for args, _ in check.call_args_list], [4])
+
+            # Every row comes from the cache, with the status it was solved with
+            second = get_filtered_data(self.data, cache=cache, return_status=True)
+            self.assertEqual(check.call_count, 1)
+
+        self.assertEqual(first[3].tolist(), [QUOTE_VALID, QUOTE_NO_PREMIUM, QUOTE_VALID,
+                                             QUOTE_VALID])
+        np.testing.assert_array_equal(first[3], second[3])
+        np.testing.assert_array_equal(first[2], second[2])
+
+    def test_scalar_path_skips_rejected_quotes(self):
+        data = self.data.copy()
+        data['Ask'] = [19., 0., 3., .5]  # Below the 20 of intrinsic value
+        strikes, _, ivs, status = get_filtered_data(data, batch=False, return_status=True)
+        self.assertEqual(status.tolist(), [QUOTE_BELOW_INTRINSIC, QUOTE_NO_PREMIUM,
+                                           QUOTE_VALID, QUOTE_VALID])
+        self.assertEqual(ivs[:2].tolist(), [0., 0.])
+        self.assertTrue((ivs[2:] > 0).all())
+
+
+class TestChainIVs(unittest.TestCase):
+
+    def test_rows_match_the_filtered_ivs(self):
+        expiry = dt.datetime.combine(dt.date.today() + dt.timedelta(days=30), dt.time())
+        index = pd.MultiIndex.from_product([[90., 100., 110.], [expiry], ['call', 'put']],
+                                           names=['Strike', 'Expiry', 'Type'])
+        data = pd.DataFrame({'Ask': [11., 1., 3., 3., .5, 11.],
+                             'Bid': [10., 0., 2.8, 2.8, .4, 10.2],
+                             'Last': 0., 'Vol': 10, 'IV': np.nan, 'Underlying_Price': 100.},
+                            index=index)
+
+        ivs = get_chain_ivs(data, rf_interest_rate=1.)
+        self.assertTrue(np.isnan(ivs[1]))  # Put without a bid
+        for typ in ('call', 'put'):
+            rows = data.index.get_level_values('Type') == typ
+            _, _, filtered = get_filtered_data(data, call=typ == 'call', put=typ == 'put',
+                                               rf_interest_rate=1., precision='full',
+                                               intraday=True)
+            np.testing.assert_allclose(np.nan_to_num(ivs[rows]), filtered, rtol=1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import datetime as dt
+import shutil
+import tempfile
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from data_fetcher import get_filtered_data, get_raw_data, get_time_delta
+from data_sources import (DataSource, RecordingSource, ReplaySource,
+                          normalize_chain, record_chain)
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    from py_vollib.black_scholes_merton import black_scholes_merton
+
+
+def make_chain(underlying):
+    index = pd.MultiIndex.from_product(
+        [[95., 100., 105.], pd.to_datetime(['2017-07-21', '2017-08-18']),
+         ['call', 'put']], names=['Strike', 'Expiry', 'Type'])
+    rows = len(index)
+    return normalize_chain(pd.DataFrame(
+        {'Last': np.linspace(1, 2, rows), 'Bid': np.linspace(1, 2, rows),
+         'Ask': np.linspace(1.1, 2.1, rows), 'Vol': np.arange(rows),
+         'IV': .2, 'Underlying_Price': underlying}, index=index))
+
+
+# Serves a new chain on every call, the underlying moving by one
+class MovingSource(DataSource):
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_chain(self, ticker):
+        self.calls += 1
+        return make_chain(100. + self.calls)
+
+
+class TestDataSources(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_data_source_is_abstract(self):
+        self.assertRaises(TypeError, DataSource)
+
+    def test_record_replay_round_trip(self):
+        recorded = []
+        for second in range(3):
+            data = make_chain(100. + second)
+            record_chain(data, self.directory, 'spy',
+                         dt.datetime(2017, 7, 10, 10, 0, second))
+            recorded.append(data)
+
+        replay = ReplaySource(self.directory, speed=None, loop=True)
+        for data in recorded + recorded[:1]:
+            pd.testing.assert_frame_equal(replay.get_chain('spy'), data)
+
+        replay = ReplaySource(self.directory, speed=None, loop=False)
+        for data in recorded + recorded[-1:]:
+            pd.testing.assert_frame_equal(replay.get_chain('spy'), data)
+
+    def test_recording_source_records_what_it_serves(self):
+        source = RecordingSource(MovingSource(), self.directory)
+        served = source.get_chain('spy')
+        replayed = ReplaySource(self.directory, speed=None).get_chain('spy')
+        pd.testing.assert_frame_equal(replayed, served)
+
+    def test_replay_through_get_filtered_data(self):
+        # Quotes priced at 25% volatility on the time to expiry the
+        # pipeline measures from today
+        today = dt.datetime.today()
+        expiries = [dt.datetime.combine(today.date() + dt.timedelta(days=days), dt.time())
+                    for days in (30, 90)]
+        _, years = get_time_delta(today, expiries)
+        index = pd.MultiIndex.from_product([[90., 100., 110.], expiries, ['call', 'put']],
+                                           names=['Strike', 'Expiry', 'Type'])
+        prices = [black_scholes_merton(typ[0], 100., strike, years[expiries.index(expiry)],
+                                       .01, .25, 0.)
+                  for strike, expiry, typ in index]
+        record_chain(pd.DataFrame({'Last': prices, 'Bid': prices, 'Ask': prices,
+                                   'Vol': 10, 'IV': np.nan, 'Underlying_Price': 100.},
+                                  index=index),
+                     self.directory, 'spy', dt.datetime(2017, 7, 10, 10))
+
+        data = get_raw_data('spy', ReplaySource(self.directory, speed=None))
+        for call in (True, False):
+            strikes, days, ivs = get_filtered_data(data, call=call, put=not call,
+                                                   rf_interest_rate=1.)
+            self.assertEqual(len(ivs), 6)
+            np.testing.assert_allclose(ivs, .25, atol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
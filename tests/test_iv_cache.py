@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+
+from iv_cache import IVCache, ENTRY_BYTES
+
+
+class TestIVCache(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.prices = rng.uniform(.5, 20, 100)
+        self.K = rng.uniform(50, 150, 100)
+        self.t = rng.uniform(.01, 2, 100)
+        self.sigmas = rng.uniform(.1, .9, 100)
+        self.status = np.zeros(100, dtype=np.int8)
+
+    def store(self, cache, rows, **kwargs):
+        cache.store(self.prices[rows], 100., self.K[rows], self.t[rows], .02, 0.,
+                    'c', self.sigmas[rows], self.status[rows], **kwargs)
+
+    def lookup(self, cache, rows, flag='c', **kwargs):
+        return cache.lookup(self.prices[rows], 100., self.K[rows], self.t[rows],
+                            .02, 0., flag, **kwargs)
+
+    def test_hits_and_misses(self):
+
+        cache = IVCache()
+        self.store(cache, slice(0, 50))
+        sigmas, status, missing = self.lookup(cache, slice(None))
+
+        self.assertEqual(missing.tolist(), list(range(50, 100)))
+        self.assertTrue(np.array_equal(sigmas[:50], self.sigmas[:50]))
+        self.assertTrue(np.isnan(sigmas[50:]).all())
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (50, 50, 50))
+
+        # Puts are other contracts
+        self.assertEqual(self.lookup(cache, slice(0, 50), flag='p')[2].size, 50)
+
+    def test_rounding(self):
+
+        cache = IVCache(decimals=4)
+        self.store(cache, slice(None))
+        sigmas, _, missing = cache.lookup(self.prices + 1e-6, 100., self.K, self.t,
+                                          .02, 0., 'c')
+        self.assertEqual(missing.size, 0)
+        self.assertTrue(np.array_equal(sigmas, self.sigmas))
+
+    def test_precision_budget(self):
+
+        cache = IVCache()
+        self.store(cache, slice(None), tolerance=1E-4, max_iterations=10)
+        self.assertEqual(self.lookup(cache, slice(None))[2].size, 100)
+        self.assertEqual(self.lookup(cache, slice(None), tolerance=1E-4,
+                                     max_iterations=10)[2].size, 0)
+
+        # A looser solve never replaces a tighter one
+        self.store(cache, slice(None))
+        expected, self.sigmas = self.sigmas, self.sigmas + 1
+        self.store(cache, slice(None), tolerance=1E-4, max_iterations=10)
+        sigmas = self.lookup(cache, slice(None))[0]
+        self.assertTrue(np.array_equal(sigmas, expected))
+
+    def test_least_recently_used_eviction(self):
+
+        cache = IVCache(max_bytes=3 * ENTRY_BYTES)
+        for row in [0, 1, 2]:
+            self.store(cache, [row])
+        self.lookup(cache, [0])
+        self.store(cache, [3])
+
+        self.assertEqual((len(cache), cache.evictions), (3, 1))
+        self.assertEqual(self.lookup(cache, [0, 1, 2, 3])[2].tolist(), [1])
+
+    def test_not_finite_inputs_are_not_cached(self):
+
+        cache = IVCache()
+        cache.store([np.nan, 1.], 100., 100., .5, .02, 0., 'c', [.2, .3], [0, 0])
+        _, _, missing = cache.lookup([np.nan, 1.], 100., 100., .5, .02, 0., 'c')
+        self.assertEqual((len(cache), missing.tolist()), (1, [0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
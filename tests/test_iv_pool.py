@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from iv_pool import ShardedIVEngine, expiry_shards
+from iv_solver import implied_volatility_batch
+
+
+class TestShardedIVEngine(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        n = 3000
+        self.flag = np.where(rng.rand(n) < .5, 'c', 'p')
+        self.K = rng.uniform(50, 150, n)
+        self.t = np.round(rng.uniform(-.1, 2, n), 1)  # Some expired
+        self.prices = rng.uniform(0, 30, n)
+
+    def test_matches_batch_solver(self):
+
+        args = (self.prices, 100., self.K, self.t, .02, .01, self.flag)
+        expected = implied_volatility_batch(*args, return_status=True)
+
+        with ShardedIVEngine(processes=2, min_rows=0) as engine:
+            sigmas, status = engine.implied_volatility(*args, return_status=True)
+            self.assertIsNotNone(engine._pool)
+            np.testing.assert_array_equal(sigmas, expected[0])
+            np.testing.assert_array_equal(status, expected[1])
+
+            # Larger chains grow the shared blocks
+            more = engine.implied_volatility(np.tile(self.prices, 30), 100.,
+                                             np.tile(self.K, 30), np.tile(self.t, 30),
+                                             .02, .01, np.tile(self.flag, 30))
+            np.testing.assert_array_equal(more, np.tile(expected[0], 30))
+
+    def test_small_chains_solve_inline(self):
+
+        with ShardedIVEngine(processes=2, min_rows=len(self.prices) + 1) as engine:
+            sigmas = engine.implied_volatility(self.prices, 100., self.K, self.t,
+                                               .02, .01, self.flag)
+            self.assertIsNone(engine._pool)
+        np.testing.assert_array_equal(sigmas, implied_volatility_batch(
+            self.prices, 100., self.K, self.t, .02, .01, self.flag))
+
+    def test_expiry_shards(self):
+
+        t = np.repeat([.1, .2, .3, .4], [10, 10, 10, 10])
+        self.assertEqual(expiry_shards(t, 2), [(0, 20), (20, 40)])
+        self.assertEqual(expiry_shards(t, 1), [(0, 40)])
+        self.assertEqual(expiry_shards(t[:0], 4), [(0, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
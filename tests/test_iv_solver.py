@@ -0,0 +1,161 @@
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from iv_solver import (IncrementalIVSolver, implied_volatility_batch, quote_status, PRECISION_BUDGETS,
+                       QUOTE_VALID, QUOTE_NO_PREMIUM, QUOTE_BAD_INPUTS,
+                       QUOTE_BELOW_INTRINSIC, QUOTE_ABOVE_MAXIMUM)
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    from py_vollib.black_scholes_merton import black_scholes_merton
+    from py_vollib.black_scholes_merton.implied_volatility import implied_volatility
+
+
+class TestImpliedVolatilityBatch(unittest.TestCase):
+
+    def setUp(self):
+        # A random chain priced with py_vollib
+        rng = np.random.RandomState(0)
+        n = 200
+        self.S, self.r, self.q = 100., .03, .01
+        self.K = rng.uniform(60, 140, n)
+        self.t = rng.uniform(.02, 2, n)
+        self.flag = np.where(rng.rand(n) < .5, 'c', 'p')
+        self.prices = np.array([
+            black_scholes_merton(f, self.S, k, t, self.r, sigma, self.q)
+            for f, k, t, sigma in zip(self.flag, self.K, self.t, rng.uniform(.05, 1, n))])
+
+    def test_matches_py_vollib(self):
+
+        sigmas, status = implied_volatility_batch(
+            self.prices, self.S, self.K, self.t, self.r, self.q, self.flag,
+            return_status=True)
+        expected = np.array([
+            implied_volatility(price, self.S, k, t, self.r, self.q, f)
+            for price, f, k, t in zip(self.prices, self.flag, self.K, self.t)])
+
+        self.assertTrue((status == QUOTE_VALID).all())
+        self.assertTrue(np.abs(sigmas - expected).max() < 1e-12)
+
+    def test_precision_budgets(self):
+
+        full = implied_volatility_batch(self.prices, self.S, self.K, self.t,
+                                        self.r, self.q, self.flag)
+        for name, (tolerance, max_iterations) in PRECISION_BUDGETS.items():
+            sigmas = implied_volatility_batch(
+                self.prices, self.S, self.K, self.t, self.r, self.q, self.flag,
+                tolerance=tolerance, max_iterations=max_iterations)
+            self.assertTrue(np.abs(sigmas - full).max() < tolerance, name)
+
+    def test_rejected_quotes(self):
+
+        # Valid, no premium, bad strike, below intrinsic, above the spot
+        prices = [5., 0., 5., 1., 150.]
+        K = [100., 100., 0., 50., 100.]
+        sigmas, status = implied_volatility_batch(prices, 100., K, .5, .02, 0.,
+                                                  'c', return_status=True)
+
+        self.assertEqual(status.tolist(), [QUOTE_VALID, QUOTE_NO_PREMIUM,
+                                           QUOTE_BAD_INPUTS, QUOTE_BELOW_INTRINSIC,
+                                           QUOTE_ABOVE_MAXIMUM])
+        self.assertTrue(np.isfinite(sigmas[0]))
+        self.assertTrue(np.isnan(sigmas[1:]).all())
+        self.assertTrue(np.array_equal(quote_status(prices, 100., K, .5, .02, 0., 'c'),
+                                       status))
+
+    def test_put_above_discounted_strike(self):
+
+        status = quote_status([99.5, 90.], 100., 100., 1., .05, 0., 'p')
+        self.assertEqual(status.tolist(), [QUOTE_ABOVE_MAXIMUM, QUOTE_VALID])
+
+
+# Stands in for a process pool engine, recording how many rows it solved
+class CountingEngine(object):
+
+    def __init__(self):
+        self.rows = []
+
+    def implied_volatility(self, prices, *args, **kwargs):
+        self.rows.append(len(prices))
+        return implied_volatility_batch(prices, *args, **kwargs)
+
+
+class TestIncrementalIVSolver(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        strikes = np.arange(80., 121.)
+        expiries = pd.to_datetime(['2026-11-20', '2026-12-18', '2027-01-15'])
+        self.keys = pd.MultiIndex.from_product([['call', 'put'], strikes, expiries])
+        n = len(self.keys)
+        self.flag = np.where(self.keys.get_level_values(0) == 'call', 'c', 'p')
+        self.K = self.keys.get_level_values(1).values
+        self.t = np.tile([.1, .2, .3], n // 3)
+        self.prices = np.array([
+            black_scholes_merton(f, 100., k, t, .02, sigma, 0.)
+            for f, k, t, sigma in zip(self.flag, self.K, self.t, rng.uniform(.1, .5, n))])
+
+    def solve(self, solver, prices, keys=None, **kwargs):
+        return solver.solve(self.keys if keys is None else keys, prices, 100.,
+                            self.K, self.t, .02, 0., self.flag, **kwargs)
+
+    def test_unchanged_snapshot_solves_nothing(self):
+
+        engine = CountingEngine()
+        solver = IncrementalIVSolver(engine=engine)
+        first = self.solve(solver, self.prices)
+        second = self.solve(solver, self.prices)
+
+        self.assertEqual(engine.rows, [len(self.keys)])
+        self.assertEqual((solver.solved, solver.reused), (len(self.keys), len(self.keys)))
+        np.testing.assert_array_equal(first, second)
+
+    def test_only_moved_rows_are_solved(self):
+
+        engine = CountingEngine()
+        solver = IncrementalIVSolver(engine=engine)
+        self.solve(solver, self.prices)
+        moved = self.prices.copy()
+        moved[[3, 50, 200]] *= 1.01
+        sigmas = self.solve(solver, moved)
+
+        self.assertEqual(engine.rows[1:], [3])
+        expected = implied_volatility_batch(moved, 100., self.K, self.t, .02, 0., self.flag)
+        self.assertTrue(np.nanmax(np.abs(sigmas - expected)) < 1e-8)
+
+    def test_reordered_and_new_contracts(self):
+
+        engine = CountingEngine()
+        solver = IncrementalIVSolver(engine=engine)
+        half = np.arange(len(self.keys)) % 2 == 0
+        solver.solve(self.keys[half], self.prices[half], 100., self.K[half],
+                     self.t[half], .02, 0., self.flag[half])
+
+        # Tuple keys in reverse order, half of them new
+        order = np.arange(len(self.keys))[::-1]
+        sigmas = solver.solve(list(self.keys[order]), self.prices[order], 100.,
+                              self.K[order], self.t[order], .02, 0., self.flag[order])
+
+        self.assertEqual(engine.rows, [half.sum(), (~half).sum()])
+        expected = implied_volatility_batch(self.prices, 100., self.K, self.t, .02, 0.,
+                                            self.flag)[order]
+        self.assertTrue(np.array_equal(np.isnan(sigmas), np.isnan(expected)))
+        self.assertTrue(np.nanmax(np.abs(sigmas - expected)) < 1e-8)
+
+    def test_tighter_budget_resolves(self):
+
+        engine = CountingEngine()
+        solver = IncrementalIVSolver(engine=engine)
+        self.solve(solver, self.prices, tolerance=1E-4, max_iterations=10)
+        self.solve(solver, self.prices, tolerance=1E-4, max_iterations=10)
+        self.solve(solver, self.prices)
+        self.solve(solver, self.prices, tolerance=1E-4, max_iterations=10)
+
+        self.assertEqual(engine.rows, [len(self.keys), len(self.keys)])
+
+
+if __name__ == '__main__':
+    unittest.main()
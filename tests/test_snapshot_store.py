@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import snapshot_store
+from snapshot_store import (DEFAULT_FORMAT, SNAPSHOT_COLUMNS, list_partitions,
+                            partition_parts, read_partition, to_snapshot,
+                            write_partition)
+
+
+def make_chain():
+    expiries = pd.to_datetime(['2017-07-21', '2017-08-18', '2017-09-15'])
+    strikes = np.arange(90., 111., 5.)
+    index = pd.MultiIndex.from_product([strikes, expiries, ['call', 'put']],
+                                       names=['Strike', 'Expiry', 'Type'])
+    rows = len(index)
+    return pd.DataFrame({'Bid': np.linspace(1, 2, rows),
+                         'Ask': np.linspace(1.1, 2.1, rows),
+                         'Last': np.linspace(1, 2, rows),
+                         'Vol': np.arange(rows),
+                         'Underlying_Price': 100.}, index=index)
+
+
+class TestSnapshotStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.snapshot = to_snapshot(make_chain(), {'Vol': 'Volume'})
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_default_format_is_memory_mapped(self):
+        self.assertEqual(DEFAULT_FORMAT, 'npy')
+        write_partition(self.root, 'spy', '2017-07-10', self.snapshot)
+        part, = partition_parts(self.root, 'spy', '2017-07-10')
+        expiry = np.load(os.path.join(part, 'Expiry.npy'), mmap_mode='r')
+        self.assertIsInstance(expiry, np.memmap)
+
+    def test_round_trip_with_bounds(self):
+        write_partition(self.root, 'spy', '2017-07-10', self.snapshot)
+        data = read_partition(self.root, 'spy', '2017-07-10')
+        self.assertEqual(list(data.columns), [name for name, _ in SNAPSHOT_COLUMNS])
+        self.assertEqual(len(data.index), len(self.snapshot.index))
+
+        data = read_partition(self.root, 'spy', '2017-07-10',
+                              expiry=('2017-08-01', None), strike=(95, 100))
+        self.assertEqual(len(data.index), 2 * 2 * 2)
+        self.assertTrue((data['Expiry'] >= pd.Timestamp('2017-08-01')).all())
+        self.assertEqual(sorted(data['Strike'].unique()), [95., 100.])
+
+    def test_commit_replaces_the_previous_version(self):
+        write_partition(self.root, 'spy', '2017-07-10', self.snapshot)
+        write_partition(self.root, 'spy', '2017-07-10', self.snapshot.iloc[:5])
+        self.assertEqual(len(read_partition(self.root, 'spy', '2017-07-10').index), 5)
+        self.assertEqual(len(os.listdir(os.path.join(self.root, 'SPY'))), 2)
+        self.assertEqual(list_partitions(self.root), [('SPY', pd.Timestamp('2017-07-10'))])
+
+    def test_commit_replaces_a_plain_directory(self):
+        path = write_partition(self.root, 'spy', '2017-07-10', self.snapshot)
+        version = os.path.realpath(path)
+        os.remove(path)
+        os.rename(version, path)
+        write_partition(self.root, 'spy', '2017-07-10', self.snapshot.iloc[:5])
+        self.assertTrue(os.path.islink(path))
+        self.assertEqual(len(read_partition(self.root, 'spy', '2017-07-10').index), 5)
+
+    def test_read_racing_a_commit_is_retried(self):
+        write_partition(self.root, 'spy', '2017-07-10', self.snapshot)
+        read_part = snapshot_store._read_part
+        commits = []
+
+        # The first part read is deleted under the reader by a commit
+        def racing(*args):
+            if not commits:
+                commits.append(write_partition(self.root, 'spy', '2017-07-10',
+                                               self.snapshot.iloc[:5]))
+            return read_part(*args)
+
+        with mock.patch('snapshot_store._read_part', side_effect=racing):
+            data = read_partition(self.root, 'spy', '2017-07-10')
+        self.assertEqual(len(data.index), 5)
+
+    def test_missing_partition_is_not_retried(self):
+        with mock.patch('snapshot_store._read_version',
+                        wraps=snapshot_store._read_version) as read_version:
+            with self.assertRaises(OSError):
+                read_partition(self.root, 'spy', '2017-07-10')
+        self.assertEqual(read_version.call_count, 1)
+
+    def test_concurrent_writers(self):
+        errors = []
+
+        def write(rows):
+            try:
+                for _ in range(10):
+                    write_partition(self.root, 'spy', '2017-07-10',
+                                    self.snapshot.iloc[:rows])
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=write, args=(rows,)) for rows in (5, 7)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertIn(len(read_partition(self.root, 'spy', '2017-07-10').index), (5, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import glob
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from trading_calendar import (CALENDARS, EARLY_CLOSE, SESSION_CLOSE,
+                              ExchangeCalendar, USTradingCalendar, _compiled,
+                              get_calendar, register_calendar)
+from time_to_expiry import get_fractional_time_delta
+
+
+class TestCompiledCalendar(unittest.TestCase):
+
+    def setUp(self):
+        register_calendar(ExchangeCalendar('plain', USTradingCalendar.rules))
+
+    def tearDown(self):
+        CALENDARS.pop('plain', None)
+        for key in [key for key in _compiled if key[0] == 'plain']:
+            del _compiled[key]
+
+    def test_closes_without_early_closes(self):
+        calendar = get_calendar('plain', cache_directory=False)
+        closes = calendar.closes(['2017-07-03', '2017-07-05'])
+        self.assertEqual(closes.tolist(), [calendar.session_close] * 2)
+        self.assertEqual(int(calendar.closes('2017-11-24')),
+                         calendar.session_close)
+
+    def test_time_delta_without_early_closes(self):
+        # Monday 10:30 to the close of Friday, a full week of sessions less
+        # the first hour
+        now = dt.datetime(2017, 7, 10, 10, 30)
+        days, years = get_fractional_time_delta(
+            now, [dt.datetime(2017, 7, 14)], calendar='plain', resolution=1)
+        np.testing.assert_allclose(days, [5 - 60 / 390.0])
+        np.testing.assert_allclose(years, days / 252.0)
+
+    def test_aware_now_is_converted_to_exchange_time(self):
+        # 14:30 UTC is 10:30 in New York in July
+        expiries = [dt.datetime(2017, 7, 14), dt.datetime(2017, 7, 21)]
+        local = get_fractional_time_delta(dt.datetime(2017, 7, 10, 10, 30),
+                                          expiries)
+        aware = get_fractional_time_delta(
+            pd.Timestamp('2017-07-10 14:30', tz='UTC'), expiries)
+        np.testing.assert_allclose(aware, local)
+
+    def test_now_is_rounded_to_the_resolution(self):
+        # Refreshes within the same quarter hour see the same times
+        expiries = [dt.datetime(2017, 7, 14)]
+        first = get_fractional_time_delta(dt.datetime(2017, 7, 10, 10, 31),
+                                          expiries)
+        last = get_fractional_time_delta(dt.datetime(2017, 7, 10, 10, 44, 59),
+                                         expiries)
+        np.testing.assert_array_equal(first, last)
+        np.testing.assert_allclose(first[0], [5 - 60 / 390.0])
+
+    def test_early_close_shortens_the_session(self):
+        calendar = get_calendar('us_equity', cache_directory=False)
+        closes = calendar.closes(['2017-07-03', '2017-07-05'])
+        self.assertEqual(closes.tolist(), [EARLY_CLOSE, SESSION_CLOSE])
+
+
+class TestCalendarCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for key in [key for key in _compiled if key[1:] == (2015, 2020)]:
+            del _compiled[key]
+        shutil.rmtree(self.directory)
+
+    def compile(self):
+        for key in [key for key in _compiled if key[1:] == (2015, 2020)]:
+            del _compiled[key]
+        return get_calendar('us_equity', 2015, 2020, self.directory)
+
+    def test_round_trip(self):
+        compiled = self.compile()
+        path, = glob.glob(os.path.join(self.directory, 'us_equity_2015_2020_v*.npy'))
+        self.assertNotIsInstance(compiled.table, np.memmap)
+
+        cached = self.compile()
+        self.assertIsInstance(cached.table, np.memmap)
+        np.testing.assert_array_equal(cached.table, compiled.table)
+        np.testing.assert_array_equal(
+            cached.busdaycalendar.holidays, compiled.busdaycalendar.holidays)
+        dates = np.arange('2015-01-01', '2021-01-01', dtype='M8[D]')
+        np.testing.assert_array_equal(cached.closes(dates), compiled.closes(dates))
+        np.testing.assert_array_equal(cached.shortfall(dates), compiled.shortfall(dates))
+
+    def test_unreadable_cache_is_compiled_again(self):
+        compiled = self.compile()
+        path, = glob.glob(os.path.join(self.directory, '*.npy'))
+        with open(path, 'wb') as f:
+            f.write(b'not a table')
+
+        recompiled = self.compile()
+        np.testing.assert_array_equal(recompiled.table, compiled.table)
+        self.assertIsInstance(self.compile().table, np.memmap)
+
+
+if __name__ == '__main__':
+    unittest.main()
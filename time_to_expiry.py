@@ -0,0 +1,66 @@
+# Import required libraries
+import numpy as np
+import pandas as pd
+
+from trading_calendar import DEFAULT_CALENDAR, get_calendar
+
+
+# Year lengths behind the normalized times
+TRADING_DAYS = 252
+CALENDAR_DAYS = 365
+MINUTES_PER_DAY = 24 * 60
+
+# now is rounded down to this many minutes, so times to expiry and with
+# them the cached and incrementally solved IVs only change that often
+RESOLUTION = 15
+
+
+# Fractional days from now to the close of each expiry, one lookup per
+# distinct expiry broadcast back to the rows. With the trading calendar
+# only session minutes on business days count, early closes included, and
+# a day is one regular session, otherwise it is wall clock time. now is
+# either time zone aware or naive exchange local time.
+def get_fractional_time_delta(now, date_list, trading_calendar=True,
+                              calendar=DEFAULT_CALENDAR, resolution=RESOLUTION):
+
+    calendar = get_calendar(calendar)
+    session = calendar.session_close - calendar.session_open
+
+    now = pd.Timestamp(now)
+    if now.tzinfo is not None:
+        now = now.tz_convert(calendar.timezone).tz_localize(None)
+    now = np.datetime64(now).astype('datetime64[m]')
+    today = now.astype('datetime64[D]')
+    minute = (now - today).astype(int)
+    minute -= minute % resolution
+    now = today + np.timedelta64(minute, 'm')
+    dates = np.asarray(date_list, dtype='datetime64[us]').astype('datetime64[D]')
+    expiries, rows = np.unique(dates, return_inverse=True)
+
+    if trading_calendar:
+        year = TRADING_DAYS
+
+        # What is left of today's session, then every session up to and
+        # including the expiry's less what early closes cut from them
+        left_today = 0
+        if np.is_busday(today, busdaycal=calendar.busdaycalendar):
+            close = int(calendar.closes(today))
+            left_today = max(close - max(minute, calendar.session_open), 0)
+            left_today = min(left_today, close - calendar.session_open)
+        sessions = np.busday_count(today + 1, expiries + 1,
+                                   busdaycal=calendar.busdaycalendar)
+        lost = calendar.shortfall(expiries) - calendar.shortfall(today)
+        minutes = np.where(expiries >= today,
+                           left_today + session * np.maximum(sessions, 0)
+                           - np.maximum(lost, 0), 0)
+        delta_list = minutes / float(session)
+    else:
+        year = CALENDAR_DAYS
+        closes = expiries.astype('datetime64[m]') + calendar.closes(expiries)
+        minutes = np.maximum((closes - now).astype(int), 0)
+        delta_list = minutes / float(MINUTES_PER_DAY)
+
+    delta_list = delta_list[rows]
+    normalized = delta_list / float(year)
+
+    return delta_list, normalized
@@ -1,8 +1,34 @@
+import os
+import tempfile
+
+import numpy as np
 from pandas.tseries.holiday import (AbstractHolidayCalendar, Holiday,
                                     USMartinLutherKingJr, USPresidentsDay,
                                     GoodFriday, USMemorialDay,
                                     USLaborDay, USThanksgivingDay,
-                                    nearest_workday)
+                                    nearest_workday, TH)
+from pandas.tseries.offsets import DateOffset, Day
+
+
+# Years compiled by default, holidays outside them are not known
+START_YEAR = 1970
+END_YEAR = 2069
+
+# Regular session in exchange local time, minutes after midnight
+SESSION_OPEN = 9 * 60 + 30
+SESSION_CLOSE = 16 * 60
+EARLY_CLOSE = 13 * 60
+TIMEZONE = 'America/New_York'
+
+DEFAULT_CALENDAR = 'us_equity'
+
+# Compiled tables are cached as <name>_<start>_<end>_v<version>.npy in this
+# directory, bump the version whenever the rules below change
+CACHE_DIRECTORY_VARIABLE = 'TRADING_CALENDAR_DIR'
+CACHE_VERSION = 1
+
+# One row per closed or shortened day, close is 0 when closed all day
+CALENDAR_DTYPE = np.dtype([('date', 'M8[D]'), ('close', np.int16)])
 
 
 class USTradingCalendar(AbstractHolidayCalendar):
@@ -17,3 +43,192 @@ class USTradingCalendar(AbstractHolidayCalendar):
         USThanksgivingDay,
         Holiday('Christmas', month=12, day=25, observance=nearest_workday)
     ]
+
+
+# Half days, only on Monday to Thursday since a Friday July 3rd or
+# December 24th is the observed holiday itself
+US_EARLY_CLOSES = [
+    Holiday('IndependenceDayEve', month=7, day=3, days_of_week=(0, 1, 2, 3)),
+    Holiday('DayAfterThanksgiving', month=11, day=1,
+            offset=[DateOffset(weekday=TH(4)), Day(1)]),
+    Holiday('ChristmasEve', month=12, day=24, days_of_week=(0, 1, 2, 3))
+]
+
+# CME equity index futures shut on these and halt early on the other
+# US holidays
+CME_HOLIDAYS = [
+    Holiday('NewYearsDay', month=1, day=1, observance=nearest_workday),
+    GoodFriday,
+    Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+]
+CME_EARLY_CLOSES = [
+    USMartinLutherKingJr,
+    USPresidentsDay,
+    USMemorialDay,
+    Holiday('USIndependenceDay', month=7, day=4, observance=nearest_workday),
+    USLaborDay,
+    USThanksgivingDay
+] + US_EARLY_CLOSES
+
+
+# Holiday and early close rules of one exchange, with its session times
+# in the exchange's time zone
+class ExchangeCalendar(object):
+
+    def __init__(self, name, holidays, early_closes=(),
+                 session_open=SESSION_OPEN, session_close=SESSION_CLOSE,
+                 early_close=EARLY_CLOSE, timezone=TIMEZONE):
+        if not session_open < early_close <= session_close:
+            raise Exception('Session must open before it closes.')
+
+        self.name = name
+        self.holidays = list(holidays)
+        self.early_closes = list(early_closes)
+        self.session_open = session_open
+        self.session_close = session_close
+        self.early_close = early_close
+        self.timezone = timezone
+
+    # Evaluate the pandas rules into a table sorted by date, the slow part
+    def compile(self, start_year=START_YEAR, end_year=END_YEAR):
+        start = '%d-01-01' % start_year
+        end = '%d-12-31' % end_year
+
+        def dates(rules):
+            if not rules:
+                return np.array([], dtype='M8[D]')
+            calendar = AbstractHolidayCalendar(name=self.name, rules=rules)
+            return calendar.holidays(start, end).values.astype('M8[D]')
+
+        holidays = np.unique(dates(self.holidays))
+        early = np.setdiff1d(dates(self.early_closes), holidays)
+        early = early[np.is_busday(early)]
+
+        table = np.zeros(holidays.size + early.size, dtype=CALENDAR_DTYPE)
+        table['date'] = np.concatenate([holidays, early])
+        table['close'][holidays.size:] = self.early_close
+        return np.sort(table, order='date')
+
+
+# Compiled table of an exchange calendar, ready for vectorized lookups
+class CompiledCalendar(object):
+
+    def __init__(self, calendar, table):
+        self.name = calendar.name
+        self.session_open = calendar.session_open
+        self.session_close = calendar.session_close
+        self.timezone = calendar.timezone
+        self.table = table
+
+        closed = table['close'] == 0
+        self.busdaycalendar = np.busdaycalendar(holidays=table['date'][closed])
+        self.early_dates = np.asarray(table['date'][~closed])
+        self.early_closes = np.asarray(table['close'][~closed], dtype=int)
+
+        # Session minutes lost to early closes up to and including each one
+        self._shortfall = np.concatenate(
+            [[0], np.cumsum(self.session_close - self.early_closes)])
+
+    # Closing minute on each date, holidays included
+    def closes(self, dates):
+        dates = np.asarray(dates, dtype='M8[D]')
+        if self.early_dates.size == 0:
+            return np.full(dates.shape, self.session_close)
+        i = np.searchsorted(self.early_dates, dates)
+        i = np.minimum(i, self.early_dates.size - 1)
+        early = self.early_dates[i] == dates
+        return np.where(early, self.early_closes[i], self.session_close)
+
+    # Session minutes lost to early closes on dates up to and including each
+    def shortfall(self, dates):
+        dates = np.asarray(dates, dtype='M8[D]')
+        return self._shortfall[np.searchsorted(self.early_dates, dates,
+                                               side='right')]
+
+
+# Exchange calendars by name
+CALENDARS = {}
+
+_compiled = {}
+
+
+def register_calendar(calendar):
+    CALENDARS[calendar.name] = calendar
+    for key in [key for key in _compiled if key[0] == calendar.name]:
+        del _compiled[key]
+
+
+def available_calendars():
+    return sorted(CALENDARS)
+
+
+def get_cache_directory():
+    return os.environ.get(CACHE_DIRECTORY_VARIABLE,
+                          os.path.join(tempfile.gettempdir(), 'trading_calendars'))
+
+
+# Compiled calendar, memory mapped from the cache directory when it was
+# compiled before and compiled and saved there otherwise. Pass
+# cache_directory=False to skip the disk cache.
+def get_calendar(name=DEFAULT_CALENDAR, start_year=START_YEAR,
+                 end_year=END_YEAR, cache_directory=None):
+
+    if name not in CALENDARS:
+        raise Exception('Unknown calendar %r, expected one of %s.'
+                        % (name, ', '.join(available_calendars())))
+    if start_year > end_year:
+        raise Exception('Calendar must start before it ends.')
+
+    key = (name, start_year, end_year)
+    if key in _compiled:
+        return _compiled[key]
+
+    calendar = CALENDARS[name]
+    if cache_directory is None:
+        cache_directory = get_cache_directory()
+
+    table = None
+    if cache_directory is not False:
+        path = os.path.join(cache_directory, '%s_%d_%d_v%d.npy'
+                            % (name, start_year, end_year, CACHE_VERSION))
+        try:
+            table = np.load(path, mmap_mode='r')
+        except (IOError, ValueError):
+            table = None
+
+    if table is None:
+        table = calendar.compile(start_year, end_year)
+        if cache_directory is not False:
+            # Write then rename, so concurrent workers never see half a file
+            try:
+                if not os.path.isdir(cache_directory):
+                    os.makedirs(cache_directory)
+                handle, temporary = tempfile.mkstemp(dir=cache_directory,
+                                                     suffix='.npy')
+                with os.fdopen(handle, 'wb') as f:
+                    np.save(f, table)
+                os.replace(temporary, path)
+            except OSError:
+                pass  # Read only location, keep the in-memory table
+
+    _compiled[key] = CompiledCalendar(calendar, table)
+    return _compiled[key]
+
+
+# Trading days as a numpy business day calendar, compiled once
+def get_busdaycalendar(name=DEFAULT_CALENDAR):
+    return get_calendar(name).busdaycalendar
+
+
+register_calendar(ExchangeCalendar('us_equity', USTradingCalendar.rules,
+                                   US_EARLY_CLOSES))
+register_calendar(ExchangeCalendar('cboe_index', USTradingCalendar.rules,
+                                   US_EARLY_CLOSES,
+                                   session_close=16 * 60 + 15,
+                                   early_close=13 * 60 + 15))
+register_calendar(ExchangeCalendar('cme_equity', CME_HOLIDAYS,
+                                   CME_EARLY_CLOSES,
+                                   session_open=8 * 60 + 30,
+                                   session_close=15 * 60 + 15,
+                                   early_close=12 * 60,
+                                   timezone='America/Chicago'))